@@ -1,4 +1,5 @@
-from reIndexer import Backtest, Universe
+from reIndexer import Backtest, BacktestSession, StreamingResultsWriter,\
+    Universe
 import logging
 import numpy as np
 import pandas as pd
@@ -12,11 +13,27 @@ sp500 = Universe(
     csv_file='sector_universes/learned_sector_candidates/sp500_final.csv'
 )
 
-# Runnizng backtest
-sim_results = Backtest(sector_universe=sp500).run()
-print(sp500.invalid_tickers)
+# Stream results to disk in monthly chunks while the backtest runs (see
+# `StreamingResultsWriter`), instead of holding them in memory until the end
+# (e.g. for long minute-frequency runs); no excel file is written
+stream_results = True
 
-# Saving to excel and pickle
-sim_results.to_excel('sector_universes/learned_sectors/excel/sp500.xlsx')
-sim_results.to_pickle('sector_universes/learned_sectors/pickle/sp500..pickle')
+if stream_results:
+    # Running backtest; partial results are readable while the run continues
+    # (see `StreamingResultsWriter.read`)
+    BacktestSession().run(
+        sector_universe=sp500,
+        results_writer=StreamingResultsWriter(
+            path='sector_universes/learned_sectors/pickle/sp500.h5')
+    )
+    print(sp500.invalid_tickers)
+else:
+    # Runnizng backtest
+    sim_results = Backtest(sector_universe=sp500).run()
+    print(sp500.invalid_tickers)
+
+    # Saving to excel and pickle
+    sim_results.to_excel('sector_universes/learned_sectors/excel/sp500.xlsx')
+    sim_results.to_pickle(
+        'sector_universes/learned_sectors/pickle/sp500..pickle')
 
@@ -1,4 +1,12 @@
-from .backtest import Backtest
-from .portfolio import MinimumVariance
-from .sector_universe import Universe
-from .synthetic_etf import PriceWeightedETF
+from .analytics import BlockBootstrap, Leaderboard, ResultsReader
+from .backtest import Backtest, BacktestSession, IncrementalBacktest,\
+    RunState, Screener, StreamingResultsWriter, UniverseEvaluator,\
+    VectorizedBacktest, WalkForward
+from .data import MultiResolutionPriceCache, PricePanel, SyntheticBundle
+from .portfolio import BatchMinimumVariance, FactorCovariance,\
+    MinimumVariance
+from .sector_universe import Universe, UniverseCatalog, UniverseValidator
+from .sweep import SweepWorker, TelemetryEmitter, TelemetryReader,\
+    WorkQueue
+from .synthetic_etf import EqualWeighting, InverseVolatilityWeighting,\
+    PriceWeightedETF, PriceWeighting, SyntheticETFCache, WeightingScheme
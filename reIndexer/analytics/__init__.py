@@ -0,0 +1,3 @@
+from .reader import ResultsReader
+from .leaderboard import Leaderboard
+from .bootstrap import BlockBootstrap
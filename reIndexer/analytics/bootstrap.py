@@ -0,0 +1,174 @@
+from .reader import ResultsReader
+
+import logging
+import numpy as np
+import pandas as pd
+
+
+class BlockBootstrap():
+    """Module to compute bootstrap confidence intervals of the performance
+    metrics of many backtests at once.
+
+    The (circular) moving block bootstrap resample indices are generated once,
+    and shared by all universes; i.e. every resample draws the same dates for
+    every universe, preserving the cross-sectional dependence between the
+    universes, such that differences from a baseline universe are paired.
+    Returns, volatility and Sharpe ratios of all universes and all resamples
+    are evaluated with batched array operations, in chunks of resamples to
+    bound memory (chunk size x bars x universes).
+    """
+
+    def __init__(self, n_resamples: int=5000, block_length: int=20,
+        chunk_size: int=100, confidence: float=0.95,
+        periods_per_year: int=252, seed: int=0):
+        """Initialization method for `BlockBootstrap`.
+
+        Keyword Arguments:
+            n_resamples {int} -- Number of bootstrap resamples
+                                 (default: {5000}).
+            block_length {int} -- Length of the resampled blocks, in bars
+                                  (default: {20}).
+            chunk_size {int} -- Number of resamples evaluated at once
+                                (default: {100}).
+            confidence {float} -- Confidence level of the intervals
+                                  (default: {0.95}).
+            periods_per_year {int} -- Number of bars per year
+                                      (default: {252}).
+            seed {int} -- Random seed (default: {0}).
+        """
+
+        self.n_resamples = n_resamples
+        self.block_length = block_length
+        self.chunk_size = chunk_size
+        self.confidence = confidence
+        self.periods_per_year = periods_per_year
+        self.seed = seed
+
+    def generateIndices(self, n_bars: int) -> np.ndarray:
+        """Function to generate the circular moving block bootstrap resample
+        indices.
+
+        Arguments:
+            n_bars {int} -- Number of bars in the returns series.
+
+        Returns:
+            np.ndarray -- Resample indices (resamples x bars).
+        """
+
+        rng = np.random.RandomState(self.seed)
+        n_blocks = int(np.ceil(n_bars / self.block_length))
+        block_starts = rng.randint(0, n_bars, size=(self.n_resamples,
+                                                    n_blocks))
+
+        indices = (block_starts[:, :, None] +
+            np.arange(self.block_length)[None, None, :]) % n_bars
+
+        return indices.reshape(self.n_resamples, -1)[:, :n_bars]\
+            .astype(np.int32)
+
+    def readReturns(self, result_files: dict) -> pd.DataFrame:
+        """Function to read the portfolio returns of stored backtest results,
+        on the dates common to all universes.
+
+        Arguments:
+            result_files {dict} -- Dictionary of universe name -> results file
+                                   (see `ResultsReader.getResultFiles`).
+
+        Returns:
+            pd.DataFrame -- Portfolio returns (dates x universes).
+        """
+
+        returns = pd.DataFrame(dict((i, ResultsReader.readColumns(
+            path=result_files[i], columns=['returns'])['returns'])
+            for i in sorted(result_files)))
+
+        n_dates = len(returns)
+        returns = returns.dropna()
+        if len(returns) < n_dates:
+            logging.info('Bootstrapping {0} of {1} dates common to all '
+                'universes'.format(len(returns), n_dates))
+
+        return returns
+
+    def computeStatistics(self, returns: np.ndarray) -> dict:
+        """Function to compute the annualized return, annualized volatility
+        and Sharpe ratio of a batch of returns series.
+
+        Arguments:
+            returns {np.ndarray} -- Returns (... x bars x universes).
+
+        Returns:
+            dict -- Dictionary of statistic -> values (... x universes).
+        """
+
+        log_growth = np.sum(np.log1p(returns), axis=-2)
+        annual_return = np.expm1(log_growth * self.periods_per_year /
+            returns.shape[-2])
+        mean_ret = np.mean(returns, axis=-2)
+        std_ret = np.std(returns, axis=-2, ddof=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = mean_ret / std_ret * np.sqrt(self.periods_per_year)
+
+        return {
+            'annual_return': annual_return,
+            'annual_volatility': std_ret * np.sqrt(self.periods_per_year),
+            'sharpe': sharpe
+        }
+
+    def run(self, returns: pd.DataFrame, baseline: str=None) -> pd.DataFrame:
+        """Function to compute bootstrap confidence intervals of the
+        performance metrics of each universe.
+
+        Arguments:
+            returns {pd.DataFrame} -- Portfolio returns (dates x universes); see
+                                      `readReturns`.
+
+        Keyword Arguments:
+            baseline {str} -- Baseline universe; the (paired) difference in
+                              Sharpe ratio of each universe over the baseline
+                              is also reported (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Point estimates, confidence interval bounds
+                            ('_lower' and '_upper'), and differences over the
+                            baseline (universes x metrics).
+        """
+
+        values = returns.values.astype(np.float64)
+        indices = self.generateIndices(n_bars=values.shape[0])
+
+        # Evaluating resamples in chunks
+        samples = dict()
+        for start in range(0, self.n_resamples, self.chunk_size):
+            chunk_stats = self.computeStatistics(
+                returns=values[indices[start:start + self.chunk_size]])
+            for stat, value in chunk_stats.items():
+                samples.setdefault(stat, list()).append(value)
+        samples = dict((i, np.concatenate(j)) for i, j in samples.items())
+
+        if baseline is not None:
+            baseline_idx = list(returns.columns).index(baseline)
+            samples['sharpe_diff'] = samples['sharpe'] -\
+                samples['sharpe'][:, [baseline_idx]]
+
+        # Point estimates and percentile intervals
+        point = self.computeStatistics(returns=values)
+        if baseline is not None:
+            point['sharpe_diff'] = point['sharpe'] -\
+                point['sharpe'][baseline_idx]
+
+        alpha = (1 - self.confidence) / 2.
+        intervals = pd.DataFrame(index=returns.columns)
+        for stat in samples:
+            intervals[stat] = point[stat]
+            intervals[stat + '_lower'], intervals[stat + '_upper'] = \
+                np.nanpercentile(samples[stat], [100 * alpha,
+                                                 100 * (1 - alpha)], axis=0)
+
+        # Fraction of resamples with no improvement over the baseline
+        if baseline is not None:
+            intervals['sharpe_diff_pvalue'] = np.mean(
+                samples['sharpe_diff'] <= 0, axis=0)
+
+        return intervals
@@ -0,0 +1,218 @@
+from .reader import ResultsReader
+
+import logging
+import numpy as np
+import os
+import pandas as pd
+
+
+class Leaderboard():
+    """Module to compute and rank comparison metrics of stored backtest results
+    across many sector universes.
+
+    Results are read in blocks of universes (only the columns required for the
+    metrics), aligned on a common date index, and the metrics of each block
+    are computed with vectorized array operations over the (dates x universes)
+    block. Metrics are kept per universe (one row each), and optionally
+    persisted, so that newly finished universes can be added incrementally;
+    results files that have not changed since they were last scored are not
+    read again.
+    """
+
+    # Result columns required for the metrics (commissions are read from the
+    # orders; see `ResultsReader.readCommissions`)
+    result_columns = ['returns', 'starting_cash', 'starting_value',
+                      'total_etf_restr_turnover', 'total_port_rebal_turnover']
+
+    def __init__(self, metrics_file: str=None, block_size: int=50,
+        periods_per_year: int=252):
+        """Initialization method for `Leaderboard`.
+
+        Keyword Arguments:
+            metrics_file {str} -- Pickle file to persist the metrics of scored
+                                  universes; loaded if it exists (default:
+                                  {None}; in-memory only).
+            block_size {int} -- Number of universes read and scored at once
+                                (default: {50}).
+            periods_per_year {int} -- Number of bars per year in the results
+                                      (default: {252}).
+        """
+
+        self.metrics_file = metrics_file
+        self.block_size = block_size
+        self.periods_per_year = periods_per_year
+
+        self.metrics = pd.DataFrame()
+        if self.metrics_file is not None and os.path.exists(self.metrics_file):
+            self.metrics = pd.read_pickle(self.metrics_file)
+            logging.info('Loaded metrics of {0} universes from {1}'.format(
+                len(self.metrics), self.metrics_file))
+
+            # Rescoring metrics persisted before the commissions were read
+            # from the orders
+            if 'total_commissions' not in self.metrics.columns:
+                logging.info('Persisted metrics are outdated; rescoring all '
+                    'universes')
+                self.metrics = pd.DataFrame()
+
+    def computeMetrics(self, returns: np.ndarray, etf_restr_turnover:
+        np.ndarray, port_rebal_turnover: np.ndarray, commissions: np.ndarray,
+        starting_value: np.array) -> dict:
+        """Function to compute the comparison metrics of a block of universes.
+        Dates on which a universe has no results should be NaN in `returns`.
+
+        NOTE: Turnover totals are in units of the traded ETFs (summed absolute
+              allocation changes times ETF prices; see `Bookkeeping`), not in
+              portfolio dollars; commission drag is computed from the
+              commissions charged in the simulation instead.
+
+        Arguments:
+            returns {np.ndarray} -- Portfolio returns (dates x universes).
+            etf_restr_turnover {np.ndarray} -- Total ETF restructuring
+                                               turnover (dates x universes).
+            port_rebal_turnover {np.ndarray} -- Total portfolio rebalancing
+                                                turnover (dates x universes).
+            commissions {np.ndarray} -- Commissions charged (dollars; dates x
+                                        universes).
+            starting_value {np.array} -- Starting portfolio value (dollars;
+                                         universes).
+
+        Returns:
+            dict -- Dictionary of metric -> values (universes).
+        """
+
+        n_bars = np.sum(~np.isnan(returns), axis=0)
+        filled_rets = np.nan_to_num(returns)
+
+        # Return, volatility and Sharpe ratio (zero risk-free rate)
+        wealth = np.cumprod(1 + filled_rets, axis=0)
+        total_return = wealth[-1] - 1
+        annual_return = (1 + total_return) ** (self.periods_per_year /
+            np.maximum(n_bars, 1)) - 1
+        mean_ret = np.nanmean(returns, axis=0)
+        std_ret = np.nanstd(returns, axis=0, ddof=1)
+        annual_volatility = std_ret * np.sqrt(self.periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = mean_ret / std_ret * np.sqrt(self.periods_per_year)
+
+        # Maximum drawdown
+        max_drawdown = np.min(wealth / np.maximum.accumulate(wealth, axis=0)
+            - 1, axis=0)
+
+        # Turnover totals, and commission drag (commissions charged as a
+        # fraction of the starting portfolio value, per year)
+        total_etf_restr_turnover = np.nansum(etf_restr_turnover, axis=0)
+        total_port_rebal_turnover = np.nansum(port_rebal_turnover, axis=0)
+        total_commissions = np.nansum(commissions, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            commission_drag = total_commissions / starting_value *\
+                self.periods_per_year / np.maximum(n_bars, 1)
+
+        return {
+            'n_bars': n_bars,
+            'total_return': total_return,
+            'annual_return': annual_return,
+            'annual_volatility': annual_volatility,
+            'sharpe': sharpe,
+            'max_drawdown': max_drawdown,
+            'total_etf_restr_turnover': total_etf_restr_turnover,
+            'total_port_rebal_turnover': total_port_rebal_turnover,
+            'total_commissions': total_commissions,
+            'commission_drag': commission_drag
+        }
+
+    def scoreBlock(self, result_files: dict) -> pd.DataFrame:
+        """Function to read and score a block of stored results.
+
+        Arguments:
+            result_files {dict} -- Dictionary of universe name -> results file.
+
+        Returns:
+            pd.DataFrame -- Metrics (universes x metrics).
+        """
+
+        names = list(result_files.keys())
+        results = list()
+        for name in names:
+            raw = ResultsReader.readRawColumns(path=result_files[name],
+                columns=self.result_columns + ['orders'])
+            result = raw[self.result_columns].fillna(0).astype(float)
+            result['commissions'] = ResultsReader.computeCommissions(
+                orders=raw['orders'])
+            results.append(result)
+
+        # Aligning block on a common date index
+        index = results[0].index
+        for result in results[1:]:
+            index = index.union(result.index)
+
+        def stackColumn(column):
+            return np.column_stack([i[column].reindex(index).values
+                for i in results])
+
+        metrics = pd.DataFrame(self.computeMetrics(
+            returns=stackColumn('returns'),
+            etf_restr_turnover=stackColumn('total_etf_restr_turnover'),
+            port_rebal_turnover=stackColumn('total_port_rebal_turnover'),
+            commissions=stackColumn('commissions'),
+            starting_value=np.array([(i['starting_cash'] +
+                i['starting_value']).iloc[0] if len(i) > 0 else np.nan
+                for i in results])
+        ), index=names)
+        metrics['mtime'] = [os.path.getmtime(result_files[i]) for i in names]
+
+        return metrics
+
+    def update(self, result_files: dict) -> pd.DataFrame:
+        """Function to score new (or modified) stored results, and add them to
+        the leaderboard.
+
+        Arguments:
+            result_files {dict} -- Dictionary of universe name -> results file
+                                   (see `ResultsReader.getResultFiles`).
+
+        Returns:
+            pd.DataFrame -- Ranked leaderboard (see `getLeaderboard`).
+        """
+
+        # Isolating unscored universes, and universes with modified results
+        pending = [i for i in sorted(result_files)
+            if i not in self.metrics.index or
+            os.path.getmtime(result_files[i]) != self.metrics.loc[i, 'mtime']]
+
+        logging.info('Scoring {0} of {1} universes ({2} up to date)'.format(
+            len(pending), len(result_files), len(result_files) - len(pending)))
+
+        for start in range(0, len(pending), self.block_size):
+            block = pending[start:start + self.block_size]
+            block_metrics = self.scoreBlock(result_files=dict(
+                (i, result_files[i]) for i in block))
+            self.metrics = pd.concat([self.metrics.drop(block,
+                errors='ignore'), block_metrics])
+
+            if self.metrics_file is not None:
+                self.metrics.to_pickle(self.metrics_file)
+
+        return self.getLeaderboard()
+
+    def getLeaderboard(self, metric: str='sharpe', ascending: bool=False)\
+        -> pd.DataFrame:
+        """Function to get the leaderboard of scored universes, ranked by a
+        metric.
+
+        Keyword Arguments:
+            metric {str} -- Ranking metric (default: {'sharpe'}).
+            ascending {bool} -- Rank in ascending order (default: {False}).
+
+        Returns:
+            pd.DataFrame -- Ranked metrics (universes x metrics).
+        """
+
+        if len(self.metrics) == 0:
+            return self.metrics
+
+        leaderboard = self.metrics.drop('mtime', axis=1)\
+            .sort_values(by=metric, ascending=ascending)
+        leaderboard.insert(0, 'rank', np.arange(1, len(leaderboard) + 1))
+
+        return leaderboard
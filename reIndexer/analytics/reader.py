@@ -0,0 +1,121 @@
+import logging
+import numpy as np
+import os
+import pandas as pd
+
+
+class ResultsReader():
+    """Class to read stored backtest results, one universe (and one column
+    block) at a time.
+
+    Backtest results are stored per universe, either as pickled zipline
+    results DataFrames (see `scripts/backtest_all.py`), or as streamed HDF5
+    results files (see `StreamingResultsWriter`). Only the requested columns
+    of each result are retained, so that the full results (positions, orders,
+    per-sector records, etc.) of many universes are never held in memory
+    together.
+    """
+
+    # Supported results file extensions
+    pickle_extensions = ('.pickle', '.pkl')
+    hdf_extensions = ('.h5', '.hdf5')
+
+    def __init__(self, results_folder: str):
+        """Initialization method for `ResultsReader`.
+
+        Arguments:
+            results_folder {str} -- Folder of stored backtest results; one
+                                    file per universe, named after the
+                                    universe.
+        """
+
+        self.results_folder = results_folder
+
+    def getResultFiles(self) -> dict:
+        """Function to get the stored results files in the results folder.
+
+        Returns:
+            dict -- Dictionary of universe name -> results file path.
+        """
+
+        result_files = dict()
+        for f in sorted(os.listdir(self.results_folder)):
+            if f.endswith(self.pickle_extensions + self.hdf_extensions):
+                # NOTE: Universe name is everything before the first '.'
+                #       (e.g. 'sp500..pickle' in `scripts/backtest_all.py`)
+                result_files[f.split('.')[0]] = os.path.join(
+                    self.results_folder, f)
+
+        logging.debug('Found {0} results files in {1}'.format(
+            len(result_files), self.results_folder))
+
+        return result_files
+
+    @classmethod
+    def readRawColumns(cls, path: str, columns: list) -> pd.DataFrame:
+        """Function to read a subset of the columns of a stored result, as
+        stored (i.e. without filling and conversion; see `readColumns`).
+
+        Arguments:
+            path {str} -- Results file path.
+            columns {list} -- Columns to be read.
+
+        Returns:
+            pd.DataFrame -- Result columns (dates x columns).
+        """
+
+        if path.endswith(cls.hdf_extensions):
+            # Streamed results; reading one chunk at a time
+            with pd.HDFStore(path, mode='r') as store:
+                chunks = [store.get(i).reindex(columns=columns)
+                          for i in sorted(store.keys())]
+            return pd.concat(chunks) if len(chunks) > 0 else\
+                pd.DataFrame(columns=columns)
+        elif path.endswith(cls.pickle_extensions):
+            return pd.read_pickle(path).reindex(columns=columns)
+
+        logging.error('Unsupported results file {0}'.format(path))
+        raise ValueError
+
+    @classmethod
+    def readColumns(cls, path: str, columns: list) -> pd.DataFrame:
+        """Function to read a subset of the (numeric) columns of a stored
+        result. Missing columns are filled with zeros (e.g. turnover records
+        of a universe that was never restructured).
+
+        Arguments:
+            path {str} -- Results file path.
+            columns {list} -- Columns to be read.
+
+        Returns:
+            pd.DataFrame -- Result columns (dates x columns).
+        """
+
+        return cls.readRawColumns(path=path, columns=columns).fillna(0)\
+            .astype(float)
+
+    @staticmethod
+    def computeCommissions(orders: pd.Series) -> pd.Series:
+        """Function to compute the commissions charged by zipline on each bar
+        from the orders column of a result. The commission of an order is
+        cumulative over its fills (and the order is listed on every bar it is
+        updated), so only the increase since its last listing is charged.
+
+        Arguments:
+            orders {pd.Series} -- Orders (lists of order dicts; dates).
+
+        Returns:
+            pd.Series -- Commissions (dollars; dates).
+        """
+
+        charged = dict()
+        commissions = np.zeros(len(orders))
+        for i, bar_orders in enumerate(orders.values):
+            if not isinstance(bar_orders, list):
+                continue
+            for order in bar_orders:
+                commission = order.get('commission') or 0.
+                commissions[i] += commission - charged.get(order['id'], 0.)
+                charged[order['id']] = commission
+
+        return pd.Series(commissions, index=orders.index)
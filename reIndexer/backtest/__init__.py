@@ -1 +1,8 @@
 from .zipline_backtest import Backtest
+from .session import BacktestSession
+from .vectorized import VectorizedBacktest
+from .screening import Screener
+from .walk_forward import WalkForward
+from .incremental import IncrementalBacktest, RunState
+from .local_search import UniverseEvaluator
+from .results import StreamingResultsWriter
@@ -1,7 +1,8 @@
 from ..cfg import config
+from ..kernels import segmentedTurnover
 
 from zipline.algorithm import TradingAlgorithm
-from zipline.api import record
+from zipline.api import record, symbols
 from zipline.protocol import BarData
 import numpy as np
 
@@ -33,6 +34,13 @@ class Bookkeeping():
                             self.total_etf_restr_turnover_label + \
                             self.port_rebal_turnover_labels + \
                             self.total_port_rebal_turnover_label
+        # Skipped rebalances and weight drift (drift rebalancing policy only)
+        self.port_rebal_skip_label = ['port_rebal_skipped']
+        self.port_rebal_drift_label = ['port_rebal_drift']
+        if config.rebalance_policy == 'drift':
+            self.clean_labels = self.clean_labels + \
+                                self.port_rebal_skip_label + \
+                                self.port_rebal_drift_label
         # Dictionary of zero-ed key-value paris
         self.clean_dict = dict(zip(self.clean_labels,
                                    [0] * len(self.clean_labels)))
@@ -68,14 +76,25 @@ class Bookkeeping():
             new_weights {np.array} -- New ETF asset allocation weights.
         """
         
-        # Computing absolute weight delta
-        abs_weights_delta = np.abs(new_weights - old_weights)
+        # Concatenating component weights of all ETFs (in sector order)
+        sector_labels = config.sector_universe.getSectorLabels()
+        offsets = np.cumsum([0] + [len(i) for i in old_weights])
+
+        # Getting current component asset prices (single lookup)
+        component_assets = list(symbols(*[j for i in sector_labels
+            for j in context.synthetics[i].getTickerList()]))
+        current_prices = zipline_data.current(
+            list(set(component_assets)),
+            'price'
+        ).loc[component_assets].values
 
         # Computing dollar value change, using current asset prices
-        etf_restr_turnover = [context.synthetics[i].getCurrentPrice(
-                zipline_data=zipline_data,
-                alloc_weights=abs_weights_delta[idx])
-            for idx, i in enumerate(config.sector_universe.getSectorLabels())]
+        etf_restr_turnover = segmentedTurnover(
+            old_weights=np.concatenate(old_weights),
+            new_weights=np.concatenate(new_weights),
+            prices=current_prices,
+            offsets=offsets
+        )
 
         # Computing total ETF restructure turnover
         etf_restr_total_turnover = np.sum(etf_restr_turnover)
@@ -105,12 +124,14 @@ class Bookkeeping():
             new_prices {np.array} -- New ETF prices (current rebalance).
         """
 
-        # Computing absolute weights delta
-        abs_weights_delta = np.abs(new_weights - old_weights)
-
         # Computing portfolio turnover (dollar value) for each of the ETFs,
         # using current asset prices
-        port_rebal_turnover = np.multiply(abs_weights_delta, new_prices)
+        port_rebal_turnover = segmentedTurnover(
+            old_weights=old_weights,
+            new_weights=new_weights,
+            prices=new_prices,
+            offsets=np.arange(len(new_weights) + 1)
+        )
 
         # Computing total turnover
         port_rebal_total_turnover = np.sum(port_rebal_turnover)
@@ -129,6 +150,22 @@ class Bookkeeping():
         # Adding to zipline record
         record(**log_dict)
 
+    def rebalanceDriftLog(self, drift: float, is_skipped: bool):
+        """Function to log the realized portfolio weight drift on a triggered
+        rebalance, and whether the rebalance was skipped (see
+        `config.rebalance_policy`).
+        
+        Arguments:
+            drift {float} -- Realized weight drift.
+            is_skipped {bool} -- Flag; True if the rebalance was skipped.
+        """
+
+        # Adding to zipline record
+        record(**{
+            self.port_rebal_skip_label[0]: int(is_skipped),
+            self.port_rebal_drift_label[0]: drift
+        })
+
     def etfDataLog(self, etf_prices: np.array, etf_weights: np.array):
         """Function to log ETF data, specifically ETF prices and corresponding
         portfolio weights.
@@ -0,0 +1,317 @@
+from .util import Utilities
+from .vectorized import VectorizedBacktest
+from ..cfg import config, getStorageDtype
+from ..kernels import allocatedHoldingReturns, allocatedPrices, segmentIds
+from ..portfolio import BatchMinimumVariance
+from ..sector_universe import Universe
+from ..synthetic_etf import PriceWeighting
+
+import logging
+import numpy as np
+import os
+import pandas as pd
+import pickle
+import uuid
+
+
+class RunState():
+    """Final state of a completed (vectorized) backtest run, such that the run
+    may be extended to new bars (see `IncrementalBacktest`).
+
+    The state holds the component tickers of each sector, the last (filled)
+    asset prices, the current allocation and price of each synthetic ETF, the
+    trailing ETF log returns (the rolling covariance lookback buffer), the
+    trigger calendar position (wildcard flags), the portfolio holdings of the
+    current rebalance period, and the cumulative portfolio wealth. The
+    configuration the run depends on is recorded, and checked on extension.
+    """
+
+    # Configuration attributes that the state depends on
+    config_keys = ('backtest_start', 'capital_base', 'rebalance_trigger',
+                   'setf_lookback_window', 'setf_restructure_trigger',
+                   'storage_dtype')
+
+    def __init__(self, universe_name: str, sector_tickers: dict,
+        last_prices: pd.Series, etf_allocations: dict, etf_prices: pd.Series,
+        log_rets: pd.DataFrame, last_month_restructure: int,
+        last_month_rebalance: int, sim_state: dict):
+        """Initialization method for `RunState`; records the configuration.
+
+        Arguments:
+            universe_name {str} -- Name of the sector universe.
+            sector_tickers {dict} -- Dictionary of sector label -> component
+                                     tickers.
+            last_prices {pd.Series} -- Last filled asset prices.
+            etf_allocations {dict} -- Dictionary of sector label -> current
+                                      ETF allocation weights.
+            etf_prices {pd.Series} -- Last ETF prices (sectors).
+            log_rets {pd.DataFrame} -- Trailing ETF log returns (lookback
+                                       window x sectors).
+            last_month_restructure {int} -- Restructure wildcard flag (see
+                                            `Utilities`).
+            last_month_rebalance {int} -- Rebalance wildcard flag (see
+                                          `Utilities`).
+            sim_state {dict} -- Portfolio simulation state (see
+                                `VectorizedBacktest.simulate`).
+        """
+
+        self.universe_name = universe_name
+        self.sector_tickers = sector_tickers
+        self.last_prices = last_prices
+        self.etf_allocations = etf_allocations
+        self.etf_prices = etf_prices
+        self.log_rets = log_rets
+        self.last_month_restructure = last_month_restructure
+        self.last_month_rebalance = last_month_rebalance
+        self.sim_state = sim_state
+        self.config = dict((i, getattr(config, i)) for i in self.config_keys)
+
+    def getDate(self) -> pd.Timestamp:
+        """Function to get the last simulated date of the run.
+
+        Returns:
+            pd.Timestamp -- Last simulated date.
+        """
+
+        return self.sim_state['date']
+
+    def checkConfig(self):
+        """Function to check that the configuration matches that of the run.
+
+        Raises:
+            ValueError -- Raised when the configuration differs.
+        """
+
+        changed = [i for i in self.config_keys
+                   if getattr(config, i) != self.config[i]]
+        if changed:
+            logging.error('Configuration changed since the run ({0}); cannot '
+                'extend the run'.format(', '.join(changed)))
+            raise ValueError
+
+    def save(self, state_file: str):
+        """Function to save the run state (atomically).
+
+        Arguments:
+            state_file {str} -- Run state file.
+        """
+
+        tmp_file = '{0}.tmp-{1}'.format(state_file, uuid.uuid4().hex)
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, state_file)
+
+    @staticmethod
+    def load(state_file: str):
+        """Function to load a run state.
+
+        Arguments:
+            state_file {str} -- Run state file.
+
+        Returns:
+            RunState -- Run state.
+        """
+
+        with open(state_file, 'rb') as f:
+            return pickle.load(f)
+
+
+class IncrementalBacktest():
+    """Module to run a vectorized backtest (see `VectorizedBacktest`), and to
+    extend a completed run to new bars without recomputing its history.
+
+    The final state of a run (see `RunState`) is persisted with the results;
+    an extension only reads the new bars, continues the synthetic ETF series,
+    the trigger calendar and the portfolio simulation from the state, and
+    solves the new rebalance dates only. The extended results are identical
+    to a full rerun over the extended range, up to floating point rounding of
+    the rolling covariances (within the optimizer tolerance of the weights).
+
+    NOTE: Missing prices in the new bars are filled as in `VectorizedBacktest`
+          (backward, then forward from the last filled prices); the last bars
+          of the completed run are not refilled from the new bars.
+    """
+
+    def __init__(self, sector_universe: Universe, periods_per_year: int=252):
+        """Initialization method for `IncrementalBacktest`.
+
+        Arguments:
+            sector_universe {Universe} -- Target simulation sector universe.
+
+        Keyword Arguments:
+            periods_per_year {int} -- Number of bars per year in the price
+                                      panel (default: {252}).
+        """
+
+        self.sector_universe = sector_universe
+        self.periods_per_year = periods_per_year
+
+    def run(self, prices: pd.DataFrame) -> tuple:
+        """Function to run the complete backtest, and capture its final
+        state.
+
+        Arguments:
+            prices {pd.DataFrame} -- Asset price panel (dates x tickers),
+                                     including the lookback window before the
+                                     start of the backtest.
+
+        Returns:
+            tuple -- Simulation results (pd.DataFrame; see
+                     `VectorizedBacktest.run`), and run state (RunState).
+        """
+
+        backtest = VectorizedBacktest(
+            sector_universe=self.sector_universe,
+            prices=prices,
+            periods_per_year=self.periods_per_year
+        )
+        log_rets, holding_rets = backtest.computeETFSeries()
+        weight_schedule = BatchMinimumVariance().computeWeightSchedule(
+            log_rets=log_rets)
+        results = backtest.simulate(
+            holding_rets=holding_rets,
+            weight_schedule=weight_schedule,
+            end=config.backtest_end
+        )
+
+        # Series up to (and including) the last simulated date
+        last_date = backtest.sim_state['date']
+        filled_prices = backtest.prices.loc[:last_date]
+        restructure_util = Utilities()
+        reset_rows, _ = segmentIds(reset_flags=restructure_util
+            .getRestructureFlags(dates=filled_prices.index))
+        rebalance_util = Utilities()
+        rebalance_util.getRebalanceFlags(dates=filled_prices.index[
+            filled_prices.index >= config.backtest_start])
+
+        sector_tickers = dict((i, self.sector_universe.getTickersInSector(
+            sector_label=i)) for i in self.sector_universe.getSectorLabels())
+        etf_allocations = dict((i, PriceWeighting().computeAllocations(
+            prices=filled_prices[j].values, reset_rows=reset_rows[-1:])[0])
+            for i, j in sector_tickers.items())
+        etf_prices = pd.Series(dict((i, filled_prices[j].values[-1].astype(
+            np.float64).dot(etf_allocations[i]))
+            for i, j in sector_tickers.items()))[list(sector_tickers)]
+
+        state = RunState(
+            universe_name=self.sector_universe.getUniverseName(),
+            sector_tickers=sector_tickers,
+            last_prices=filled_prices.iloc[-1],
+            etf_allocations=etf_allocations,
+            etf_prices=etf_prices,
+            log_rets=log_rets.loc[:last_date]
+                .iloc[-config.setf_lookback_window:],
+            last_month_restructure=restructure_util.last_month_restructure,
+            last_month_rebalance=rebalance_util.last_month_rebalance,
+            sim_state=backtest.sim_state
+        )
+
+        return results, state
+
+    def extend(self, state: RunState, prices: pd.DataFrame) -> tuple:
+        """Function to extend a completed run to the new bars of a price panel
+        (i.e. after the last simulated date of the run), up to the end of the
+        backtest in the configuration.
+
+        Arguments:
+            state {RunState} -- Run state (see `run`).
+            prices {pd.DataFrame} -- Asset price panel (dates x tickers); only
+                                     the bars after the run are read.
+
+        Raises:
+            ValueError -- Raised when the configuration differs from that of
+                          the run.
+
+        Returns:
+            tuple -- Simulation results of the new bars (pd.DataFrame; see
+                     `VectorizedBacktest.run`), and the extended run state
+                     (RunState).
+        """
+
+        state.checkConfig()
+
+        # Isolating and filling new bars (see `VectorizedBacktest`)
+        new_prices = prices.loc[(prices.index > state.getDate()) &
+            (prices.index <= config.backtest_end), state.last_prices.index]
+        logging.info('Extending run of {0} from {1} by {2} bars'.format(
+            state.universe_name, state.getDate(), len(new_prices)))
+        filled_prices = pd.concat([state.last_prices.to_frame().T,
+            new_prices.fillna(method='bfill')]).fillna(method='ffill')\
+            .astype(getStorageDtype())
+        new_dates = new_prices.index
+
+        # Continuing trigger calendars from the run
+        restructure_util = Utilities()
+        restructure_util.last_month_restructure = state.last_month_restructure
+        restructure_flags = np.append(False, restructure_util
+            .getRestructureFlags(dates=new_dates))
+        rebalance_util = Utilities()
+        rebalance_util.last_month_rebalance = state.last_month_rebalance
+        rebalance_dates = new_dates[rebalance_util.getRebalanceFlags(
+            dates=new_dates)]
+
+        # Continuing synthetic ETF series; the first segment keeps the
+        # allocation of the run
+        reset_rows, segment_ids = segmentIds(reset_flags=restructure_flags)
+        etf_allocations = dict()
+        etf_prices = dict()
+        holding_rets = dict()
+        for sector_label, tickers in state.sector_tickers.items():
+            sector_prices = filled_prices[tickers].values
+            alloc_weights = np.vstack([
+                state.etf_allocations[sector_label][None, :],
+                PriceWeighting().computeAllocations(prices=sector_prices,
+                    reset_rows=reset_rows[1:])
+            ])[None, :, :]
+            etf_prices[sector_label] = allocatedPrices(prices=sector_prices,
+                alloc_weights=alloc_weights, segment_ids=segment_ids)[0]
+            etf_prices[sector_label][0] = state.etf_prices[sector_label]
+            holding_rets[sector_label] = allocatedHoldingReturns(
+                prices=sector_prices, alloc_weights=alloc_weights,
+                segment_ids=segment_ids)[0][1:]
+            etf_allocations[sector_label] = alloc_weights[0, -1]
+
+        columns = list(state.sector_tickers)
+        etf_prices = pd.DataFrame(etf_prices, index=filled_prices.index,
+                                  columns=columns)
+        holding_rets = pd.DataFrame(holding_rets, index=new_dates,
+                                    columns=columns)
+        log_rets = pd.concat([state.log_rets,
+                              np.log(etf_prices).diff().iloc[1:]])
+
+        # Solving the new rebalance dates only
+        if len(rebalance_dates) > 0:
+            weight_schedule = BatchMinimumVariance().computeWeightSchedule(
+                log_rets=log_rets,
+                rebalance_dates=rebalance_dates
+            )
+        else:
+            weight_schedule = pd.DataFrame(columns=columns,
+                index=rebalance_dates, dtype=np.float64)
+
+        # Continuing the portfolio simulation
+        backtest = VectorizedBacktest(
+            sector_universe=self.sector_universe,
+            prices=filled_prices,
+            periods_per_year=self.periods_per_year
+        )
+        results = backtest.simulate(
+            holding_rets=holding_rets,
+            weight_schedule=weight_schedule,
+            end=config.backtest_end,
+            initial_state=state.sim_state
+        )
+
+        extended_state = RunState(
+            universe_name=state.universe_name,
+            sector_tickers=state.sector_tickers,
+            last_prices=filled_prices.iloc[-1],
+            etf_allocations=etf_allocations,
+            etf_prices=etf_prices.iloc[-1],
+            log_rets=log_rets.iloc[-config.setf_lookback_window:],
+            last_month_restructure=restructure_util.last_month_restructure,
+            last_month_rebalance=rebalance_util.last_month_rebalance,
+            sim_state=backtest.sim_state
+        )
+
+        return results, extended_state
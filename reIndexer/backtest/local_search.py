@@ -0,0 +1,354 @@
+from .util import Utilities
+from .vectorized import VectorizedBacktest
+from ..cfg import config
+from ..kernels import activeSetMinVar
+from ..portfolio import BatchMinimumVariance
+from ..sector_universe import Universe
+from ..synthetic_etf import PriceWeightedETF
+
+import copy
+import logging
+import numpy as np
+import pandas as pd
+
+
+class UniverseEvaluator():
+    """Module to evaluate the neighbours of a sector universe incrementally,
+    for sectorization local search.
+
+    The evaluated universe is held as its synthetic ETF series (see
+    `VectorizedBacktest`), the stacked rolling ETF covariance matrices of all
+    rebalance dates (see `BatchMinimumVariance`), and the minimum variance
+    weight schedule. A move (a ticker from one sector to another) only
+    changes the ETFs of the two sectors involved; only these ETF series, and
+    the corresponding rows and columns of the covariance matrices are
+    recomputed, and the minimum variance problems are re-solved from a warm
+    start (the current weights). Evaluating a neighbour therefore costs
+    O(affected sectors) ETF and covariance updates, instead of a full
+    evaluation.
+
+    The minimum variance problems are solved exactly (see `activeSetMinVar`),
+    so that the objective of a neighbour does not depend on the warm start;
+    i.e. it matches that of evaluating the neighbour from scratch, and moves
+    are compared on their covariances only.
+
+    Moves are evaluated as candidates (see `evaluateMoves`), and only applied
+    to the sector universe when accepted (see `acceptMoves`).
+    """
+
+    def __init__(self, sector_universe: Universe, prices: pd.DataFrame,
+        periods_per_year: int=252):
+        """Initialization method for `UniverseEvaluator`; evaluates the
+        initial sector universe.
+
+        Arguments:
+            sector_universe {Universe} -- Initial sector universe.
+            prices {pd.DataFrame} -- Asset price panel (dates x tickers),
+                                     including the lookback window before the
+                                     start of the backtest.
+
+        Keyword Arguments:
+            periods_per_year {int} -- Number of bars per year in the price
+                                      panel (default: {252}).
+        """
+
+        self.sector_universe = sector_universe
+        self.periods_per_year = periods_per_year
+
+        # Cleaning the price panel once (see `VectorizedBacktest`)
+        self.backtest = VectorizedBacktest(
+            sector_universe=sector_universe,
+            prices=prices,
+            periods_per_year=periods_per_year
+        )
+        self.restructure_flags = Utilities().getRestructureFlags(
+            dates=self.backtest.prices.index
+        )
+
+        log_rets, holding_rets = self.backtest.computeETFSeries()
+
+        # Rebalance dates, and rolling window bounds (see
+        # `BatchMinimumVariance.rollingCovariances`)
+        solver = BatchMinimumVariance()
+        self.rebalance_dates = solver.getRebalanceDates(log_rets.index)
+        self.window_ends = log_rets.index.get_indexer(self.rebalance_dates) + 1
+        self.window_starts = np.maximum(self.window_ends -
+            (config.setf_lookback_window - 1), 0)
+
+        cov_mats = solver.rollingCovariances(
+            log_rets=log_rets,
+            rebalance_dates=self.rebalance_dates
+        )
+
+        self.current = self.evaluate(
+            sector_universe=sector_universe,
+            log_rets=log_rets,
+            holding_rets=holding_rets,
+            cov_mats=cov_mats,
+            weights=self.solveAll(cov_mats=cov_mats)
+        )
+        self.candidate = None
+
+        logging.info('Evaluated universe {0}; objective {1}'.format(
+            sector_universe.getUniverseName(), self.current['objective']))
+
+    def evaluate(self, sector_universe: Universe, log_rets: pd.DataFrame,
+        holding_rets: pd.DataFrame, cov_mats: np.ndarray,
+        weights: np.ndarray) -> dict:
+        """Function to compute the objective and summary metrics of a solved
+        sector universe.
+
+        Arguments:
+            sector_universe {Universe} -- Sector universe.
+            log_rets {pd.DataFrame} -- ETF log returns (dates x sectors).
+            holding_rets {pd.DataFrame} -- ETF holding returns (dates x
+                                           sectors).
+            cov_mats {np.ndarray} -- Covariance matrices (rebalance dates x
+                                     sectors x sectors).
+            weights {np.ndarray} -- Portfolio weights (rebalance dates x
+                                    sectors).
+
+        Returns:
+            dict -- Evaluation; the universe, the ETF series, covariances and
+                    weights, the objective (mean minimum portfolio variance
+                    over the rebalance dates), and the summary metrics (see
+                    `VectorizedBacktest.summarize`).
+        """
+
+        weight_schedule = pd.DataFrame(weights, index=self.rebalance_dates,
+                                       columns=log_rets.columns)
+        results = self.backtest.simulate(
+            holding_rets=holding_rets,
+            weight_schedule=weight_schedule,
+            end=config.backtest_end
+        )
+
+        return {
+            'sector_universe': sector_universe,
+            'log_rets': log_rets,
+            'holding_rets': holding_rets,
+            'cov_mats': cov_mats,
+            'weights': weights,
+            'objective': np.mean(np.einsum('di,dij,dj->d', weights, cov_mats,
+                                           weights)),
+            'metrics': VectorizedBacktest.summarize(
+                returns=results['returns'],
+                periods_per_year=self.periods_per_year
+            )
+        }
+
+    def getObjective(self) -> float:
+        """Function to get the objective of the current sector universe.
+
+        Returns:
+            float -- Mean minimum portfolio variance over the rebalance dates.
+        """
+
+        return self.current['objective']
+
+    def getMetrics(self) -> dict:
+        """Function to get the summary metrics of the current sector universe.
+
+        Returns:
+            dict -- Summary metrics (see `VectorizedBacktest.summarize`).
+        """
+
+        return self.current['metrics']
+
+    def solveAll(self, cov_mats: np.ndarray,
+        prev_weights: np.ndarray=None) -> np.ndarray:
+        """Function to solve the minimum variance problems of all rebalance
+        dates exactly (see `activeSetMinVar`).
+
+        Arguments:
+            cov_mats {np.ndarray} -- Covariance matrices (rebalance dates x
+                                     sectors x sectors).
+
+        Keyword Arguments:
+            prev_weights {np.ndarray} -- Initial weights (rebalance dates x
+                                         sectors) (default: {None}; equal
+                                         weights).
+
+        Returns:
+            np.ndarray -- Portfolio weights (rebalance dates x sectors).
+        """
+
+        if prev_weights is None:
+            prev_weights = np.full(cov_mats.shape[:2], 1. / cov_mats.shape[1])
+
+        return np.array([activeSetMinVar(cov_mat=i, x0=j)
+                         for i, j in zip(cov_mats, prev_weights)])
+
+    def computeSectorSeries(self, tickers: list) -> tuple:
+        """Function to compute the synthetic ETF series of a single sector
+        (see `VectorizedBacktest.computeETFSeries`).
+
+        Arguments:
+            tickers {list} -- Component tickers.
+
+        Returns:
+            tuple -- ETF log returns (np.array), and ETF holding returns
+                     (np.array).
+        """
+
+        sector_prices = self.backtest.prices[tickers].values
+        etf_prices = PriceWeightedETF.computeSyntheticPrices(
+            prices=sector_prices,
+            restructure_flags=self.restructure_flags
+        )
+
+        return np.diff(np.log(etf_prices)), PriceWeightedETF\
+            .computeHoldingReturns(
+                prices=sector_prices,
+                restructure_flags=self.restructure_flags
+            )
+
+    def computeCovarianceColumns(self, log_rets: np.ndarray,
+        columns: list) -> np.ndarray:
+        """Function to compute the rolling covariances between a subset of
+        ETF columns and all ETF columns, for each of the rebalance dates.
+
+        Arguments:
+            log_rets {np.ndarray} -- ETF log returns (dates x sectors).
+            columns {list} -- Column positions.
+
+        Returns:
+            np.ndarray -- Covariances (rebalance dates x columns x sectors).
+        """
+
+        rets = np.asarray(log_rets, dtype=np.float64)
+        n_obs = (self.window_ends - self.window_starts).astype(np.float64)
+
+        # Window sums from cumulative sums (of the returns, and of the cross
+        # products of the columns with all returns)
+        cum_sum = np.vstack([np.zeros(rets.shape[1]), np.cumsum(rets,
+                                                                axis=0)])
+        cum_prod = np.concatenate([np.zeros((1, len(columns), rets.shape[1])),
+            np.cumsum(rets[:, columns, None] * rets[:, None, :], axis=0)])
+        win_sum = cum_sum[self.window_ends] - cum_sum[self.window_starts]
+        win_prod = cum_prod[self.window_ends] - cum_prod[self.window_starts]
+
+        # Sample covariance (unbiased), annualized
+        return (win_prod - win_sum[:, columns, None] * win_sum[:, None, :] /
+            n_obs[:, None, None]) / (n_obs - 1)[:, None, None] *\
+            config.setf_lookback_window
+
+    def evaluateMoves(self, moves: list) -> dict:
+        """Function to evaluate the neighbour of the current sector universe
+        given by a list of moves, without applying them (see `acceptMoves`).
+
+        Arguments:
+            moves {list} -- List of (ticker, from sector, to sector) moves.
+
+        Raises:
+            KeyError -- Raised when a ticker is not in its source sector.
+
+        Returns:
+            dict -- Objective ('objective'), and summary metrics ('metrics')
+                    of the neighbour.
+        """
+
+        # Discarding the previous candidate (also if the moves are invalid)
+        self.candidate = None
+        current = self.current
+
+        # Applying moves to a copy of the universe
+        sector_universe = copy.copy(current['sector_universe'])
+        sector_universe.sectors = dict(sector_universe.sectors)
+        sector_universe.sector_labels = list(sector_universe.sector_labels)
+        for ticker, from_sector, to_sector in moves:
+            sector_universe.moveTicker(ticker=ticker, from_sector=from_sector,
+                                       to_sector=to_sector)
+        sector_labels = sector_universe.getSectorLabels()
+        affected = [i for i in sector_labels if i in set().union(
+            *[(j[1], j[2]) for j in moves])]
+
+        # Carrying over unaffected ETF series, covariances and weights
+        old_labels = list(current['log_rets'].columns)
+        kept = [i for i in sector_labels if i in old_labels]
+        kept_pos = np.array([old_labels.index(i) for i in kept], dtype=int)
+        new_pos = np.array([sector_labels.index(i) for i in kept], dtype=int)
+        n_sectors = len(sector_labels)
+
+        log_rets = current['log_rets'].reindex(columns=sector_labels)
+        holding_rets = current['holding_rets'].reindex(columns=sector_labels)
+        cov_mats = np.zeros((len(self.rebalance_dates), n_sectors, n_sectors))
+        cov_mats[:, new_pos[:, None], new_pos] = current['cov_mats'][:,
+            kept_pos[:, None], kept_pos]
+        prev_weights = np.full((len(self.rebalance_dates), n_sectors),
+                               1. / n_sectors)
+        prev_weights[:, new_pos] = current['weights'][:, kept_pos]
+        prev_weights /= prev_weights.sum(axis=1)[:, None]
+
+        # Recomputing the affected ETF series
+        for sector_label in affected:
+            sector_log_rets, sector_holding_rets = self.computeSectorSeries(
+                tickers=sector_universe.getTickersInSector(sector_label))
+            log_rets[sector_label] = sector_log_rets
+            holding_rets[sector_label] = sector_holding_rets
+
+        # Recomputing the affected rows and columns of the covariances
+        columns = [sector_labels.index(i) for i in affected]
+        if columns:
+            cov_cols = self.computeCovarianceColumns(log_rets=log_rets.values,
+                                                     columns=columns)
+            cov_mats[:, columns, :] = cov_cols
+            cov_mats[:, :, columns] = np.transpose(cov_cols, (0, 2, 1))
+
+        # Re-solving from a warm start (current weights)
+        weights = self.solveAll(cov_mats=cov_mats, prev_weights=prev_weights)
+
+        self.candidate = (list(moves), self.evaluate(
+            sector_universe=sector_universe,
+            log_rets=log_rets,
+            holding_rets=holding_rets,
+            cov_mats=cov_mats,
+            weights=weights
+        ))
+
+        logging.debug('Evaluated {0} move(s) over {1} sector(s); objective '
+            '{2}'.format(len(moves), len(affected),
+                         self.candidate[1]['objective']))
+
+        return {'objective': self.candidate[1]['objective'],
+                'metrics': self.candidate[1]['metrics']}
+
+    def acceptMoves(self):
+        """Function to accept the last evaluated moves (see `evaluateMoves`);
+        the moves are applied to the sector universe, and the neighbour
+        becomes the current evaluation.
+
+        Raises:
+            ValueError -- Raised when no moves have been evaluated.
+        """
+
+        if self.candidate is None:
+            logging.error('No evaluated moves to accept')
+            raise ValueError
+
+        moves, evaluation = self.candidate
+        for ticker, from_sector, to_sector in moves:
+            self.sector_universe.moveTicker(ticker=ticker,
+                                            from_sector=from_sector,
+                                            to_sector=to_sector)
+        evaluation['sector_universe'] = self.sector_universe
+
+        self.current = evaluation
+        self.candidate = None
+
+    def applyMoves(self, moves: list) -> dict:
+        """Function to evaluate and accept a list of moves (see
+        `evaluateMoves` and `acceptMoves`).
+
+        Arguments:
+            moves {list} -- List of (ticker, from sector, to sector) moves.
+
+        Returns:
+            dict -- Objective ('objective'), and summary metrics ('metrics')
+                    of the updated sector universe.
+        """
+
+        evaluation = self.evaluateMoves(moves=moves)
+        self.acceptMoves()
+
+        return evaluation
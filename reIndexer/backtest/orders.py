@@ -0,0 +1,67 @@
+from zipline.api import order_target_percent, symbol
+import logging
+
+
+class OrderIntents():
+    """Order-intent layer to consolidate the target positions of all trading
+    operations within a single bar.
+
+    Portfolio rebalancing and ETF restructuring may both be triggered on the
+    same bar, and each computes complete target positions for every asset.
+    Instead of submitting orders for each operation (i.e. two orders per asset
+    on coincident trigger days, the first to an intermediate target), each
+    operation records its target portfolio weights here, and a single net
+    order per asset is submitted at the end of the bar (see `flush`).
+
+    NOTE: Turnover attribution to each operation is computed from the weights
+          (see `Bookkeeping`), and is not affected by the netting of orders.
+    """
+
+    def __init__(self):
+        """Initialization method for `OrderIntents`.
+        """
+
+        # Dictionary of ticker -> target portfolio weight
+        self.targets = dict()
+        # Number of operations recorded since the last flush
+        self.n_operations = 0
+
+    def setTargets(self, targets: dict):
+        """Function to record the target portfolio weights of a trading
+        operation; supersedes the targets of earlier operations in the bar.
+
+        Arguments:
+            targets {dict} -- Dictionary of ticker -> target portfolio weight.
+        """
+
+        self.targets.update(targets)
+        self.n_operations += 1
+
+    def hasPending(self) -> bool:
+        """Function to check if there are pending target positions.
+
+        Returns:
+            bool -- True if there are pending target positions.
+        """
+
+        return len(self.targets) > 0
+
+    def flush(self):
+        """Function to submit one net order per asset for the pending target
+        positions, and clear them.
+        """
+
+        if not self.hasPending():
+            return
+
+        for ticker, target in self.targets.items():
+            # Executing trade to update weight in the portfolio
+            order_target_percent(asset=symbol(ticker), target=target)
+            logging.debug('Updated portfolio ticker {0} weight to {1}%'.
+                format(ticker, target * 100))
+
+        logging.debug('Submitted {0} net orders for {1} trading operations'
+            .format(len(self.targets), self.n_operations))
+
+        self.targets = dict()
+        self.n_operations = 0
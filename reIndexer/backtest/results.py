@@ -0,0 +1,130 @@
+import logging
+import os
+import pandas as pd
+import warnings
+
+
+class StreamingResultsWriter():
+    """Sink to stream zipline simulation results to disk, in chunks, while a
+    backtest is running.
+
+    zipline's `TradingAlgorithm.run` holds every daily performance message (and
+    every `record`ed column) in memory until the end of the simulation. This
+    module buffers the daily performance messages of a single chunk (e.g. one
+    month of bars) only, and appends each completed chunk to an HDF5 file as a
+    separate (columnar) node. Memory use during the run is bounded by the chunk
+    size, and the store is closed between chunks, so that partial results can
+    be read (see `read`) while the simulation is still running.
+
+    NOTE: Chunks are stored in the 'fixed' HDF5 format, as the positions,
+          orders and transactions columns of the results are lists of dicts.
+    """
+
+    def __init__(self, path: str, chunk_rule: str='M'):
+        """Initialization method for `StreamingResultsWriter`.
+
+        Arguments:
+            path {str} -- Output HDF5 file; overwritten if it exists.
+
+        Keyword Arguments:
+            chunk_rule {str} -- Pandas period alias of the chunks
+                                (default: {'M'}; one month of bars).
+        """
+
+        self.path = path
+        self.chunk_rule = chunk_rule
+
+        if os.path.exists(self.path):
+            logging.info('Overwriting existing results file {0}'
+                .format(self.path))
+            os.remove(self.path)
+
+        self.buffer = list()
+        self.buffer_period = None
+        self.n_chunks = 0
+        self.n_bars = 0
+        self.risk_report = None
+
+    def write(self, perf: dict):
+        """Function to write a single zipline performance message; completed
+        chunks are flushed to disk.
+
+        Arguments:
+            perf {dict} -- Zipline performance message (from
+                           `TradingAlgorithm.get_generator`).
+        """
+
+        # Final risk report message
+        if 'daily_perf' not in perf:
+            self.risk_report = perf
+            return
+
+        # Flattening message (mirrors `TradingAlgorithm._create_daily_stats`)
+        daily_perf = dict(perf['daily_perf'])
+        daily_perf.update(daily_perf.pop('recorded_vars'))
+        daily_perf.update(perf['cumulative_risk_metrics'])
+
+        period = pd.Timestamp(daily_perf['period_close']).tz_convert(None)\
+            .to_period(self.chunk_rule)
+        if self.buffer_period is not None and period != self.buffer_period:
+            self.flush()
+        self.buffer_period = period
+        self.buffer.append(daily_perf)
+
+    def flush(self):
+        """Function to append the buffered chunk to the results file.
+        """
+
+        if len(self.buffer) == 0:
+            return
+
+        chunk = pd.DataFrame(self.buffer, index=pd.DatetimeIndex(
+            [i['period_close'] for i in self.buffer], tz='UTC'))
+
+        # Converting numeric object columns (e.g. risk metrics that are None
+        # on the first bars); list columns are pickled
+        for column in chunk.columns[chunk.dtypes == object]:
+            try:
+                chunk[column] = pd.to_numeric(chunk[column])
+            except (TypeError, ValueError):
+                pass
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+            with pd.HDFStore(self.path, mode='a') as store:
+                store.put('chunk_{0:06d}'.format(self.n_chunks), chunk,
+                          format='fixed')
+
+        logging.debug('Wrote results chunk {0} ({1} bars) to {2}'.format(
+            self.n_chunks, len(self.buffer), self.path))
+
+        self.n_chunks += 1
+        self.n_bars += len(self.buffer)
+        self.buffer = list()
+
+    def close(self):
+        """Function to flush the last (partial) chunk.
+        """
+
+        self.flush()
+        self.buffer_period = None
+
+        logging.info('Wrote {0} bars in {1} chunks to {2}'.format(
+            self.n_bars, self.n_chunks, self.path))
+
+    @staticmethod
+    def read(path: str) -> pd.DataFrame:
+        """Function to read (possibly partial) streamed simulation results.
+
+        Arguments:
+            path {str} -- Results HDF5 file.
+
+        Returns:
+            pd.DataFrame -- Zipline simulation results of all completed chunks.
+        """
+
+        with pd.HDFStore(path, mode='r') as store:
+            keys = sorted(store.keys())
+            if len(keys) == 0:
+                return pd.DataFrame()
+            return pd.concat([store.get(i) for i in keys])
@@ -0,0 +1,175 @@
+from .session import BacktestSession
+from .vectorized import VectorizedBacktest
+from ..cfg import config, overrideConfig
+
+import copy
+import logging
+import numpy as np
+import pandas as pd
+
+
+class Screener():
+    """Module to run a coarse-to-fine screening of candidate sector universes.
+
+    All candidate universes are first scored with a cheap, low-resolution
+    `VectorizedBacktest` (resampled prices, shortened window, no order
+    simulation). Full-fidelity `Backtest` runs are then only made for the
+    top-K candidates, and/or the candidates within a margin of the best
+    screening score. The output is a ranked report of both passes.
+
+    NOTE: The candidate universes are not modified; both passes run on copies
+          (backtests remove the tickers missing from the data).
+    """
+
+    def __init__(self, prices: pd.DataFrame, session: BacktestSession=None,
+        top_k: int=5, margin: float=None, metric: str='sharpe',
+        resample_rule: str='W-FRI', periods_per_year: int=52,
+        screen_years: int=2, screen_start: pd.Timestamp=None):
+        """Initialization method for `Screener`.
+
+        Arguments:
+            prices {pd.DataFrame} -- Daily asset price panel (dates x tickers),
+                                     including the lookback window before the
+                                     start of the screening window.
+
+        Keyword Arguments:
+            session {BacktestSession} -- Session used for the full backtests;
+                                         a new session is loaded if None
+                                         (default: {None}).
+            top_k {int} -- Number of top screened universes to run in full
+                           (default: {5}).
+            margin {float} -- Also run universes with screening score within
+                              this margin of the best (default: {None}).
+            metric {str} -- Ranking metric; see `VectorizedBacktest.summarize`
+                            (default: {'sharpe'}).
+            resample_rule {str} -- Pandas resampling rule for the screening
+                                   prices (default: {'W-FRI'}).
+            periods_per_year {int} -- Bars per year after resampling
+                                      (default: {52}).
+            screen_years {int} -- Length of the (shortened) screening window,
+                                  in years; the window ends at the end of the
+                                  backtest (or the last date of the prices,
+                                  if earlier), and starts no earlier than the
+                                  start of the backtest (default: {2}).
+            screen_start {pd.Timestamp} -- Start of the screening window;
+                                           overrides `screen_years`
+                                           (default: {None}).
+        """
+
+        self.session = session
+        self.top_k = top_k
+        self.margin = margin
+        self.metric = metric
+        self.periods_per_year = periods_per_year
+        if screen_start is None:
+            screen_end = min(config.backtest_end, prices.index[-1])
+            screen_start = max(config.backtest_start,
+                               screen_end - pd.DateOffset(years=screen_years))
+        self.screen_start = screen_start
+
+        # Resampling prices once for all universes
+        self.screen_prices = prices.resample(resample_rule).last()
+
+        # Lookback window at the screening resolution
+        self.screen_lookback = int(np.ceil(config.setf_lookback_window *
+            periods_per_year / 252.))
+
+    def screenUniverse(self, sector_universe) -> dict:
+        """Function to compute the screening metrics of a sector universe.
+
+        Arguments:
+            sector_universe {Universe} -- Candidate sector universe.
+
+        Returns:
+            dict -- Screening metrics.
+        """
+
+        with overrideConfig({'setf_lookback_window': self.screen_lookback,
+                             'backtest_start': self.screen_start}):
+            results = VectorizedBacktest(
+                sector_universe=copy.deepcopy(sector_universe),
+                prices=self.screen_prices,
+                periods_per_year=self.periods_per_year
+            ).run()
+
+        return VectorizedBacktest.summarize(
+            returns=results['returns'],
+            periods_per_year=self.periods_per_year
+        )
+
+    def screen(self, sector_universes: list) -> pd.DataFrame:
+        """Function to screen a list of candidate sector universes.
+
+        Arguments:
+            sector_universes {list} -- Candidate sector universes.
+
+        Returns:
+            pd.DataFrame -- Screening metrics (universes x metrics), ranked by
+                            the screening metric.
+        """
+
+        scores = pd.DataFrame(dict((i.getUniverseName(),
+            self.screenUniverse(sector_universe=i))
+            for i in sector_universes)).T
+
+        return scores.sort_values(by=self.metric, ascending=False)
+
+    def selectFinalists(self, scores: pd.DataFrame) -> list:
+        """Function to select the universes to be run in full, from ranked
+        screening metrics.
+
+        Arguments:
+            scores {pd.DataFrame} -- Ranked screening metrics.
+
+        Returns:
+            list -- Names of the selected universes (in rank order).
+        """
+
+        selected = np.zeros(len(scores), dtype=bool)
+        if self.top_k:
+            selected[:self.top_k] = True
+        if self.margin is not None:
+            selected |= (scores[self.metric].values >=
+                scores[self.metric].max() - self.margin)
+
+        return list(scores.index[selected])
+
+    def run(self, sector_universes: list) -> pd.DataFrame:
+        """Function to run the complete screening pipeline.
+
+        Arguments:
+            sector_universes {list} -- Candidate sector universes.
+
+        Returns:
+            pd.DataFrame -- Ranked report; screening metrics (prefixed with
+                            'screen_'), finalist flag, and full backtest
+                            metrics (finalists only).
+        """
+
+        scores = self.screen(sector_universes=sector_universes)
+        finalists = self.selectFinalists(scores=scores)
+
+        logging.info('Screened {0} universes; running {1} in full'
+            .format(len(scores), len(finalists)))
+
+        if self.session is None:
+            self.session = BacktestSession()
+
+        universes = dict((i.getUniverseName(), i) for i in sector_universes)
+        full_metrics = dict()
+        for universe_name in finalists:
+            results = self.session.run(
+                sector_universe=copy.deepcopy(universes[universe_name]))
+            full_metrics[universe_name] = VectorizedBacktest.summarize(
+                returns=results['returns']
+            )
+
+        report = scores.add_prefix('screen_')
+        report['finalist'] = report.index.isin(finalists)
+        # NaN full metrics for universes not run in full (also with no
+        # finalists)
+        report = report.join(pd.DataFrame(full_metrics, index=scores.columns,
+            columns=scores.index, dtype=np.float64).T)
+
+        return report.sort_values(by=[self.metric, 'screen_' + self.metric],
+                                  ascending=False)
@@ -0,0 +1,334 @@
+from .results import StreamingResultsWriter
+from .zipline_backtest import Backtest
+from ..cfg import config, overrideConfig
+from ..data import PricePanel
+from ..sector_universe import Universe, UniverseValidator
+
+from zipline.algorithm import TradingAlgorithm
+from zipline.data import bundles
+from zipline.data.data_portal import DataPortal
+from zipline.finance.trading import TradingEnvironment
+from zipline.utils.calendars import get_calendar
+from zipline.utils.factory import create_simulation_parameters
+import logging
+import os
+import pandas as pd
+import re
+
+
+class BacktestSession():
+    """Class to run many backtests against a single loaded data bundle.
+
+    Each call to zipline's `run_algorithm` reloads the data bundle, the asset
+    finder, the trading calendar and the data portal. This module loads these
+    once, and runs any number of sector universes (and/or configuration
+    overrides) against the same in-memory data portal, removing the fixed
+    startup cost from each individual run.
+    """
+
+    def __init__(self, bundle: str=None, calendar_name: str='NYSE'):
+        """Initialization method for `BacktestSession`. Loads the data bundle,
+        and builds the trading environment and data portal.
+
+        Keyword Arguments:
+            bundle {str} -- Name of the zipline data bundle
+                            (default: {None}; uses `config.bundle`).
+            calendar_name {str} -- Trading calendar name (default: {'NYSE'}).
+        """
+
+        self.bundle = config.bundle if bundle is None else bundle
+
+        # Loading bundle and trading calendar
+        self.bundle_data = bundles.load(self.bundle, os.environ)
+        self.trading_calendar = get_calendar(calendar_name)
+
+        # Building trading environment from the bundle asset database
+        # NOTE: This mirrors the setup in zipline's `run_algorithm`
+        _, asset_db_path = re.split(r'sqlite:///',
+            str(self.bundle_data.asset_finder.engine.url), maxsplit=1)
+        self.env = TradingEnvironment(
+            asset_db_path=asset_db_path,
+            environ=os.environ
+        )
+
+        # Building data portal
+        self.data_portal = DataPortal(
+            self.env.asset_finder,
+            trading_calendar=self.trading_calendar,
+            first_trading_day=self.bundle_data.equity_minute_bar_reader\
+                .first_trading_day,
+            equity_minute_reader=self.bundle_data.equity_minute_bar_reader,
+            equity_daily_reader=self.bundle_data.equity_daily_bar_reader,
+            adjustment_reader=self.bundle_data.adjustment_reader
+        )
+
+        # Universe validators, by validation date (see `validateUniverse`)
+        self.validators = dict()
+
+        logging.info('Loaded data bundle {0} for backtest session'
+            .format(self.bundle))
+
+    def getAssetFinder(self):
+        """Function to get the asset finder of the loaded bundle.
+
+        Returns:
+            AssetFinder -- Zipline asset finder.
+        """
+
+        return self.env.asset_finder
+
+    def getDataPortal(self) -> DataPortal:
+        """Function to get the data portal of the loaded bundle.
+
+        Returns:
+            DataPortal -- Zipline data portal.
+        """
+
+        return self.data_portal
+
+    def getPriceHistory(self, tickers: list, start: pd.Timestamp,
+        end: pd.Timestamp, frequency: str='1d') -> pd.DataFrame:
+        """Function to get the raw (unadjusted and unfilled) close price
+        history of a list of tickers between two dates from the bar readers of
+        the loaded bundle; missing bars are NaN.
+
+        NOTE: Unlike the data portal history, prices are not adjusted for
+              splits and dividends (see `getPriceAdjustments`), as any
+              adjustment depends on the date the prices are read at.
+
+        Arguments:
+            tickers {list} -- List of tickers.
+            start {pd.Timestamp} -- Start date.
+            end {pd.Timestamp} -- End date.
+
+        Keyword Arguments:
+            frequency {str} -- '1d' or '1m' for daily/minute bars respectively
+                               (default: {'1d'}).
+
+        Returns:
+            pd.DataFrame -- Raw price history (dates x tickers).
+        """
+
+        # Isolating sessions (and bars) in the date range
+        sessions = self.trading_calendar.sessions_in_range(
+            pd.Timestamp(start.date(), tz='UTC'),
+            pd.Timestamp(end.date(), tz='UTC')
+        )
+        if frequency == '1m':
+            index = self.trading_calendar.minutes_for_sessions_in_range(
+                sessions[0], sessions[-1])
+            bar_reader = self.bundle_data.equity_minute_bar_reader
+        else:
+            index = sessions
+            bar_reader = self.bundle_data.equity_daily_bar_reader
+
+        assets = self.env.asset_finder.lookup_symbols(tickers,
+            as_of_date=None)
+        closes = bar_reader.load_raw_arrays(
+            ['close'],
+            index[0],
+            index[-1],
+            [i.sid for i in assets]
+        )[0]
+
+        return pd.DataFrame(closes, index=index, columns=tickers)
+
+    def getPriceAdjustments(self, tickers: list) -> dict:
+        """Function to get the price adjustments (splits, mergers and
+        dividends) of a list of tickers from the adjustment reader of the
+        loaded bundle, as applied by zipline to price histories.
+
+        Arguments:
+            tickers {list} -- List of tickers.
+
+        Returns:
+            dict -- Dictionary of ticker -> list of (effective date, ratio)
+                    adjustments.
+        """
+
+        assets = self.env.asset_finder.lookup_symbols(tickers,
+            as_of_date=None)
+        adjustment_reader = self.bundle_data.adjustment_reader
+
+        return dict((i, [tuple(k) for j in ['splits', 'mergers', 'dividends']
+            for k in adjustment_reader.get_adjustments_for_sid(j, asset.sid)])
+            for i, asset in zip(tickers, assets))
+
+    def validateUniverse(self, sector_universe: Universe) -> Universe:
+        """Function to validate a sector universe against the loaded bundle
+        before the simulation (see `UniverseValidator`). Validators (and their
+        per-ticker results) are shared by all universes in the session.
+
+        Arguments:
+            sector_universe {Universe} -- Candidate sector universe.
+
+        Returns:
+            Universe -- 'Clean' sector universe.
+        """
+
+        first_session = self.trading_calendar.minute_to_session_label(
+            pd.Timestamp(config.backtest_start).tz_convert('UTC'),
+            direction='next'
+        )
+
+        if first_session not in self.validators:
+            self.validators[first_session] = UniverseValidator(
+                asset_finder=self.env.asset_finder,
+                as_of_date=first_session
+            )
+
+        return self.validators[first_session].validate(
+            sector_universe=sector_universe
+        )
+
+    def buildPricePanel(self, sector_universe: Universe) -> PricePanel:
+        """Function to build the cleaned price panel of a sector universe for
+        the backtest window in the configuration, including the lookback
+        window before the start of the backtest.
+
+        Arguments:
+            sector_universe {Universe} -- Sector universe.
+
+        Returns:
+            PricePanel -- Cleaned price panel.
+        """
+
+        # Sessions required for the lookback window before the backtest start
+        lookback_sessions = config.setf_lookback_window
+        if config.setf_data_frequency == '1m':
+            lookback_sessions = lookback_sessions // 390 + 1
+        all_sessions = self.trading_calendar.all_sessions
+        start_pos = all_sessions.searchsorted(
+            pd.Timestamp(config.backtest_start.date(), tz='UTC'))
+
+        tickers = sorted(set().union(*[sector_universe.getTickersInSector(i)
+            for i in sector_universe.getSectorLabels()]))
+        assets = self.env.asset_finder.lookup_symbols(tickers,
+            as_of_date=None)
+
+        # NOTE: The panel holds raw prices; adjustments are applied as of the
+        #       end of each window read (see `PricePanel.getWindow`)
+        return PricePanel(
+            prices=self.getPriceHistory(
+                tickers=tickers,
+                start=all_sessions[max(start_pos - lookback_sessions, 0)],
+                end=config.backtest_end,
+                frequency=config.setf_data_frequency
+            ),
+            adjustments=self.getPriceAdjustments(tickers=tickers),
+            end_dates=dict((i, j.end_date) for i, j in zip(tickers, assets))
+        )
+
+    def run(self, sector_universe: Universe, config_overrides: dict=None,
+        results_writer: StreamingResultsWriter=None, **backtest_kwargs)\
+        -> pd.DataFrame:
+        """Function to run a backtest for a sector universe against the loaded
+        data portal. Configuration overrides are applied for the duration of
+        the run only.
+
+        Arguments:
+            sector_universe {Universe} -- Target simulation sector universe.
+
+        Keyword Arguments:
+            config_overrides {dict} -- Configuration attribute -> value
+                                       overrides (default: {None}).
+            results_writer {StreamingResultsWriter} -- Sink to stream the
+                                                       results to disk while
+                                                       the simulation runs;
+                                                       results are held in
+                                                       memory if None
+                                                       (default: {None}).
+            **backtest_kwargs -- Additional `Backtest` initialization
+                                 arguments.
+
+        Returns:
+            pd.DataFrame -- Zipline simulation results; None if the results
+                            are streamed to `results_writer`.
+        """
+
+        # NOTE: The loaded bundle is set in the configuration for the run (see
+        #       `SyntheticETFCache.makeKey`)
+        with overrideConfig(dict({'bundle': self.bundle},
+                                 **(config_overrides or dict()))):
+            self.validateUniverse(sector_universe=sector_universe)
+            if config.setf_price_panel and 'price_panel' not in backtest_kwargs:
+                backtest_kwargs['price_panel'] = self.buildPricePanel(
+                    sector_universe=sector_universe
+                )
+            backtest = Backtest(sector_universe=sector_universe,
+                                **backtest_kwargs)
+            algorithm = self.buildAlgorithm(backtest=backtest)
+
+            if results_writer is None:
+                return algorithm.run(
+                    self.data_portal,
+                    overwrite_sim_params=False
+                )
+
+            self.streamAlgorithm(algorithm=algorithm,
+                                 results_writer=results_writer)
+
+    def streamAlgorithm(self, algorithm: TradingAlgorithm,
+        results_writer: StreamingResultsWriter):
+        """Function to run a zipline trading algorithm against the loaded data
+        portal, streaming each performance message to a results writer instead
+        of collecting them in memory (as in `TradingAlgorithm.run`).
+
+        Arguments:
+            algorithm {TradingAlgorithm} -- Zipline trading algorithm.
+            results_writer {StreamingResultsWriter} -- Results sink.
+        """
+
+        algorithm.data_portal = self.data_portal
+        try:
+            for perf in algorithm.get_generator():
+                results_writer.write(perf=perf)
+        finally:
+            results_writer.close()
+            algorithm.data_portal = None
+
+    def runAll(self, sector_universes: list, config_overrides: dict=None)\
+        -> dict:
+        """Function to run backtests for a list of sector universes, in order.
+
+        Arguments:
+            sector_universes {list} -- List of sector universes.
+
+        Keyword Arguments:
+            config_overrides {dict} -- Configuration attribute -> value
+                                       overrides (default: {None}).
+
+        Returns:
+            dict -- Dictionary of universe name -> zipline simulation results.
+        """
+
+        return dict((i.getUniverseName(),
+            self.run(sector_universe=i, config_overrides=config_overrides))
+            for i in sector_universes)
+
+    def buildAlgorithm(self, backtest: Backtest) -> TradingAlgorithm:
+        """Function to build a zipline trading algorithm for a backtest, using
+        the loaded trading environment and the configuration.
+
+        Arguments:
+            backtest {Backtest} -- Backtest (bound to the configuration).
+
+        Returns:
+            TradingAlgorithm -- Zipline trading algorithm.
+        """
+
+        return TradingAlgorithm(
+            namespace=dict(),
+            env=self.env,
+            trading_calendar=self.trading_calendar,
+            sim_params=create_simulation_parameters(
+                start=config.backtest_start,
+                end=config.backtest_end,
+                capital_base=config.capital_base,
+                emission_rate='daily',
+                data_frequency=config.backtest_frequency,
+                trading_calendar=self.trading_calendar
+            ),
+            initialize=backtest.zipline_initialize,
+            handle_data=backtest.zipline_handle_data
+        )
@@ -2,6 +2,7 @@ from ..cfg import config
 
 from zipline.api import get_datetime
 import logging
+import numpy as np
 import pandas as pd
 
 
@@ -120,3 +121,93 @@ class Utilities():
 
         self.isRebalanceTriggered()
         self.isRestructureTriggered()
+
+    def getRebalanceFlags(self, dates: pd.DatetimeIndex) -> np.array:
+        """Evaluates the rebalancing trigger over a sequence of dates, in
+        order. Note that this updates the wildcard handling flags in the same
+        way as consecutive calls to `isRebalanceTriggered` would.
+        
+        Arguments:
+            dates {pd.DatetimeIndex} -- Dates to evaluate (in order).
+        
+        Returns:
+            np.array -- Boolean array; True where a rebalance is triggered.
+        """
+
+        return np.array([self.isRebalanceTriggered(current_date=i,
+            log_flag=False) for i in dates], dtype=bool)
+
+    def getRestructureFlags(self, dates: pd.DatetimeIndex) -> np.array:
+        """Evaluates the restructuring trigger over a sequence of dates, in
+        order. Note that this updates the wildcard handling flags in the same
+        way as consecutive calls to `isRestructureTriggered` would.
+        
+        Arguments:
+            dates {pd.DatetimeIndex} -- Dates to evaluate (in order).
+        
+        Returns:
+            np.array -- Boolean array; True where a restructure is triggered.
+        """
+
+        return np.array([self.isRestructureTriggered(current_date=i,
+            log_flag=False) for i in dates], dtype=bool)
+
+    def getWeightDrift(self, weights: np.array, holding_rets: np.array)\
+        -> float:
+        """Computes the realized drift of the portfolio ETF weights since the
+        last position update; i.e. the fraction of the portfolio that would be
+        traded to restore the target weights (half the L1 distance between the
+        drifted and target weights).
+
+        NOTE: The ETF positions are held as component value weights (see
+              `Backtest.updatePositions`), so the weights drift with the ETF
+              holding returns, not the ETF price ratios.
+        
+        Arguments:
+            weights {np.array} -- Target portfolio ETF weights.
+            holding_rets {np.array} -- ETF holding returns since the last
+                                       position update.
+        
+        Returns:
+            float -- Realized weight drift.
+        """
+
+        drifted_weights = weights * (1 + holding_rets)
+        drifted_weights = drifted_weights / np.sum(drifted_weights)
+
+        return 0.5 * np.sum(np.abs(drifted_weights - weights))
+
+    def isRebalanceRequired(self, drift: float, log_flag: bool=True) -> bool:
+        """Checks if a triggered rebalance is required under the rebalancing
+        policy in the configuration.
+        
+        Arguments:
+            drift {float} -- Realized weight drift (see `getWeightDrift`); not
+                             used by the 'calendar' policy.
+
+        Keyword Arguments:
+            log_flag {bool} -- Flag for logging (default: {True}).
+
+        Raises:
+            ValueError -- Raised when the rebalancing policy is unknown.
+
+        Returns:
+            bool -- True if the rebalance is required, false otherwise.
+        """
+
+        if config.rebalance_policy == 'calendar':
+            return True
+
+        if config.rebalance_policy != 'drift':
+            logging.error('Unknown rebalancing policy {0}'
+                .format(config.rebalance_policy))
+            raise ValueError
+
+        is_required = drift > config.rebalance_drift_threshold
+
+        if not is_required and log_flag:
+            logging.info('ETF Portfolio rebalance skipped; weight drift {0:.4f}'
+                ' within threshold {1}'.format(drift,
+                    config.rebalance_drift_threshold))
+
+        return is_required
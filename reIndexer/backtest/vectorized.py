@@ -0,0 +1,327 @@
+from .util import Utilities
+from ..cfg import config, getStorageDtype
+from ..portfolio import BatchMinimumVariance
+from ..sector_universe import Universe
+from ..synthetic_etf import PriceWeightedETF, WeightingScheme
+
+import logging
+import numpy as np
+import pandas as pd
+
+
+class VectorizedBacktest():
+    """Module to run a fast, order-free approximation of a backtest with
+    vectorized array operations over a price panel.
+
+    The synthetic ETF price series of each sector are computed over the
+    complete price panel (with the restructuring trigger in the configuration),
+    the portfolio weights of every rebalance date are solved as a batch (see
+    `BatchMinimumVariance`), and the portfolio is simulated at the ETF level;
+    i.e. without orders, commissions or slippage. This is intended for cheap
+    screening and research runs; full-fidelity results require `Backtest`.
+
+    NOTE: Unlike `PriceWeightedETF`, which prices each lookback window from
+          its first row, the ETF series here are priced once over the
+          complete panel; only the first (partial) segment of each lookback
+          window differs.
+    """
+
+    def __init__(self, sector_universe: Universe, prices: pd.DataFrame,
+        periods_per_year: int=252):
+        """Initialization method for `VectorizedBacktest`.
+
+        Arguments:
+            sector_universe {Universe} -- Target simulation sector universe.
+            prices {pd.DataFrame} -- Asset price panel (dates x tickers),
+                                     including the lookback window before the
+                                     start of the backtest.
+
+        Keyword Arguments:
+            periods_per_year {int} -- Number of bars per year in the price
+                                      panel (default: {252}).
+        """
+
+        self.sector_universe = sector_universe
+        self.periods_per_year = periods_per_year
+
+        # Removing tickers without any price data
+        for ticker in set(sector_universe.getUniqueTickers())\
+            .difference(prices.columns[prices.notnull().any()]):
+            sector_universe.removeInvalidTicker(invalid_ticker=ticker)
+            logging.info('Ticker {0} in universe not in price panel; removing'
+                .format(ticker))
+
+        # Filling na values (same fill semantics as `PriceWeightedETF`),
+        # storing in the storage precision of the configuration
+        self.prices = prices.fillna(method='bfill').fillna(method='ffill')\
+            .astype(getStorageDtype())
+
+    def computeETFSeries(self) -> tuple:
+        """Function to compute the synthetic ETF series of each of the
+        sectors over the complete price panel.
+
+        Returns:
+            tuple -- ETF log returns (pd.DataFrame), and ETF holding returns
+                     (pd.DataFrame); dates x sectors.
+        """
+
+        restructure_flags = Utilities().getRestructureFlags(
+            dates=self.prices.index
+        )
+
+        etf_prices = dict()
+        holding_rets = dict()
+        for sector_label in self.sector_universe.getSectorLabels():
+            sector_prices = self.prices[self.sector_universe
+                .getTickersInSector(sector_label=sector_label)].values
+            etf_prices[sector_label] = PriceWeightedETF\
+                .computeSyntheticPrices(
+                    prices=sector_prices,
+                    restructure_flags=restructure_flags
+                )
+            holding_rets[sector_label] = PriceWeightedETF\
+                .computeHoldingReturns(
+                    prices=sector_prices,
+                    restructure_flags=restructure_flags
+                )
+
+        columns = self.sector_universe.getSectorLabels()
+        etf_prices = pd.DataFrame(etf_prices, index=self.prices.index,
+                                  columns=columns)
+        holding_rets = pd.DataFrame(holding_rets, index=self.prices.index,
+                                    columns=columns)
+
+        return np.log(etf_prices).diff().iloc[1:], holding_rets
+
+    def computeSchemeSeries(self, schemes: list) -> tuple:
+        """Function to compute the synthetic ETF series of each of the
+        sectors under each of a list of weighting schemes, over the complete
+        price panel (see `WeightingScheme`). The component prices and the
+        restructure segments of each sector are read once for all schemes.
+
+        Arguments:
+            schemes {list} -- List of weighting schemes.
+
+        Returns:
+            tuple -- ETF log returns (pd.DataFrame), and ETF holding returns
+                     (pd.DataFrame); dates x (scheme, sector) column
+                     MultiIndex.
+        """
+
+        scheme_names = [i.name for i in schemes]
+        if len(set(scheme_names)) != len(scheme_names):
+            logging.error('Duplicate weighting scheme names {0}'.format(
+                scheme_names))
+            raise ValueError
+
+        restructure_flags = Utilities().getRestructureFlags(
+            dates=self.prices.index
+        )
+
+        sector_labels = self.sector_universe.getSectorLabels()
+        etf_prices = np.zeros((len(schemes), len(sector_labels),
+                               len(self.prices)))
+        holding_rets = np.zeros(etf_prices.shape)
+        for idx, sector_label in enumerate(sector_labels):
+            etf_prices[:, idx], holding_rets[:, idx] = WeightingScheme\
+                .computeSchemeSeries(
+                    prices=self.prices[self.sector_universe
+                        .getTickersInSector(sector_label=sector_label)].values,
+                    restructure_flags=restructure_flags,
+                    schemes=schemes
+                )
+
+        # Flattening scheme x sector x dates tensor to (scheme, sector) columns
+        columns = pd.MultiIndex.from_product([scheme_names, sector_labels])
+        etf_prices = pd.DataFrame(etf_prices.reshape(-1, len(self.prices)).T,
+                                  index=self.prices.index, columns=columns)
+        holding_rets = pd.DataFrame(holding_rets.reshape(-1,
+            len(self.prices)).T, index=self.prices.index, columns=columns)
+
+        return np.log(etf_prices).diff().iloc[1:], holding_rets
+
+    def runSchemes(self, schemes: list) -> dict:
+        """Function to run the vectorized simulation for each of a list of
+        weighting schemes, from a single pass over the price panel; the weight
+        schedules of all schemes are solved as one batch (see
+        `BatchMinimumVariance.computeSchemeWeightSchedules`).
+
+        Arguments:
+            schemes {list} -- List of weighting schemes.
+
+        Returns:
+            dict -- Dictionary of scheme name -> simulation results (see
+                    `run`).
+        """
+
+        log_rets, holding_rets = self.computeSchemeSeries(schemes=schemes)
+
+        weight_schedules = BatchMinimumVariance()\
+            .computeSchemeWeightSchedules(log_rets=log_rets)
+
+        return dict((i, self.simulate(
+            holding_rets=holding_rets[i],
+            weight_schedule=weight_schedules[i],
+            end=config.backtest_end
+        )) for i in weight_schedules)
+
+    def run(self, weight_schedule: pd.DataFrame=None) -> pd.DataFrame:
+        """Function to run the vectorized simulation.
+
+        Keyword Arguments:
+            weight_schedule {pd.DataFrame} -- Precomputed portfolio weights
+                                              (rebalance dates x sectors);
+                                              solved with
+                                              `BatchMinimumVariance` if None
+                                              (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Simulation results; portfolio returns, portfolio
+                            value, and (drifted) portfolio ETF weights.
+        """
+
+        log_rets, holding_rets = self.computeETFSeries()
+
+        if weight_schedule is None:
+            weight_schedule = BatchMinimumVariance().computeWeightSchedule(
+                log_rets=log_rets
+            )
+
+        return self.simulate(
+            holding_rets=holding_rets,
+            weight_schedule=weight_schedule,
+            end=config.backtest_end
+        )
+
+    def simulate(self, holding_rets: pd.DataFrame,
+        weight_schedule: pd.DataFrame, end: pd.Timestamp,
+        initial_state: dict=None) -> pd.DataFrame:
+        """Function to simulate the portfolio at the ETF level, from the first
+        scheduled rebalance (or the first date after the initial state) to the
+        end date. The state of the simulation on its last date is bound to
+        `sim_state`, so that it may be continued (see `IncrementalBacktest`).
+
+        Arguments:
+            holding_rets {pd.DataFrame} -- ETF holding returns (dates x
+                                           sectors); see `computeETFSeries`.
+            weight_schedule {pd.DataFrame} -- Portfolio weights (rebalance
+                                              dates x sectors).
+            end {pd.Timestamp} -- End of the simulation.
+
+        Keyword Arguments:
+            initial_state {dict} -- Simulation state to continue from (see
+                                    `sim_state`); rows before the first
+                                    scheduled rebalance continue the period of
+                                    the state (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Simulation results (see `run`).
+        """
+
+        # Isolating simulation dates (first rebalance, or the first date after
+        # the initial state, to end of simulation)
+        if initial_state is None:
+            is_simulated = holding_rets.index >= weight_schedule.index[0]
+        else:
+            is_simulated = holding_rets.index > initial_state['date']
+        sim_rets = holding_rets.loc[is_simulated & (holding_rets.index <= end)]
+        sim_growth = 1 + sim_rets.values
+        schedule = weight_schedule[sim_rets.columns].values
+
+        # Rebalance period of each simulation row (-1 for the period of the
+        # initial state)
+        period_ids = np.searchsorted(weight_schedule.index, sim_rets.index,
+            side='right') - 1
+
+        # Holdings of the period of the initial state
+        if initial_state is None:
+            period_holdings, cum_growth, cum_wealth = None, None, 1.
+        else:
+            period_holdings = initial_state['period_holdings']
+            cum_growth = initial_state['cum_growth']
+            cum_wealth = initial_state['cum_wealth']
+        prev_holdings = None if initial_state is None else\
+            period_holdings * cum_growth
+
+        # Holdings value (per unit of portfolio value at each rebalance);
+        # weights are set at the close of the rebalance date and drift with the
+        # ETF holding returns afterwards
+        holdings = np.zeros(sim_growth.shape)
+        port_rets = np.zeros(sim_growth.shape[0])
+        period_starts = np.flatnonzero(np.diff(np.append(-2, period_ids)))
+        period_ends = np.append(period_starts[1:], len(period_ids))
+        for start, end in zip(period_starts, period_ends):
+            if period_ids[start] < 0:
+                # Continuing the period of the initial state
+                growth = np.cumprod(np.vstack([cum_growth,
+                    sim_growth[start:end]]), axis=0)[1:]
+                holdings[start:end] = period_holdings * growth
+                port_rets[start] = holdings[start].sum() /\
+                    prev_holdings.sum() - 1
+                cum_growth = growth[-1]
+            else:
+                growth = np.cumprod(sim_growth[start + 1:end], axis=0)
+                holdings[start] = schedule[period_ids[start]]
+                holdings[start + 1:end] = holdings[start] * growth
+                # Return of the rebalance date itself accrues to the old
+                # weights
+                last_holdings = holdings[start - 1] if start > 0 else\
+                    prev_holdings
+                if last_holdings is not None:
+                    port_rets[start] = last_holdings.dot(
+                        sim_growth[start]) / last_holdings.sum() - 1
+                period_holdings = holdings[start]
+                cum_growth = growth[-1] if len(growth) > 0 else\
+                    np.ones(len(period_holdings))
+            port_rets[start + 1:end] = holdings[start + 1:end].sum(axis=1) /\
+                holdings[start:end - 1].sum(axis=1) - 1
+
+        wealth = np.cumprod(np.append(cum_wealth, 1 + port_rets))[1:]
+
+        # Binding simulation state on the last date
+        self.sim_state = initial_state if len(sim_rets) == 0 else {
+            'date': sim_rets.index[-1],
+            'period_holdings': period_holdings,
+            'cum_growth': cum_growth,
+            'cum_wealth': wealth[-1]
+        }
+
+        results = pd.DataFrame(holdings / holdings.sum(axis=1)[:, None],
+            index=sim_rets.index,
+            columns=['_'.join(['etf_weight', i]) for i in sim_rets.columns])
+        results.insert(0, 'returns', port_rets)
+        results.insert(1, 'portfolio_value', config.capital_base * wealth)
+
+        return results
+
+    @staticmethod
+    def summarize(returns: pd.Series, periods_per_year: int=252) -> dict:
+        """Function to compute summary metrics of a portfolio returns series.
+
+        Arguments:
+            returns {pd.Series} -- Portfolio simple returns.
+
+        Keyword Arguments:
+            periods_per_year {int} -- Number of bars per year
+                                      (default: {252}).
+
+        Returns:
+            dict -- Total return, annualized return, annualized volatility,
+                    Sharpe ratio (zero risk-free rate) and maximum drawdown.
+        """
+
+        returns = np.asarray(returns, dtype=np.float64)
+        wealth = np.cumprod(1 + returns)
+        total_return = wealth[-1] - 1
+        annual_return = (1 + total_return) ** (periods_per_year /
+            len(returns)) - 1
+        annual_volatility = np.std(returns, ddof=1) * np.sqrt(periods_per_year)
+
+        return {
+            'total_return': total_return,
+            'annual_return': annual_return,
+            'annual_volatility': annual_volatility,
+            'sharpe': np.mean(returns) / np.std(returns, ddof=1) *
+                np.sqrt(periods_per_year),
+            'max_drawdown': np.min(wealth / np.maximum.accumulate(wealth) - 1)
+        }
@@ -0,0 +1,150 @@
+from .vectorized import VectorizedBacktest
+from ..cfg import overrideConfig
+from ..portfolio import BatchMinimumVariance
+from ..sector_universe import Universe
+
+import logging
+import pandas as pd
+
+
+class WalkForward():
+    """Module to run a walk-forward (rolling-origin) evaluation of a sector
+    universe over a list of evaluation windows, sharing a single data load.
+
+    The price panel is cleaned once, and the synthetic ETF series are computed
+    once over the union of all windows (see `VectorizedBacktest`). The
+    rebalance dates of all windows are pooled, such that the rolling
+    covariances (see `BatchMinimumVariance`) are accumulated, and each minimum
+    variance problem is solved, once; overlapping windows share both. The
+    results of each window are then sliced from the shared computation, and
+    simulated independently (i.e. each window starts from its own initial
+    allocation on its first trading date).
+    """
+
+    def __init__(self, sector_universe: Universe, prices: pd.DataFrame,
+        windows: list, periods_per_year: int=252, n_workers: int=None):
+        """Initialization method for `WalkForward`.
+
+        Arguments:
+            sector_universe {Universe} -- Target simulation sector universe.
+            prices {pd.DataFrame} -- Asset price panel (dates x tickers),
+                                     including the lookback window before the
+                                     start of the first window.
+            windows {list} -- List of (start, end) evaluation windows (as
+                              timezone-aware timestamps; see
+                              `makeRollingWindows`).
+
+        Keyword Arguments:
+            periods_per_year {int} -- Number of bars per year in the price
+                                      panel (default: {252}).
+            n_workers {int} -- Number of worker processes of the batch solver
+                               (default: {None}; see `BatchMinimumVariance`).
+        """
+
+        self.windows = sorted(windows)
+        self.periods_per_year = periods_per_year
+        self.n_workers = n_workers
+
+        # Loading and cleaning the price panel once for all windows
+        self.backtest = VectorizedBacktest(
+            sector_universe=sector_universe,
+            prices=prices,
+            periods_per_year=periods_per_year
+        )
+
+    @staticmethod
+    def makeRollingWindows(start: pd.Timestamp, end: pd.Timestamp,
+        length: pd.DateOffset, step: pd.DateOffset) -> list:
+        """Function to make rolling evaluation windows of a fixed length,
+        with origins every `step` from the start date, ending on or before the
+        end date.
+
+        Arguments:
+            start {pd.Timestamp} -- Start of the first window.
+            end {pd.Timestamp} -- Latest end of the windows.
+            length {pd.DateOffset} -- Window length (e.g.
+                                      `pd.DateOffset(years=3)`).
+            step {pd.DateOffset} -- Step between window origins (e.g.
+                                    `pd.DateOffset(years=1)`).
+
+        Returns:
+            list -- List of (start, end) windows.
+        """
+
+        windows = list()
+        window_start = start
+        while window_start + length <= end:
+            windows.append((window_start, window_start + length))
+            window_start = window_start + step
+
+        return windows
+
+    @staticmethod
+    def getWindowLabel(window: tuple) -> str:
+        """Function to get the label of an evaluation window.
+
+        Arguments:
+            window {tuple} -- (start, end) window.
+
+        Returns:
+            str -- Window label.
+        """
+
+        return '_'.join([str(window[0].date()), str(window[1].date())])
+
+    def run(self) -> dict:
+        """Function to run the walk-forward evaluation.
+
+        Returns:
+            dict -- Dictionary of window label -> simulation results (see
+                    `VectorizedBacktest.run`).
+        """
+
+        # Computing ETF series once over the union of the windows
+        log_rets, holding_rets = self.backtest.computeETFSeries()
+
+        # Rebalance dates of each window (trigger calendar, and the first date
+        # of the window)
+        solver = BatchMinimumVariance(n_workers=self.n_workers)
+        window_dates = dict()
+        for window in self.windows:
+            with overrideConfig({'backtest_start': window[0],
+                                 'backtest_end': window[1]}):
+                window_dates[window] = solver.getRebalanceDates(
+                    log_rets.index)
+            if len(window_dates[window]) == 0:
+                logging.error('No trading dates in window {0}'.format(
+                    self.getWindowLabel(window)))
+                raise ValueError
+
+        # Solving each (unique) rebalance date once, for all windows
+        all_dates = pd.DatetimeIndex(sorted(set().union(
+            *window_dates.values())))
+        logging.info('Walk-forward over {0} windows; {1} unique rebalance '
+            'dates'.format(len(self.windows), len(all_dates)))
+        weight_schedule = solver.computeWeightSchedule(
+            log_rets=log_rets,
+            rebalance_dates=all_dates
+        )
+
+        # Slicing the results of each window from the shared computation
+        return dict((self.getWindowLabel(i), self.backtest.simulate(
+            holding_rets=holding_rets,
+            weight_schedule=weight_schedule.loc[window_dates[i]],
+            end=i[1]
+        )) for i in self.windows)
+
+    def summarize(self, results: dict) -> pd.DataFrame:
+        """Function to compute the summary metrics of each window (see
+        `VectorizedBacktest.summarize`).
+
+        Arguments:
+            results {dict} -- Walk-forward results (see `run`).
+
+        Returns:
+            pd.DataFrame -- Summary metrics (windows x metrics).
+        """
+
+        return pd.DataFrame(dict((i, VectorizedBacktest.summarize(
+            returns=j['returns'], periods_per_year=self.periods_per_year))
+            for i, j in results.items())).T
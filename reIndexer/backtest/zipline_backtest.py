@@ -1,14 +1,17 @@
 from .bookkeeping import Bookkeeping
+from .orders import OrderIntents
 from .util import Utilities
 from ..cfg import config
+from ..data import MultiResolutionPriceCache, PricePanel
 from ..portfolio import MinimumVariance
 from ..sector_universe import Universe
 from ..synthetic_etf import PriceWeightedETF
 
+from concurrent.futures import ThreadPoolExecutor
 from zipline import run_algorithm
 from zipline.algorithm import TradingAlgorithm
-from zipline.api import order_target_percent, record, set_commission,\
-    set_long_only, symbol
+from zipline.api import get_datetime, record, set_commission,\
+    set_long_only, symbol, symbols
 from zipline.data.bar_reader import NoDataForSid
 from zipline.errors import SymbolNotFound
 from zipline.finance.commission import PerDollar
@@ -30,12 +33,23 @@ class Backtest():
     all other configuration information from the reIndexer configuration file.
     """
 
-    def __init__(self, sector_universe: Universe):
+    def __init__(self, sector_universe: Universe,
+        weight_schedule: pd.DataFrame=None, price_panel: PricePanel=None):
         """Initialization method for the Backtest module. Binds the target
         sector universe to an instance variable.
         
         Arguments:
             sector_universe {Universe} -- Target simulation sector universe.
+
+        Keyword Arguments:
+            weight_schedule {pd.DataFrame} -- Precomputed portfolio weights
+                                              (rebalance dates x sectors); see
+                                              `BatchMinimumVariance`
+                                              (default: {None}).
+            price_panel {PricePanel} -- Cleaned price panel for the run; ETF
+                                        lookback windows are read from the
+                                        panel instead of zipline history
+                                        (default: {None}).
         """
 
         # Binding sector universe to class variable
@@ -43,6 +57,12 @@ class Backtest():
             .format(sector_universe.getUniverseName()))
         config.sector_universe = sector_universe
 
+        # Binding precomputed weight schedule to class variable
+        config.port_weight_schedule = weight_schedule
+
+        # Binding cleaned price panel to class variable
+        config.price_panel = price_panel
+
     @staticmethod
     def zipline_initialize(context: TradingAlgorithm):
         """Zipline backtest initialization method override.
@@ -76,6 +96,27 @@ class Backtest():
         # Initializing bookkeeping module
         context.books = Bookkeeping()
 
+        # Initializing order-intent layer (net orders per bar)
+        context.order_intents = OrderIntents()
+
+        # Multi-resolution cache of minute lookback windows (opt-in)
+        context.price_cache = None
+        if config.setf_multires_cache and config.setf_data_frequency == '1m':
+            # NOTE: The data portal does not expose its adjustment reader
+            context.price_cache = MultiResolutionPriceCache(
+                trading_calendar=context.trading_calendar,
+                minute_window=config.setf_lookback_window,
+                adjustment_reader=getattr(context.data_portal,
+                                          '_adjustment_reader', None)
+            )
+
+        # Thread pool for concurrent sector updates (opt-in)
+        context.executor = None
+        if config.sector_update_workers and config.sector_update_workers > 1:
+            context.executor = ThreadPoolExecutor(
+                max_workers=config.sector_update_workers
+            )
+
     @staticmethod
     def zipline_handle_data(context: TradingAlgorithm, data: BarData):
         """Zipline `handle_data` method override. Handles all trading
@@ -100,11 +141,12 @@ class Backtest():
 
         # First run operations
         if (context.first_run):
-            # Validate sector universe
-            config.sector_universe = Backtest.validateSectorUniverse(
-                candidate_sector_universe=config.sector_universe,
-                zipline_data=data
-            )
+            # Validate sector universe (unless validated before the run)
+            if not config.sector_universe.isValidated():
+                config.sector_universe = Backtest.validateSectorUniverse(
+                    candidate_sector_universe=config.sector_universe,
+                    zipline_data=data
+                )
 
             # Building synthetic sector ETFs
             Backtest.buildSyntheticETFs(context=context, zipline_data=data)
@@ -120,18 +162,16 @@ class Backtest():
             # Updating initial flags for rebalancing/restructuring trigger
             context.util.setInitialFlags()
 
-            # Logging ETF prices
-            context.books.etfDataLog(
-                etf_prices=Backtest.getETFPrices(context, data),
-                etf_weights=context.port_w
-            )
+            # Submitting net orders, logging ETF prices
+            Backtest.closeBar(context=context, zipline_data=data)
 
             # Skip rest of logic for first iteration, update iteration flag
             context.first_run = False
             return
 
-        # Portfolio Rebalancing
-        if context.util.isRebalanceTriggered():
+        # Portfolio Rebalancing (if required by the rebalancing policy)
+        if context.util.isRebalanceTriggered() and\
+            Backtest.isRebalanceRequired(context=context, zipline_data=data):
             Backtest.rebalancePortfolio(
                 context=context,
                 zipline_data=data,
@@ -148,12 +188,76 @@ class Backtest():
                 log_commission=True
             )
 
+        # Submitting net orders, logging ETF prices
+        Backtest.closeBar(context=context, zipline_data=data)
+
+    @staticmethod
+    def closeBar(context: TradingAlgorithm, zipline_data: BarData):
+        """Function to close the trading operations of a bar. Submits one net
+        order per asset for all operations in the bar (see `OrderIntents`),
+        and logs ETF prices and portfolio weights.
+
+        With the 'drift' rebalancing policy, the component prices after any
+        position update are also kept as the reference for the weight drift
+        (see `isRebalanceRequired`).
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        """
+
+        etf_prices = Backtest.getETFPrices(context, zipline_data)
+
+        # Resetting weight drift reference on position updates
+        if context.order_intents.hasPending() and\
+            config.rebalance_policy == 'drift':
+            context.drift_ref_prices = Backtest.getComponentPrices(
+                context=context, zipline_data=zipline_data)
+
+        # Submitting one net order per asset for all operations in the bar
+        context.order_intents.flush()
+
         # Log ETF prices
         context.books.etfDataLog(
-            etf_prices=Backtest.getETFPrices(context, data),
+            etf_prices=etf_prices,
             etf_weights=context.port_w
         )
 
+    @staticmethod
+    def isRebalanceRequired(context: TradingAlgorithm,
+        zipline_data: BarData) -> bool:
+        """Function to check if a triggered rebalance is required under the
+        rebalancing policy in the configuration (`config.rebalance_policy`).
+        With the 'drift' policy, the realized drift of the portfolio ETF
+        weights since the last position update is computed from the ETF
+        holding returns (see `getHoldingReturns`), and the rebalance is
+        skipped (and recorded as such) if it is within the threshold; this
+        avoids the parameter updates, optimization and orders of redundant
+        rebalances.
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        
+        Returns:
+            bool -- True if the rebalance is required, false otherwise.
+        """
+
+        if config.rebalance_policy == 'calendar':
+            return True
+
+        drift = context.util.getWeightDrift(
+            weights=context.port_w,
+            holding_rets=Backtest.getHoldingReturns(context, zipline_data)
+        )
+        is_required = context.util.isRebalanceRequired(drift=drift)
+
+        # Logging weight drift, and skipped rebalances
+        context.books.rebalanceDriftLog(drift=drift,
+                                        is_skipped=not is_required)
+
+        return is_required
+
     @staticmethod
     def buildSyntheticETFs(context: TradingAlgorithm, zipline_data: BarData):
         """Function to build synthetic ETFs. This is the initialization method
@@ -202,19 +306,29 @@ class Backtest():
         if log_commission:
             old_weights = context.port_w
 
-        # Updating parameters for each of the sectors
-        [context.synthetics[i].updateParameters(zipline_data=zipline_data)
-            for i in config.sector_universe.getSectorLabels()]
-        
-        # Building log returns matrix
-        log_rets = np.array([context.synthetics[i].getLogReturns()
-            for i in config.sector_universe.getSectorLabels()])
-        
-        # Rebalancing portfolio, getting new weights
-        context.port_w = context.port.computeWeights(
-            log_rets=log_rets
+        # Using precomputed weights if available
+        scheduled_weights = Backtest.getScheduledWeights(
+            current_date=get_datetime()
         )
 
+        if scheduled_weights is not None:
+            context.port_w = scheduled_weights
+        else:
+            # Updating parameters for each of the sectors
+            Backtest.updateSectorParameters(
+                context=context,
+                zipline_data=zipline_data
+            )
+            
+            # Building log returns matrix
+            log_rets = np.array([context.synthetics[i].getLogReturns()
+                for i in config.sector_universe.getSectorLabels()])
+            
+            # Rebalancing portfolio, getting new weights
+            context.port_w = context.port.computeWeights(
+                log_rets=log_rets
+            )
+
         # Adding new weights to dictionary corresponding to sector list
         context.port_weights = dict(zip(
             config.sector_universe.getSectorLabels(),
@@ -237,6 +351,44 @@ class Backtest():
         # Return positions
         return context.port_w
 
+    @staticmethod
+    def getScheduledWeights(current_date: pd.Timestamp) -> np.array:
+        """Function to get the precomputed portfolio weights for the current
+        date from the weight schedule in the configuration (if any). The most
+        recent scheduled weights on or before the current date are used.
+        
+        Arguments:
+            current_date {pd.Timestamp} -- Current simulation date.
+        
+        Returns:
+            np.array -- Portfolio weights (in sector order), or None if there is
+                        no weight schedule, or no scheduled weights yet.
+
+        Raises:
+            KeyError -- Raised when the schedule is missing sectors.
+        """
+
+        schedule = config.port_weight_schedule
+        if schedule is None:
+            return None
+
+        # Isolating scheduled weights on or before the current date
+        schedule = schedule.loc[schedule.index <= current_date]
+        if schedule.empty:
+            logging.debug('No scheduled weights on or before {0}'
+                .format(current_date.date()))
+            return None
+
+        missing = set(config.sector_universe.getSectorLabels())\
+            .difference(schedule.columns)
+        if missing:
+            logging.error('Sectors {0} missing from weight schedule'
+                .format(missing))
+            raise KeyError
+
+        return np.array(schedule.iloc[-1][
+            config.sector_universe.getSectorLabels()], dtype=np.float64)
+
     @staticmethod
     def restructureETF(context: TradingAlgorithm, zipline_data: BarData,
         update_positions: bool=True, log_commission: bool=True):
@@ -263,8 +415,10 @@ class Backtest():
                 for i in config.sector_universe.getSectorLabels()])
 
         # Updating weights for each of the synthetic ETF components
-        [context.synthetics[i].updateWeights(zipline_data=zipline_data)
-            for i in config.sector_universe.getSectorLabels()]
+        Backtest.updateSectorWeights(
+            context=context,
+            zipline_data=zipline_data
+        )
 
         # Update positions if requested
         if update_positions:
@@ -282,41 +436,223 @@ class Backtest():
                 new_weights=new_weights
             )
 
+    @staticmethod
+    def mapSectors(context: TradingAlgorithm, func,
+        sector_labels: list=None) -> list:
+        """Function to apply a function to each of the sector labels, in sector
+        order. If a sector update thread pool is configured, the calls are run
+        concurrently (NumPy releases the GIL for most of the array
+        computation); results are always returned in sector order.
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            func {callable} -- Function of a single sector label.
+
+        Keyword Arguments:
+            sector_labels {list} -- Subset of sector labels; all sectors if
+                                    None (default: {None}).
+        
+        Returns:
+            list -- Results, in sector order.
+        """
+
+        if sector_labels is None:
+            sector_labels = config.sector_universe.getSectorLabels()
+
+        if context.executor is None:
+            return [func(i) for i in sector_labels]
+
+        return list(context.executor.map(func, sector_labels))
+
+    @staticmethod
+    def updateSectorParameters(context: TradingAlgorithm,
+        zipline_data: BarData):
+        """Function to update the parameters of each of the synthetic ETFs.
+
+        When running concurrently, the historical prices of all sectors are
+        prefetched with a single history call in the simulation thread (zipline
+        data access is not thread-safe), and only the computation is run on the
+        thread pool. With a multi-resolution price cache, the prefetched
+        windows are served from the cache (see `MultiResolutionPriceCache`).
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        """
+
+        if context.executor is None and context.price_cache is None:
+            [context.synthetics[i].updateParameters(zipline_data=zipline_data)
+                for i in config.sector_universe.getSectorLabels()]
+            return
+
+        # Reading windows from the cleaned price panel (thread-safe)
+        if config.price_panel is not None:
+            end_dt = get_datetime()
+            Backtest.mapSectors(context=context,
+                func=lambda i: context.synthetics[i].updateParametersFromPanel(
+                    end_dt=end_dt))
+            return
+
+        # Isolating sectors without cached series
+        pending = [i for i in config.sector_universe.getSectorLabels()
+            if not context.synthetics[i].loadFromCache(end_dt=get_datetime())]
+        if not pending:
+            return
+
+        # Prefetching history for all (pending) sector components
+        sector_assets = Backtest.getSectorAssets(context=context)
+        pending_assets = list(set().union(*[sector_assets[i]
+            for i in pending]))
+        if context.price_cache is not None:
+            # Reading new minute bars into the cache (for all sectors)
+            context.price_cache.update(
+                zipline_data=zipline_data,
+                end_dt=get_datetime(),
+                assets=list(set().union(*sector_assets.values()))
+            )
+            historical_data = context.price_cache.getHistory(
+                assets=pending_assets,
+                bar_count=config.setf_lookback_window,
+                frequency=config.setf_data_frequency
+            )
+        else:
+            historical_data = zipline_data.history(
+                pending_assets,
+                'price',
+                bar_count=config.setf_lookback_window,
+                frequency=config.setf_data_frequency
+            )
+
+        Backtest.mapSectors(context=context,
+            func=lambda i: context.synthetics[i].computeParameters(
+                historical_data=historical_data[sector_assets[i]]),
+            sector_labels=pending)
+
+    @staticmethod
+    def updateSectorWeights(context: TradingAlgorithm, zipline_data: BarData):
+        """Function to update the component allocation weights of each of the
+        synthetic ETFs. Current prices are prefetched with a single call when
+        running concurrently (see `updateSectorParameters`).
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        """
+
+        if context.executor is None:
+            [context.synthetics[i].updateWeights(zipline_data=zipline_data)
+                for i in config.sector_universe.getSectorLabels()]
+            return
+
+        # Prefetching current prices for all sector components
+        sector_assets = Backtest.getSectorAssets(context=context)
+        current_prices = zipline_data.current(
+            list(set().union(*sector_assets.values())),
+            'price'
+        )
+
+        Backtest.mapSectors(context=context,
+            func=lambda i: context.synthetics[i].updateWeights(
+                zipline_data=zipline_data,
+                current_prices=current_prices[sector_assets[i]].values))
+
+    @staticmethod
+    def getComponentPrices(context: TradingAlgorithm,
+        zipline_data: BarData) -> dict:
+        """Function to get the current component asset prices of each of the
+        synthetic ETFs (in component order).
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        
+        Returns:
+            dict -- Dictionary of sector label -> component prices.
+        """
+
+        sector_assets = Backtest.getSectorAssets(context=context)
+        current_prices = zipline_data.current(
+            list(set().union(*sector_assets.values())),
+            'price'
+        )
+
+        return dict((i, current_prices[j].values)
+            for i, j in sector_assets.items())
+
+    @staticmethod
+    def getHoldingReturns(context: TradingAlgorithm,
+        zipline_data: BarData) -> np.array:
+        """Function to get the holding returns of the ETF positions since the
+        last position update; i.e. the returns of the component value weights
+        targeted on the update (see `updatePositions`), at the reference
+        component prices (see `closeBar`).
+
+        NOTE: Tickers in several sectors are counted in each of their sectors.
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+            zipline_data {BarData} -- Instance zipline data bundle.
+        
+        Returns:
+            np.array -- ETF holding returns.
+        """
+
+        prices = Backtest.getComponentPrices(context=context,
+                                             zipline_data=zipline_data)
+
+        return np.array([np.dot(context.synthetics[i].getComponentAllocation(),
+            prices[i] / context.drift_ref_prices[i]) - 1
+            for i in config.sector_universe.getSectorLabels()])
+
+    @staticmethod
+    def getSectorAssets(context: TradingAlgorithm) -> dict:
+        """Function to look up the zipline assets of each of the synthetic ETFs
+        (in component order).
+        
+        Arguments:
+            context {TradingAlgorithm} -- Zipline context namespace variable.
+        
+        Returns:
+            dict -- Dictionary of sector label -> list of assets.
+        """
+
+        return dict((i, list(symbols(*context.synthetics[i].getTickerList())))
+            for i in config.sector_universe.getSectorLabels())
+
     @staticmethod
     def updatePositions(context: TradingAlgorithm):
         """Function to update asset positions in Zipline.
 
         This function computes specific asset proportions in the final portfolio
         by multiplying the weight of the sector containing the asset by the
-        weight of the asset within the sector. Then, it uses zipline's
-        `order_target_percent` function to specify the percentage (specified
-        as a decimal) of the position for a given asset in the portofolio as a
-        whole.
+        weight of the asset within the sector. These target percentages
+        (specified as a decimal) of the portfolio as a whole are recorded as
+        order intents, and submitted with zipline's `order_target_percent`
+        function once at the end of the bar (see `OrderIntents`).
         
         Arguments:
             context {TradingAlgorithm} -- Zipline context namespace variable.
         """
 
+        targets = dict()
+
         # Looping through each sector
         for sector_label in config.sector_universe.getSectorLabels():
             # Isolating current sector synthetic ETF
             sector = context.synthetics[sector_label]
             # Isolating portfolio weight for current sector
             sector_weight = context.port_weights[sector_label]
-            for ticker in sector.getTickerList():
-                # Computing current portfolio percentage of the given ticker
-                # NOTE: This is the product of the synthetic ETF weight in the
-                #       portfolio and the component weight in the synthetic ETF
-                port_ticker_weight = sector_weight *\
-                    sector.getTickerWeight(ticker)
-
-                # Executing trade to update weight in the portfolio
-                order_target_percent(
-                    asset=symbol(ticker),
-                    target=port_ticker_weight
-                )
-                logging.debug('Updated portfolio ticker {0} weight to {1}%'.
-                    format(ticker, port_ticker_weight * 100))
+            # Computing current portfolio percentage of the sector tickers
+            # NOTE: This is the product of the synthetic ETF weight in the
+            #       portfolio and the component weight in the synthetic ETF
+            # NOTE: A ticker in several sectors is targeted with the weight of
+            #       its last sector (as when ordering each sector in turn)
+            for ticker, ticker_weight in zip(sector.getTickerList(),
+                sector_weight * sector.getComponentAllocation()):
+                targets[ticker] = ticker_weight
+
+        # Recording target weights; orders are submitted at the end of the bar
+        context.order_intents.setTargets(targets=targets)
 
     @staticmethod
     def getETFPrices(context: TradingAlgorithm, zipline_data: BarData)\
@@ -379,5 +715,5 @@ class Backtest():
             initialize=self.zipline_initialize,
             handle_data=self.zipline_handle_data,
             data_frequency=config.backtest_frequency,
-            bundle='quandl'
+            bundle=config.bundle
         )
@@ -1,4 +1,6 @@
+from contextlib import contextmanager
 import logging
+import numpy as np
 import pandas as pd
 
 
@@ -8,6 +10,9 @@ class config:
     backtest_start = pd.to_datetime('2012-01-01').tz_localize(tz_local)
     backtest_end = pd.to_datetime('2017-12-31').tz_localize(tz_local)
 
+    # Zipline data bundle (see `SyntheticBundle` for a local synthetic bundle)
+    bundle = 'quandl'
+
     # Backtest frequency configuration
     backtest_frequency = 'daily'  # Must be either 'daily' or 'minute'
 
@@ -17,6 +22,25 @@ class config:
     # Portfolio configuration
     capital_base = 1e10
     optim_tol = 1e-6  # Optimization tolerance
+    optim_workers = None  # Worker processes for offline batch solves
+    # Optimizer; 'slsqp' (scipy) or 'projected_gradient' (see `kernels`)
+    optim_method = 'slsqp'
+    # Covariance model; 'sample' (dense sample covariance) or 'factor' (k
+    # factors plus specific variances; see `FactorCovariance`), for very large
+    # sector counts. The factor model is always solved with the
+    # projected-gradient kernel, in O(sectors x factors) per iteration.
+    covariance_model = 'sample'
+    covariance_factors = 10  # Number of factors (capped to the window rank)
+    # Floor of the specific variances, as a fraction of the sample variances
+    covariance_min_specific = 1e-3
+
+    # Use Numba-compiled kernels when Numba is installed (NumPy otherwise)
+    use_numba = True
+
+    # Precomputed portfolio weight schedule (set at backtest initialization)
+    # NOTE: See `BatchMinimumVariance`; if set, rebalancing uses the scheduled
+    #       weights instead of solving the optimization in the event loop.
+    port_weight_schedule = None
 
     # Sector universe (set at backtest initialization)
     sector_universe = None
@@ -24,6 +48,28 @@ class config:
     # Synthetic ETF
     setf_lookback_window = 252  # days (1 work year)
     setf_data_frequency = '1d'  # '1m' or '1d' for minute/daily respectively
+    # Shared cache of synthetic ETF series for identical sectors, and optional
+    # on-disk cache directory (shared across processes), and maximum number of
+    # series held in memory per process
+    setf_cache_enabled = False
+    setf_cache_dir = None
+    setf_cache_max_entries = 20000
+    # Build a cleaned price panel once per run (see `PricePanel`); the panel is
+    # set at backtest initialization
+    setf_price_panel = False
+    price_panel = None
+    # Serve minute-frequency lookback windows from a per-run multi-resolution
+    # price cache, filled incrementally (see `MultiResolutionPriceCache`)
+    setf_multires_cache = False
+    # Storage precision of price panels and synthetic ETF series; 'float64' or
+    # 'float32'. Covariance and optimizer math always accumulate in float64.
+    # NOTE: With 'float32', stored prices carry a relative error of at most
+    #       2^-24 (~6e-8); log returns an absolute error of ~1.2e-7 per bar,
+    #       i.e. ~1e-5 relative to typical daily volatility (~1%), and ETF
+    #       variances and covariances a relative error of the same order.
+    storage_dtype = 'float64'
+    # Threads for concurrent per-sector updates (None or 1 to run serially)
+    sector_update_workers = None
 
     # Restructuring and rebalancing triggers
     # NOTE: The 'week' key indicates the week of the rebalance; counting here
@@ -44,3 +90,42 @@ class config:
         'day': '*',
         'week': 1
     }
+
+    # Rebalancing policy; 'calendar' rebalances on every rebalancing trigger,
+    # 'drift' rebalances on a trigger only if the realized drift of the
+    # portfolio ETF weights (fraction of the portfolio to be traded back to the
+    # target weights) exceeds the threshold; skipped rebalances are recorded
+    rebalance_policy = 'calendar'
+    rebalance_drift_threshold = 0.02
+
+
+def getStorageDtype() -> np.dtype:
+    """Function to get the storage precision in the configuration.
+
+    Returns:
+        np.dtype -- Storage dtype.
+    """
+
+    return np.dtype(config.storage_dtype)
+
+
+@contextmanager
+def overrideConfig(overrides: dict):
+    """Context manager to temporarily override configuration attributes. The
+    original values are restored on exit.
+
+    Arguments:
+        overrides {dict} -- Configuration attribute -> value overrides.
+    """
+
+    overrides = overrides or dict()
+    original = dict((i, getattr(config, i)) for i in overrides)
+
+    for key, value in overrides.items():
+        setattr(config, key, value)
+
+    try:
+        yield config
+    finally:
+        for key, value in original.items():
+            setattr(config, key, value)
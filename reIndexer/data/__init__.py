@@ -0,0 +1,3 @@
+from .synthetic_bundle import SyntheticBundle
+from .price_panel import PricePanel
+from .multires_cache import MultiResolutionPriceCache
@@ -0,0 +1,238 @@
+import logging
+import numpy as np
+import pandas as pd
+
+
+class MultiResolutionPriceCache():
+    """Per-run cache of the price history of a set of assets at multiple
+    resolutions, for minute-frequency lookback windows.
+
+    With minute data (`config.setf_data_frequency = '1m'`), every rebalance
+    re-reads the complete minute lookback window of every sector from zipline.
+    This cache is instead filled incrementally as the simulation advances; each
+    update only reads the minute bars since the previous update. The most
+    recent minute bars are kept as is, and older bars are aggregated into
+    hourly, and then daily bars (last price of each period), such that memory
+    grows with the number of resolutions (and their windows), not with the
+    number of minutes simulated. Lookback requests at any supported frequency
+    ('1m', '1h' or '1d') are served from the cache.
+
+    Zipline adjusts histories for splits and dividends as of the current
+    simulation bar; cached bars read before an adjustment of one of the assets
+    becomes effective are therefore unadjusted. Given the adjustment reader of
+    the bundle, the cache is reset (i.e. re-read from zipline) when an
+    adjustment of any cached asset becomes effective.
+
+    NOTE: Minute bars are only evicted (aggregated) in whole hours, and hourly
+          bars in whole days, so aggregated bars are never partial. Hourly bars
+          are labelled with the start of the hour (UTC), and daily bars with
+          midnight (UTC) of the session, as in zipline.
+    """
+
+    frequencies = ('1m', '1h', '1d')
+
+    def __init__(self, trading_calendar, minute_window: int,
+        hourly_window: int=147, daily_window: int=252,
+        adjustment_reader=None):
+        """Initialization method for `MultiResolutionPriceCache`.
+
+        Arguments:
+            trading_calendar {TradingCalendar} -- Trading calendar of the
+                                                  simulation.
+            minute_window {int} -- Minimum number of minute bars kept.
+
+        Keyword Arguments:
+            hourly_window {int} -- Minimum number of hourly bars kept
+                                   (default: {147}; ~1 month of sessions).
+            daily_window {int} -- Maximum number of daily bars kept
+                                  (default: {252}).
+            adjustment_reader {SQLiteAdjustmentReader} -- Adjustment reader
+                                                          of the bundle; the
+                                                          cache is not reset
+                                                          on adjustments if
+                                                          None (default:
+                                                          {None}).
+        """
+
+        self.trading_calendar = trading_calendar
+        self.minute_window = minute_window
+        self.hourly_window = hourly_window
+        self.daily_window = daily_window
+        self.adjustment_reader = adjustment_reader
+
+        self.assets = None
+        self.adjustment_dates = None
+        self.last_dt = None
+        self.minute_bars = None
+        self.hourly_bars = None
+        self.daily_bars = None
+
+    @staticmethod
+    def aggregate(bars: pd.DataFrame, frequency: str) -> pd.DataFrame:
+        """Function to aggregate price bars to a lower resolution (last price
+        in each period, forward-filled).
+
+        Arguments:
+            bars {pd.DataFrame} -- Price bars (dates x assets).
+            frequency {str} -- Target frequency; '1h' or '1d'.
+
+        Returns:
+            pd.DataFrame -- Aggregated price bars.
+        """
+
+        period = bars.index.floor('60min' if frequency == '1h' else 'D')
+
+        return bars.ffill().groupby(period).last()
+
+    def update(self, zipline_data, end_dt: pd.Timestamp, assets: list):
+        """Function to fill the cache up to the current simulation bar; reads
+        the minute bars since the last update only (the cache is reset if the
+        set of assets changes).
+
+        NOTE: Zipline data access is not thread-safe; this must be called from
+              the simulation thread.
+
+        Arguments:
+            zipline_data {BarData} -- Instance zipline data bundle.
+            end_dt {pd.Timestamp} -- Current simulation bar.
+            assets {list} -- List of assets.
+        """
+
+        if self.assets is None or set(assets) != set(self.assets):
+            self.reset(zipline_data=zipline_data, assets=assets)
+            return
+
+        if end_dt <= self.last_dt:
+            return
+
+        # Re-reading all (adjusted) bars once an adjustment becomes effective
+        if np.any((self.adjustment_dates > self.last_dt) &
+                  (self.adjustment_dates <= end_dt)):
+            logging.debug('Price adjustment of cached assets effective by {0}'
+                .format(end_dt))
+            self.reset(zipline_data=zipline_data, assets=assets)
+            return
+
+        # Reading new minute bars only
+        n_new = len(self.trading_calendar.minutes_in_range(self.last_dt,
+                                                           end_dt)) - 1
+        if n_new <= 0:
+            return
+
+        new_bars = zipline_data.history(self.assets, 'price',
+                                        bar_count=n_new, frequency='1m')
+        self.minute_bars = pd.concat([self.minute_bars,
+            new_bars.loc[new_bars.index > self.last_dt]])
+        self.last_dt = self.minute_bars.index[-1]
+
+        self.evict()
+
+    def reset(self, zipline_data, assets: list):
+        """Function to (re)fill the cache for a set of assets; reads the
+        minute window, and seeds the daily bars before it from zipline's daily
+        history.
+
+        Arguments:
+            zipline_data {BarData} -- Instance zipline data bundle.
+            assets {list} -- List of assets.
+        """
+
+        self.assets = list(assets)
+        self.adjustment_dates = self.getAdjustmentDates(assets=self.assets)
+        self.minute_bars = zipline_data.history(self.assets, 'price',
+            bar_count=self.minute_window, frequency='1m')
+        self.last_dt = self.minute_bars.index[-1]
+        self.hourly_bars = self.minute_bars.iloc[:0]
+
+        # Seeding complete sessions before the minute window
+        daily_bars = zipline_data.history(self.assets, 'price',
+            bar_count=self.daily_window + 1, frequency='1d')
+        daily_bars.index = daily_bars.index.floor('D')
+        self.daily_bars = daily_bars.loc[daily_bars.index <
+                                         self.minute_bars.index[0].floor('D')]
+
+        logging.debug('Filled multi-resolution price cache for {0} assets '
+            'with {1} minute bars'.format(len(self.assets),
+                                          len(self.minute_bars)))
+
+    def getAdjustmentDates(self, assets: list) -> pd.DatetimeIndex:
+        """Function to get the effective dates of the price adjustments
+        (splits, mergers and dividends) of a list of assets.
+
+        Arguments:
+            assets {list} -- List of assets.
+
+        Returns:
+            pd.DatetimeIndex -- Adjustment effective dates (UTC).
+        """
+
+        if self.adjustment_reader is None:
+            return pd.DatetimeIndex([], tz='UTC')
+
+        return pd.DatetimeIndex(sorted(set(j[0] for i in assets
+            for table in ['splits', 'mergers', 'dividends']
+            for j in self.adjustment_reader.get_adjustments_for_sid(table,
+                                                                    i.sid))),
+            tz='UTC')
+
+    def evict(self):
+        """Function to aggregate the minute (and hourly) bars outside of their
+        windows into the next resolution, in whole periods.
+        """
+
+        # Minute bars -> hourly bars (whole hours before the minute window)
+        if len(self.minute_bars) > self.minute_window:
+            boundary = self.minute_bars.index[-self.minute_window]\
+                .floor('60min')
+            evicted = self.minute_bars.index < boundary
+            if evicted.any():
+                self.hourly_bars = pd.concat([self.hourly_bars, self.aggregate(
+                    self.minute_bars.loc[evicted], frequency='1h')])
+                self.minute_bars = self.minute_bars.loc[~evicted]
+
+        # Hourly bars -> daily bars (whole days before the hourly window)
+        if len(self.hourly_bars) > self.hourly_window:
+            boundary = self.hourly_bars.index[-self.hourly_window].floor('D')
+            evicted = self.hourly_bars.index < boundary
+            if evicted.any():
+                self.daily_bars = pd.concat([self.daily_bars, self.aggregate(
+                    self.hourly_bars.loc[evicted], frequency='1d')])\
+                    .iloc[-self.daily_window:]
+                self.hourly_bars = self.hourly_bars.loc[~evicted]
+
+    def getHistory(self, assets: list, bar_count: int, frequency: str)\
+        -> pd.DataFrame:
+        """Function to get the price history of a list of assets from the
+        cache, ending on the last cached bar.
+
+        Arguments:
+            assets {list} -- List of (cached) assets.
+            bar_count {int} -- Number of bars.
+            frequency {str} -- '1m', '1h' or '1d'.
+
+        Raises:
+            ValueError -- Raised when the frequency is not supported, or the
+                          cache holds fewer bars than requested.
+
+        Returns:
+            pd.DataFrame -- Price history (dates x assets).
+        """
+
+        if frequency not in self.frequencies:
+            logging.error('Unsupported cache frequency {0}'.format(frequency))
+            raise ValueError
+
+        if frequency == '1m':
+            history = self.minute_bars
+        else:
+            hourly_bars = pd.concat([self.hourly_bars,
+                self.aggregate(self.minute_bars, frequency='1h')])
+            history = hourly_bars if frequency == '1h' else pd.concat(
+                [self.daily_bars, self.aggregate(hourly_bars, frequency='1d')])
+
+        if len(history) < bar_count:
+            logging.error('Price cache holds {0} of {1} requested {2} bars'
+                .format(len(history), bar_count, frequency))
+            raise ValueError
+
+        return history[assets].iloc[-bar_count:]
@@ -0,0 +1,187 @@
+from ..cfg import getStorageDtype
+
+import logging
+import numpy as np
+import pandas as pd
+
+
+class PricePanel():
+    """Class to hold a price panel that is cleaned once per run, with a boolean
+    validity mask of the raw (unfilled) prices. Prices are stored in the
+    storage precision of the configuration (`config.storage_dtype`).
+
+    `PriceWeightedETF` reads each lookback window with zipline's `history`
+    ('price' field; i.e. forward filled from the last traded price, also from
+    before the window, up to the end date of each asset, and adjusted for
+    splits and dividends as of the end of the window), followed by a backward
+    fill and a forward fill within the window. The panel holds the raw
+    (unadjusted) close prices and the price adjustments of the assets instead,
+    and precomputes the positions of the next and previous filled price of
+    every bar once. Any window can then be read with exactly the same
+    semantics as the per-window history calls, with index arithmetic, a
+    single gather, and the adjustments that are effective at the end of the
+    window (i.e. without look-ahead, and without copying and refilling
+    DataFrames).
+    """
+
+    def __init__(self, prices: pd.DataFrame, adjustments: dict=None,
+        end_dates: dict=None):
+        """Initialization method for `PricePanel`.
+
+        Arguments:
+            prices {pd.DataFrame} -- Raw (unadjusted) price panel (dates x
+                                     tickers); missing bars are NaN.
+
+        Keyword Arguments:
+            adjustments {dict} -- Dictionary of ticker -> list of
+                                  (effective date, ratio) price adjustments
+                                  (splits, mergers and dividends); prices
+                                  before the effective date are multiplied by
+                                  the ratio in windows ending on or after the
+                                  effective date (default: {None}; no
+                                  adjustments).
+            end_dates {dict} -- Dictionary of ticker -> last trading date;
+                                prices are not forward filled past it
+                                (default: {None}; no end dates).
+        """
+
+        self.index = prices.index
+        self.tickers = list(prices.columns)
+        self.ticker_idx = dict(zip(self.tickers, range(len(self.tickers))))
+        self.prices = np.asarray(prices.values, dtype=getStorageDtype())
+
+        # Adjustments by column; (effective dates, ratios), sorted
+        self.adjustments = dict()
+        for ticker, ticker_adjustments in (adjustments or dict()).items():
+            if ticker not in self.ticker_idx or not ticker_adjustments:
+                continue
+            effective, ratios = zip(*sorted(ticker_adjustments))
+            self.adjustments[self.ticker_idx[ticker]] = (
+                pd.DatetimeIndex(effective).values,
+                np.asarray(ratios, dtype=np.float64)
+            )
+
+        # Validity mask of the raw prices
+        self.valid_mask = ~np.isnan(self.prices)
+
+        # Position of the last traded price of each bar (as forward filled by
+        # zipline), within the trading window of the asset; -1 if there is
+        # none
+        n_bars = self.prices.shape[0]
+        positions = np.arange(n_bars)[:, None]
+        self.source = np.maximum.accumulate(
+            np.where(self.valid_mask, positions, -1), axis=0)
+        if end_dates:
+            bar_dates = self.index.normalize()
+            for ticker, end_date in end_dates.items():
+                if ticker in self.ticker_idx:
+                    self.source[bar_dates > end_date,
+                                self.ticker_idx[ticker]] = -1
+
+        # Positions of the previous (and next) bar with a filled price; -1
+        # (and the number of bars) if there is none
+        is_filled = self.source >= 0
+        self.prev_valid = np.maximum.accumulate(
+            np.where(is_filled, positions, -1), axis=0)
+        self.next_valid = np.minimum.accumulate(
+            np.where(is_filled, positions, n_bars)[::-1], axis=0)[::-1]
+
+        logging.debug('Built price panel with {0} bars, {1} tickers and {2} '
+            'adjusted tickers'.format(n_bars, len(self.tickers),
+                                      len(self.adjustments)))
+
+    def getValidMask(self) -> pd.DataFrame:
+        """Function to get the validity mask of the raw prices.
+
+        Returns:
+            pd.DataFrame -- Validity mask (dates x tickers).
+        """
+
+        return pd.DataFrame(self.valid_mask, index=self.index,
+                            columns=self.tickers)
+
+    def getWindowPositions(self, end_dt: pd.Timestamp, bar_count: int)\
+        -> tuple:
+        """Function to get the row positions of the window of `bar_count` bars
+        ending on (and including) the given date.
+
+        Arguments:
+            end_dt {pd.Timestamp} -- Last bar of the window.
+            bar_count {int} -- Number of bars.
+
+        Returns:
+            tuple -- Start and end (exclusive) row positions.
+        """
+
+        end = self.index.searchsorted(end_dt, side='right')
+        if end == 0:
+            logging.error('Window end {0} before start of price panel'
+                .format(end_dt))
+            raise KeyError
+
+        return max(end - bar_count, 0), end
+
+    def getWindow(self, tickers: list, end_dt: pd.Timestamp, bar_count: int)\
+        -> tuple:
+        """Function to get a filled price window; equivalent to
+        `history.fillna(method='bfill').fillna(method='ffill')` on the
+        history ('price' field) of the window.
+
+        Arguments:
+            tickers {list} -- List of tickers.
+            end_dt {pd.Timestamp} -- Last bar of the window.
+            bar_count {int} -- Number of bars.
+
+        Returns:
+            tuple -- Filled prices (np.ndarray; bars x tickers), and window
+                     index (pd.DatetimeIndex).
+        """
+
+        start, end = self.getWindowPositions(end_dt=end_dt,
+                                             bar_count=bar_count)
+        cols = np.array([self.ticker_idx[i] for i in tickers], dtype=np.intp)
+
+        # Backward fill within the window, then forward fill within the window
+        next_valid = self.next_valid[start:end][:, cols]
+        prev_valid = self.prev_valid[start:end][:, cols]
+        filled = np.where(next_valid < end, next_valid,
+            np.where(prev_valid >= start, prev_valid, -1))
+        source = np.where(filled >= 0, self.source[np.maximum(filled, 0),
+                                                   cols], -1)
+
+        window = self.prices[np.maximum(source, 0), cols]
+        window[source < 0] = np.nan
+
+        # Adjustments effective at the end of the window, of the prices traded
+        # before the effective dates
+        window_end = self.index.values[end - 1]
+        source_dates = self.index.values[np.maximum(source, 0)]
+        for i, col in enumerate(cols):
+            if col not in self.adjustments:
+                continue
+            effective, ratios = self.adjustments[col]
+            for effective_date, ratio in zip(effective, ratios):
+                if effective_date > window_end:
+                    break
+                window[source_dates[:, i] < effective_date, i] *= ratio
+
+        return window, self.index[start:end]
+
+    def getWindowFrame(self, tickers: list, end_dt: pd.Timestamp,
+        bar_count: int) -> pd.DataFrame:
+        """Function to get a filled price window as a DataFrame (see
+        `getWindow`).
+
+        Arguments:
+            tickers {list} -- List of tickers.
+            end_dt {pd.Timestamp} -- Last bar of the window.
+            bar_count {int} -- Number of bars.
+
+        Returns:
+            pd.DataFrame -- Filled prices (dates x tickers).
+        """
+
+        window, index = self.getWindow(tickers=tickers, end_dt=end_dt,
+                                       bar_count=bar_count)
+
+        return pd.DataFrame(window, index=index, columns=tickers)
@@ -0,0 +1,426 @@
+from zipline.data import bundles
+import logging
+import numpy as np
+import pandas as pd
+
+
+class SyntheticBundle():
+    """Generator of a deterministic, local synthetic data bundle.
+
+    Prices follow geometric random walks, with per-ticker drift and volatility.
+    Tickers are listed and delisted at random points of the sample (listing and
+    delisting gaps), individual bars are randomly missing (NaN patterns), and
+    tickers may optionally split (2-for-1) once within their trading window
+    (raw bars are unadjusted; the splits are written as bundle adjustments).
+    Every ticker is generated from its own seeded random state, so bars can be
+    generated lazily (one ticker at a time) and are identical across runs and
+    processes.
+
+    The bundle may be registered and ingested with zipline's bundle machinery
+    (see `register`), or read directly as a price panel (see `getPricePanel`),
+    e.g. for `VectorizedBacktest`; this allows scaling tests without network
+    access.
+    """
+
+    def __init__(self, n_tickers: int=5000, seed: int=0,
+        listing_gap_prob: float=0.2, delisting_prob: float=0.1,
+        nan_prob: float=0.001, split_prob: float=0.,
+        minutes_per_day: int=None):
+        """Initialization method for `SyntheticBundle`.
+
+        Keyword Arguments:
+            n_tickers {int} -- Number of tickers (default: {5000}).
+            seed {int} -- Random seed (default: {0}).
+            listing_gap_prob {float} -- Probability of a ticker being listed
+                                        after the start of the sample
+                                        (default: {0.2}).
+            delisting_prob {float} -- Probability of a ticker being delisted
+                                      before the end of the sample
+                                      (default: {0.1}).
+            nan_prob {float} -- Probability of an individual bar being missing
+                                (default: {0.001}).
+            split_prob {float} -- Probability of a ticker splitting (2-for-1)
+                                  within its trading window (default: {0.}).
+            minutes_per_day {int} -- Minute bars per (full) session; daily
+                                     bars only if None (default: {None}).
+        """
+
+        self.n_tickers = n_tickers
+        self.seed = seed
+        self.listing_gap_prob = listing_gap_prob
+        self.delisting_prob = delisting_prob
+        self.nan_prob = nan_prob
+        self.split_prob = split_prob
+        self.minutes_per_day = minutes_per_day
+
+        # Synthetic tickers (sid -> ticker)
+        self.tickers = ['SYN{0:05d}'.format(i) for i in range(n_tickers)]
+
+    def getTickers(self) -> list:
+        """Function to get the list of synthetic tickers (in sid order).
+
+        Returns:
+            list -- List of tickers.
+        """
+
+        return self.tickers
+
+    def getListings(self, n_sessions: int) -> tuple:
+        """Function to get the listing and delisting sessions of each ticker.
+
+        Arguments:
+            n_sessions {int} -- Number of sessions in the sample.
+
+        Returns:
+            tuple -- First and last session positions (np.array; inclusive).
+        """
+
+        random_state = np.random.RandomState(self.seed)
+
+        first = np.where(random_state.rand(self.n_tickers) <
+            self.listing_gap_prob, random_state.randint(1, n_sessions // 2,
+                size=self.n_tickers), 0)
+        last = np.where(random_state.rand(self.n_tickers) <
+            self.delisting_prob, random_state.randint(n_sessions // 2,
+                n_sessions - 1, size=self.n_tickers), n_sessions - 1)
+
+        return first, last
+
+    def getSplitDate(self, sid: int, sessions: pd.DatetimeIndex)\
+        -> pd.Timestamp:
+        """Function to get the (2-for-1) split date of a ticker, if any.
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            sessions {pd.DatetimeIndex} -- Trading sessions of the ticker.
+
+        Returns:
+            pd.Timestamp -- Split (effective) session; None if the ticker does
+                            not split.
+        """
+
+        random_state = np.random.RandomState([self.seed, sid, 3])
+        if random_state.rand() >= self.split_prob or len(sessions) < 2:
+            return None
+
+        return sessions[random_state.randint(1, len(sessions))]
+
+    def applySplit(self, sid: int, bars: pd.DataFrame,
+        sessions: pd.DatetimeIndex) -> pd.DataFrame:
+        """Function to apply the split of a ticker (if any) to its raw OHLCV
+        bars; prices from the split date are halved, and volumes doubled.
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            bars {pd.DataFrame} -- OHLCV bars (sessions or minutes).
+            sessions {pd.DatetimeIndex} -- Trading sessions of the ticker.
+
+        Returns:
+            pd.DataFrame -- Raw OHLCV bars.
+        """
+
+        split_date = self.getSplitDate(sid=sid, sessions=sessions)
+        if split_date is None:
+            return bars
+
+        after_split = bars.index.normalize() >= split_date
+        bars.loc[after_split, ['open', 'high', 'low', 'close']] /= 2.
+        bars.loc[after_split, 'volume'] *= 2.
+
+        return bars
+
+    def generateCloses(self, sid: int, n_bars: int,
+        bars_per_day: int=1) -> np.array:
+        """Function to generate the (complete) random-walk close prices of a
+        ticker.
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            n_bars {int} -- Number of bars.
+
+        Keyword Arguments:
+            bars_per_day {int} -- Bars per session (default: {1}).
+
+        Returns:
+            np.array -- Close prices; missing bars are NaN.
+        """
+
+        random_state = np.random.RandomState([self.seed, sid])
+
+        # Per-ticker initial price, (annual) drift and volatility
+        initial_price = random_state.uniform(10, 200)
+        drift = random_state.normal(0.05, 0.1) / (252. * bars_per_day)
+        vol = random_state.uniform(0.15, 0.6) / np.sqrt(252. * bars_per_day)
+
+        log_rets = random_state.normal(drift - vol ** 2 / 2, vol, size=n_bars)
+        closes = initial_price * np.exp(np.cumsum(log_rets))
+
+        # Missing bars
+        closes[random_state.rand(n_bars) < self.nan_prob] = np.nan
+
+        return closes
+
+    def generateBars(self, sid: int, index: pd.DatetimeIndex,
+        bars_per_day: int=1) -> pd.DataFrame:
+        """Function to generate OHLCV bars of a ticker; missing bars have zero
+        prices and volume (zipline's convention for missing data).
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            index {pd.DatetimeIndex} -- Bar index (sessions or minutes).
+
+        Keyword Arguments:
+            bars_per_day {int} -- Bars per session (default: {1}).
+
+        Returns:
+            pd.DataFrame -- OHLCV bars.
+        """
+
+        closes = self.generateCloses(sid=sid, n_bars=len(index),
+                                     bars_per_day=bars_per_day)
+        opens = np.append(closes[0], closes[:-1])
+        spread = np.abs(np.random.RandomState([self.seed, sid, 1])
+            .normal(0, 0.002, size=len(index)))
+
+        bars = pd.DataFrame({
+            'open': opens,
+            'high': np.fmax(opens, closes) * (1 + spread),
+            'low': np.fmin(opens, closes) * (1 - spread),
+            'close': closes,
+            'volume': np.random.RandomState([self.seed, sid, 2])
+                .randint(10000, 1000000, size=len(index)).astype(np.float64)
+        }, index=index, columns=['open', 'high', 'low', 'close', 'volume'])
+
+        # Zipline convention for missing bars
+        bars.loc[np.isnan(closes)] = 0
+
+        return bars
+
+    def generateMinuteBars(self, sid: int, minutes: pd.DatetimeIndex,
+        calendar) -> pd.DataFrame:
+        """Function to generate the minute OHLCV bars of a ticker. The random
+        walk is generated on a grid of full sessions (`minutes_per_day` bars
+        each), so that early closes only truncate their sessions.
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            minutes {pd.DatetimeIndex} -- Trading minutes of the ticker.
+            calendar {TradingCalendar} -- Trading calendar.
+
+        Returns:
+            pd.DataFrame -- Minute OHLCV bars.
+        """
+
+        # Position of each minute on the full-session grid
+        session_labels = calendar.minute_index_to_session_labels(minutes)
+        session_pos = np.cumsum(np.append(True,
+            session_labels[1:] != session_labels[:-1])) - 1
+        session_starts = np.flatnonzero(np.append(True,
+            session_labels[1:] != session_labels[:-1]))
+        grid_pos = session_pos * self.minutes_per_day +\
+            np.arange(len(minutes)) - session_starts[session_pos]
+
+        grid_bars = self.generateBars(
+            sid=sid,
+            index=pd.RangeIndex(grid_pos[-1] + 1),
+            bars_per_day=self.minutes_per_day
+        )
+        minute_bars = grid_bars.iloc[grid_pos]
+        minute_bars.index = minutes
+
+        return self.applySplit(sid=sid, bars=minute_bars,
+                               sessions=session_labels.unique())
+
+    @staticmethod
+    def aggregateDaily(minute_bars: pd.DataFrame, calendar) -> pd.DataFrame:
+        """Function to aggregate minute bars to daily (session) bars; missing
+        minute bars are ignored.
+
+        Arguments:
+            minute_bars {pd.DataFrame} -- Minute OHLCV bars.
+            calendar {TradingCalendar} -- Trading calendar.
+
+        Returns:
+            pd.DataFrame -- Daily OHLCV bars.
+        """
+
+        session_labels = calendar.minute_index_to_session_labels(
+            minute_bars.index)
+        daily_bars = minute_bars.replace(0, np.nan).groupby(session_labels)\
+            .agg({'open': 'first', 'high': 'max', 'low': 'min',
+                  'close': 'last', 'volume': 'sum'})
+
+        return daily_bars[minute_bars.columns].fillna(0)
+
+    def getPricePanel(self, sessions: pd.DatetimeIndex,
+        calendar=None) -> pd.DataFrame:
+        """Function to read the synthetic daily close prices directly as a
+        price panel (without ingestion). Prices outside of the trading window
+        of each ticker, and missing bars, are NaN; prices are not adjusted for
+        splits (see `split_prob`).
+
+        Arguments:
+            sessions {pd.DatetimeIndex} -- Trading sessions.
+
+        Keyword Arguments:
+            calendar {TradingCalendar} -- Trading calendar; required for minute
+                                          bundles, where daily bars are
+                                          aggregated from the minute bars
+                                          (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Price panel (sessions x tickers).
+        """
+
+        first, last = self.getListings(n_sessions=len(sessions))
+        prices = np.full((len(sessions), self.n_tickers), np.nan)
+
+        for sid in range(self.n_tickers):
+            prices[first[sid]:last[sid] + 1, sid] = self.getDailyBars(
+                sid=sid,
+                sessions=sessions[first[sid]:last[sid] + 1],
+                calendar=calendar
+            )['close'].replace(0, np.nan).values
+
+        return pd.DataFrame(prices, index=sessions, columns=self.tickers)
+
+    def getDailyBars(self, sid: int, sessions: pd.DatetimeIndex,
+        calendar=None) -> pd.DataFrame:
+        """Function to get the daily OHLCV bars of a ticker over its trading
+        sessions; aggregated from the minute bars for minute bundles.
+
+        Arguments:
+            sid {int} -- Ticker sid.
+            sessions {pd.DatetimeIndex} -- Trading sessions of the ticker.
+
+        Keyword Arguments:
+            calendar {TradingCalendar} -- Trading calendar; required for minute
+                                          bundles (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Daily OHLCV bars.
+        """
+
+        if not self.minutes_per_day:
+            return self.applySplit(sid=sid, bars=self.generateBars(sid=sid,
+                index=sessions), sessions=sessions)
+
+        minute_bars = self.generateMinuteBars(
+            sid=sid,
+            minutes=calendar.minutes_for_sessions_in_range(sessions[0],
+                                                           sessions[-1]),
+            calendar=calendar
+        )
+
+        return self.aggregateDaily(minute_bars=minute_bars, calendar=calendar)\
+            .reindex(sessions).fillna(0)
+
+    def getMetadata(self, sessions: pd.DatetimeIndex) -> pd.DataFrame:
+        """Function to build the asset metadata of the bundle.
+
+        Arguments:
+            sessions {pd.DatetimeIndex} -- Trading sessions.
+
+        Returns:
+            pd.DataFrame -- Asset metadata (indexed by sid).
+        """
+
+        first, last = self.getListings(n_sessions=len(sessions))
+
+        return pd.DataFrame({
+            'symbol': self.tickers,
+            'asset_name': self.tickers,
+            'start_date': sessions[first],
+            'end_date': sessions[last],
+            'auto_close_date': sessions[np.minimum(last + 1,
+                len(sessions) - 1)],
+            'exchange': 'SYNTHETIC'
+        }, index=pd.Index(range(self.n_tickers), name='sid'))
+
+    def ingest(self, environ, asset_db_writer, minute_bar_writer,
+        daily_bar_writer, adjustment_writer, calendar, start_session,
+        end_session, cache, show_progress, output_dir):
+        """Zipline bundle ingest function (see `zipline.data.bundles`). Writes
+        the asset database, and daily and (optionally) minute bars, generated
+        lazily, one ticker at a time.
+        """
+
+        sessions = calendar.sessions_in_range(start_session, end_session)
+        first, last = self.getListings(n_sessions=len(sessions))
+
+        logging.info('Ingesting synthetic bundle with {0} tickers over {1} '
+            'sessions'.format(self.n_tickers, len(sessions)))
+
+        asset_db_writer.write(equities=self.getMetadata(sessions=sessions))
+
+        daily_bar_writer.write(
+            ((sid, self.getDailyBars(sid=sid,
+                sessions=sessions[first[sid]:last[sid] + 1],
+                calendar=calendar))
+                for sid in range(self.n_tickers)),
+            show_progress=show_progress
+        )
+
+        if self.minutes_per_day:
+            minute_bar_writer.write(
+                ((sid, self.generateMinuteBars(sid=sid,
+                    minutes=calendar.minutes_for_sessions_in_range(
+                        sessions[first[sid]], sessions[last[sid]]),
+                    calendar=calendar))
+                    for sid in range(self.n_tickers)),
+                show_progress=show_progress
+            )
+
+        # Splits (ratio applied to the prices before the split); no dividends
+        split_dates = dict((i, self.getSplitDate(sid=i,
+            sessions=sessions[first[i]:last[i] + 1]))
+            for i in range(self.n_tickers))
+        splits = pd.DataFrame({
+            'sid': [i for i, j in split_dates.items() if j is not None],
+            'effective_date': [j for j in split_dates.values()
+                               if j is not None],
+            'ratio': 0.5
+        }, columns=['sid', 'effective_date', 'ratio'])
+        adjustment_writer.write(splits=splits if len(splits) else None)
+
+    def register(self, name: str='synthetic', start_session:
+        pd.Timestamp=None, end_session: pd.Timestamp=None,
+        calendar_name: str='NYSE'):
+        """Function to register the synthetic bundle with zipline; ingest with
+        `zipline ingest -b <name>` (or `bundles.ingest(<name>)`).
+
+        Keyword Arguments:
+            name {str} -- Bundle name (default: {'synthetic'}).
+            start_session {pd.Timestamp} -- First session (default: {None}).
+            end_session {pd.Timestamp} -- Last session (default: {None}).
+            calendar_name {str} -- Trading calendar name (default: {'NYSE'}).
+        """
+
+        bundles.register(
+            name,
+            self.ingest,
+            calendar_name=calendar_name,
+            start_session=start_session,
+            end_session=end_session,
+            minutes_per_day=self.minutes_per_day or 390
+        )
+
+    def writeUniverse(self, csv_file: str, n_sectors: int=50):
+        """Function to write a sector universe file (see README) assigning the
+        synthetic tickers to sectors at random (deterministically).
+
+        Arguments:
+            csv_file {str} -- Output CSV file path.
+
+        Keyword Arguments:
+            n_sectors {int} -- Number of sectors (default: {50}).
+        """
+
+        random_state = np.random.RandomState(self.seed)
+
+        pd.DataFrame({
+            'sector': ['sector_{0}'.format(i) for i in
+                random_state.randint(0, n_sectors, size=self.n_tickers)],
+            'ticker': self.tickers
+        }, columns=['sector', 'ticker']).sort_values(by='sector')\
+            .to_csv(csv_file, index=False)
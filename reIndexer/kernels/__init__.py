@@ -0,0 +1,4 @@
+from .numeric import HAS_NUMBA, activeSetMinVar, allocatedHoldingReturns,\
+    allocatedPrices, projectedGradientFactorMinVar, projectedGradientMinVar,\
+    segmentIds, segmentedHoldingReturns, segmentedPrices, segmentedTurnover,\
+    useNumba
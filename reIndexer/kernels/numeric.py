@@ -0,0 +1,440 @@
+from ..cfg import config
+
+import logging
+import numpy as np
+
+# Optional Numba JIT backend
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    logging.debug('Numba not installed; using NumPy kernels')
+
+
+def _jit(func):
+    """Compile a kernel with Numba (if installed); the pure Python/NumPy
+    function is returned otherwise.
+    """
+
+    return njit(cache=True, nogil=True)(func) if HAS_NUMBA else func
+
+
+def useNumba() -> bool:
+    """Function to check if the Numba kernels are used; i.e. if Numba is
+    installed, and not disabled in the configuration (`config.use_numba`).
+
+    Returns:
+        bool -- True if the Numba kernels are used.
+    """
+
+    return HAS_NUMBA and config.use_numba
+
+
+##########################
+# SEGMENTED ETF PRICING
+##########################
+
+def _segmentedPricesLoop(prices, reset_flags, holding):
+    n_bars, n_assets = prices.shape
+    out = np.zeros(n_bars)
+    alloc = np.zeros(n_assets)
+    for t in range(n_bars):
+        # Holding return priced with the allocation held over the last bar
+        if holding and t > 0:
+            prev_price = 0.
+            price = 0.
+            for i in range(n_assets):
+                prev_price += alloc[i] * prices[t - 1, i]
+                price += alloc[i] * prices[t, i]
+            out[t] = price / prev_price - 1
+        # Recomputing allocation on a restructure (and the first bar)
+        if t == 0 or reset_flags[t]:
+            row_sum = 0.
+            for i in range(n_assets):
+                row_sum += prices[t, i]
+            for i in range(n_assets):
+                alloc[i] = prices[t, i] / row_sum
+        if not holding:
+            price = 0.
+            for i in range(n_assets):
+                price += alloc[i] * prices[t, i]
+            out[t] = price
+    return out
+
+
+_segmentedPricesJit = _jit(_segmentedPricesLoop)
+
+
+def segmentIds(reset_flags: np.array) -> tuple:
+    """Kernel to get the segments of a sequence of reset (restructure) flags;
+    a segment starts on the first row, and on every reset row.
+
+    Arguments:
+        reset_flags {np.array} -- Boolean reset (restructure) flags (dates).
+
+    Returns:
+        tuple -- Segment start rows (np.array), and the segment ID of each row
+                 (np.array).
+    """
+
+    reset_flags = np.array(reset_flags, dtype=bool, copy=True)
+    reset_flags[0] = True
+    return np.flatnonzero(reset_flags), np.cumsum(reset_flags) - 1
+
+
+def _segmentAllocations(prices: np.ndarray, reset_flags: np.array) -> tuple:
+    reset_rows, segment_ids = segmentIds(reset_flags)
+    reset_prices = prices[reset_rows].astype(np.float64)
+    return reset_prices / reset_prices.sum(axis=1)[:, None], segment_ids
+
+
+def segmentedPrices(prices: np.ndarray, reset_flags: np.array) -> np.array:
+    """Kernel to compute segmented price-weighted ETF prices; the allocation
+    is recomputed on the first row, and on every reset row (see
+    `PriceWeightedETF.computeSyntheticPrices`).
+
+    Arguments:
+        prices {np.ndarray} -- Component asset prices (dates x assets).
+        reset_flags {np.array} -- Boolean reset (restructure) flags (dates).
+
+    Returns:
+        np.array -- ETF prices.
+    """
+
+    if useNumba():
+        return _segmentedPricesJit(np.ascontiguousarray(prices,
+            dtype=np.float64), np.asarray(reset_flags, dtype=np.bool_), False)
+
+    alloc_weights, segment_ids = _segmentAllocations(prices, reset_flags)
+    return np.einsum('ij,ij->i', prices, alloc_weights[segment_ids],
+                     dtype=np.float64)
+
+
+def segmentedHoldingReturns(prices: np.ndarray, reset_flags: np.array)\
+    -> np.array:
+    """Kernel to compute the holding returns of a segmented price-weighted ETF
+    (see `PriceWeightedETF.computeHoldingReturns`).
+
+    Arguments:
+        prices {np.ndarray} -- Component asset prices (dates x assets).
+        reset_flags {np.array} -- Boolean reset (restructure) flags (dates).
+
+    Returns:
+        np.array -- ETF holding returns (zero on the first row).
+    """
+
+    if useNumba():
+        return _segmentedPricesJit(np.ascontiguousarray(prices,
+            dtype=np.float64), np.asarray(reset_flags, dtype=np.bool_), True)
+
+    alloc_weights, segment_ids = _segmentAllocations(prices, reset_flags)
+    held_weights = alloc_weights[segment_ids[:-1]]
+    holding_rets = np.zeros(prices.shape[0])
+    holding_rets[1:] = np.einsum('ij,ij->i', prices[1:], held_weights,
+        dtype=np.float64) / np.einsum('ij,ij->i', prices[:-1], held_weights,
+        dtype=np.float64) - 1
+    return holding_rets
+
+
+def allocatedPrices(prices: np.ndarray, alloc_weights: np.ndarray,
+    segment_ids: np.array) -> np.ndarray:
+    """Kernel to compute segmented ETF prices for a stack of allocation
+    schemes at once; i.e. the ETF price of each row is priced with the
+    allocation of its segment (see `segmentedPrices`).
+
+    Arguments:
+        prices {np.ndarray} -- Component asset prices (dates x assets).
+        alloc_weights {np.ndarray} -- Allocation weights (schemes x segments x
+                                      assets).
+        segment_ids {np.array} -- Segment ID of each row (see `segmentIds`).
+
+    Returns:
+        np.ndarray -- ETF prices (schemes x dates).
+    """
+
+    return np.einsum('ij,sij->si', prices, alloc_weights[:, segment_ids],
+                     dtype=np.float64)
+
+
+def allocatedHoldingReturns(prices: np.ndarray, alloc_weights: np.ndarray,
+    segment_ids: np.array) -> np.ndarray:
+    """Kernel to compute the holding returns of segmented ETFs for a stack of
+    allocation schemes at once (see `segmentedHoldingReturns`).
+
+    Arguments:
+        prices {np.ndarray} -- Component asset prices (dates x assets).
+        alloc_weights {np.ndarray} -- Allocation weights (schemes x segments x
+                                      assets).
+        segment_ids {np.array} -- Segment ID of each row (see `segmentIds`).
+
+    Returns:
+        np.ndarray -- ETF holding returns (schemes x dates; zero on the first
+                      row).
+    """
+
+    held_weights = alloc_weights[:, segment_ids[:-1]]
+    holding_rets = np.zeros((alloc_weights.shape[0], prices.shape[0]))
+    holding_rets[:, 1:] = np.einsum('ij,sij->si', prices[1:], held_weights,
+        dtype=np.float64) / np.einsum('ij,sij->si', prices[:-1], held_weights,
+        dtype=np.float64) - 1
+    return holding_rets
+
+
+##########################
+# TURNOVER ACCUMULATION
+##########################
+
+def _segmentedTurnoverLoop(old_weights, new_weights, prices, offsets):
+    n_segments = len(offsets) - 1
+    out = np.zeros(n_segments)
+    for k in range(n_segments):
+        for i in range(offsets[k], offsets[k + 1]):
+            out[k] += abs(new_weights[i] - old_weights[i]) * prices[i]
+    return out
+
+
+_segmentedTurnoverJit = _jit(_segmentedTurnoverLoop)
+
+
+def segmentedTurnover(old_weights: np.array, new_weights: np.array,
+    prices: np.array, offsets: np.array) -> np.array:
+    """Kernel to compute the dollar value turnover of each segment of a set of
+    concatenated weight vectors; i.e. sum(|new - old| * price) over each
+    segment (e.g. the components of each of the synthetic ETFs).
+
+    Arguments:
+        old_weights {np.array} -- Concatenated old weights.
+        new_weights {np.array} -- Concatenated new weights.
+        prices {np.array} -- Concatenated prices.
+        offsets {np.array} -- Segment offsets (number of segments + 1).
+
+    Returns:
+        np.array -- Turnover of each of the segments.
+    """
+
+    if useNumba():
+        return _segmentedTurnoverJit(
+            np.asarray(old_weights, dtype=np.float64),
+            np.asarray(new_weights, dtype=np.float64),
+            np.asarray(prices, dtype=np.float64),
+            np.asarray(offsets, dtype=np.int64)
+        )
+
+    turnover = np.abs(np.asarray(new_weights, dtype=np.float64) -
+        np.asarray(old_weights, dtype=np.float64)) * np.asarray(prices)
+    # NOTE: `np.add.reduceat` does not handle empty segments
+    cum_turnover = np.append(0., np.cumsum(turnover))
+    return cum_turnover[offsets[1:]] - cum_turnover[offsets[:-1]]
+
+
+##########################
+# PROJECTED-GRADIENT QP
+##########################
+
+def _projectSimplexLoop(v):
+    # Euclidean projection onto the probability simplex (sort-based)
+    u = np.sort(v)[::-1]
+    css = np.cumsum(u)
+    # Last index with a positive gap (always includes the first)
+    rho = np.nonzero(u - (css - 1.) / np.arange(1., len(u) + 1.) > 0)[0][-1]
+    theta = (css[rho] - 1.) / (rho + 1.)
+    return np.maximum(v - theta, 0.)
+
+
+_projectSimplex = _jit(_projectSimplexLoop)
+
+
+def _projectedGradientLoop(cov_mat, x0, max_iter, tol):
+    # Accelerated (FISTA) projected gradient for min x'Cx, s.t. x on simplex
+    lipschitz = 2. * np.sqrt(np.sum(cov_mat * cov_mat))
+    if lipschitz <= 0:
+        return x0
+    step = 1. / lipschitz
+    x = _projectSimplex(x0)
+    y = x.copy()
+    t = 1.
+    for _ in range(max_iter):
+        x_new = _projectSimplex(y - step * 2. * np.dot(cov_mat, y))
+        t_new = (1. + np.sqrt(1. + 4. * t * t)) / 2.
+        y = x_new + ((t - 1.) / t_new) * (x_new - x)
+        if np.sqrt(np.sum((x_new - x) ** 2)) < tol:
+            return x_new
+        x = x_new
+        t = t_new
+    return x
+
+
+_projectedGradientJit = _jit(_projectedGradientLoop)
+
+
+def projectedGradientMinVar(cov_mat: np.ndarray, x0: np.array,
+    max_iter: int=10000, tol: float=1e-10) -> np.array:
+    """Kernel to solve the long-only, fully invested minimum variance problem
+    (min x'Cx, s.t. sum(x) = 1, x >= 0) with accelerated projected gradient
+    iterations.
+
+    Arguments:
+        cov_mat {np.ndarray} -- Covariance matrix.
+        x0 {np.array} -- Initial weights.
+
+    Keyword Arguments:
+        max_iter {int} -- Maximum number of iterations (default: {10000}).
+        tol {float} -- Tolerance on the change in weights (default: {1e-10}).
+
+    Returns:
+        np.array -- Portfolio weights.
+    """
+
+    cov_mat = np.ascontiguousarray(cov_mat, dtype=np.float64)
+    x0 = np.asarray(x0, dtype=np.float64)
+
+    if useNumba():
+        return _projectedGradientJit(cov_mat, x0, int(max_iter), float(tol))
+
+    return _projectedGradientLoop(cov_mat, x0, int(max_iter), float(tol))
+
+
+def activeSetMinVar(cov_mat: np.ndarray, x0: np.array, rtol: float=1e-12,
+    max_iter: int=None) -> np.array:
+    """Kernel to solve the long-only, fully invested minimum variance problem
+    (see `projectedGradientMinVar`) exactly, with primal active-set iterations
+    from the initial weights. Each iteration solves the problem on the current
+    support (equality constraint only), and either steps towards its solution
+    until a weight reaches zero, or adds the asset that most violates the
+    optimality conditions to the support.
+
+    Unlike the iterative solvers, optimality is checked with the KKT
+    conditions relative to the portfolio variance (the variance is within
+    `2 * rtol` of the optimum, relatively); for a positive definite covariance
+    matrix, the solution does not depend on the initial weights (up to
+    rounding). Intended for small to moderate sector counts (O(n^3) per
+    iteration).
+
+    Arguments:
+        cov_mat {np.ndarray} -- Covariance matrix.
+        x0 {np.array} -- Initial weights (projected onto the simplex).
+
+    Keyword Arguments:
+        rtol {float} -- Relative tolerance of the optimality conditions
+                        (default: {1e-12}).
+        max_iter {int} -- Maximum number of iterations (default: {None};
+                          10 times the number of assets, plus 100).
+
+    Returns:
+        np.array -- Portfolio weights.
+    """
+
+    cov_mat = np.asarray(cov_mat, dtype=np.float64)
+    n_assets = cov_mat.shape[0]
+    max_iter = 10 * n_assets + 100 if max_iter is None else max_iter
+
+    # Feasible initial weights
+    x = np.maximum(np.asarray(x0, dtype=np.float64), 0.)
+    x = x / x.sum() if x.sum() > 0 else np.full(n_assets, 1. / n_assets)
+    support = x > 0
+    added = None
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(support)
+
+        # Minimum variance on the support; z ~ C_SS^-1 1
+        sub_mat = cov_mat[np.ix_(idx, idx)]
+        try:
+            z = np.linalg.solve(sub_mat, np.ones(len(idx)))
+        except np.linalg.LinAlgError:
+            z = np.linalg.lstsq(sub_mat, np.ones(len(idx)), rcond=None)[0]
+        z = z / z.sum()
+
+        if np.all(z >= 0):
+            x = np.zeros(n_assets)
+            x[idx] = z
+            # Optimality; (C x)_j >= x'Cx for all j (equal on the support)
+            grad = np.dot(cov_mat, x)
+            variance = np.dot(x, grad)
+            outside = np.where(support, np.inf, grad)
+            added = int(np.argmin(outside))
+            if outside[added] >= variance - rtol * abs(variance):
+                return x
+            support[added] = True
+            continue
+
+        # Stepping towards z until the first weight reaches zero
+        negative = z < 0
+        ratios = x[idx][negative] / (x[idx][negative] - z[negative])
+        alpha = ratios.min()
+        x[idx] = x[idx] + alpha * (z - x[idx])
+        dropped = idx[negative][ratios <= alpha]
+        x[dropped] = 0.
+        support[dropped] = False
+
+        # Added asset dropped without a step (optimal up to rounding)
+        if alpha <= 0 and added in dropped:
+            return x / x.sum()
+
+    logging.warning('Active-set minimum variance did not converge in {0} '
+        'iterations'.format(max_iter))
+
+    return x / x.sum()
+
+
+def _projectedGradientFactorLoop(loadings, specific_var, x0, lipschitz,
+    max_iter, tol):
+    # FISTA as `_projectedGradientLoop`, with C y = B (B' y) + d * y in O(n k)
+    if lipschitz <= 0:
+        return x0
+    step = 1. / lipschitz
+    x = _projectSimplex(x0)
+    y = x.copy()
+    t = 1.
+    for _ in range(max_iter):
+        grad = 2. * (np.dot(loadings, np.dot(loadings.T, y)) +
+                     specific_var * y)
+        x_new = _projectSimplex(y - step * grad)
+        t_new = (1. + np.sqrt(1. + 4. * t * t)) / 2.
+        y = x_new + ((t - 1.) / t_new) * (x_new - x)
+        if np.sqrt(np.sum((x_new - x) ** 2)) < tol:
+            return x_new
+        x = x_new
+        t = t_new
+    return x
+
+
+_projectedGradientFactorJit = _jit(_projectedGradientFactorLoop)
+
+
+def projectedGradientFactorMinVar(loadings: np.ndarray,
+    specific_var: np.array, x0: np.array, max_iter: int=10000,
+    tol: float=1e-10) -> np.array:
+    """Kernel to solve the long-only, fully invested minimum variance problem
+    (see `projectedGradientMinVar`) for a factor covariance matrix,
+    C = B B' + diag(d) (see `FactorCovariance`); each iteration costs O(n k).
+
+    Arguments:
+        loadings {np.ndarray} -- Factor loadings, B (assets x factors).
+        specific_var {np.array} -- Specific variances, d (assets).
+        x0 {np.array} -- Initial weights.
+
+    Keyword Arguments:
+        max_iter {int} -- Maximum number of iterations (default: {10000}).
+        tol {float} -- Tolerance on the change in weights (default: {1e-10}).
+
+    Returns:
+        np.array -- Portfolio weights.
+    """
+
+    loadings = np.ascontiguousarray(loadings, dtype=np.float64)
+    specific_var = np.asarray(specific_var, dtype=np.float64)
+    x0 = np.asarray(x0, dtype=np.float64)
+
+    # Largest eigenvalue of C is at most that of B B' (= B' B; k x k) plus the
+    # largest specific variance
+    lipschitz = 2. * (np.linalg.eigvalsh(np.dot(loadings.T, loadings))[-1] if
+        loadings.shape[1] > 0 else 0.) + 2. * specific_var.max()
+
+    if useNumba():
+        return _projectedGradientFactorJit(loadings, specific_var, x0,
+            float(lipschitz), int(max_iter), float(tol))
+
+    return _projectedGradientFactorLoop(loadings, specific_var, x0,
+        float(lipschitz), int(max_iter), float(tol))
@@ -1 +1,3 @@
 from .minvar import MinimumVariance
+from .batch import BatchMinimumVariance
+from .factor_covariance import FactorCovariance
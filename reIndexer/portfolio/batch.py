@@ -0,0 +1,303 @@
+from ..cfg import config
+from ..backtest.util import Utilities
+from .factor_covariance import FactorCovariance
+from .minvar import MinimumVariance
+
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import numpy as np
+import pandas as pd
+
+
+def _solveMinimumVariance(cov_mat: np.ndarray) -> np.array:
+    """Module-level solver wrapper (picklable, for process pools). Starts the
+    optimization from equal weights so that results are deterministic.
+
+    Arguments:
+        cov_mat {np.ndarray} -- Covariance matrix of the assets (or
+                                `FactorCovariance`).
+
+    Returns:
+        np.array -- Vector of asset weights.
+    """
+
+    n_assets = cov_mat.shape[0]
+    return MinimumVariance().solveWeights(
+        cov_mat=cov_mat,
+        prev_weights=np.ones(n_assets) / n_assets
+    )
+
+
+class BatchMinimumVariance():
+    """Class to compute the minimum variance portfolios for every rebalance
+    date of a backtest offline, as a single batch.
+
+    Given a panel of synthetic ETF log returns (dates x sectors), this module
+    builds the rolling covariance matrices for all rebalance dates as one
+    stacked array (computed from cumulative sums of the returns and their
+    outer products), and solves all of the resulting minimum variance problems,
+    optionally in parallel. The resulting weight schedule may be supplied to
+    `Backtest` as a precomputed input.
+
+    NOTE: The lookback window of each rebalance date matches that of
+          `Backtest.rebalancePortfolio`; i.e. the `setf_lookback_window - 1`
+          log returns ending on (and including) the rebalance date.
+    """
+
+    def __init__(self, n_workers: int=None):
+        """Initialization method for `BatchMinimumVariance`.
+
+        Keyword Arguments:
+            n_workers {int} -- Number of worker processes used to solve the
+                               optimization problems; solved serially if None
+                               or 1 (default: {None}; uses
+                               `config.optim_workers`).
+        """
+
+        self.n_workers = config.optim_workers if n_workers is None\
+            else n_workers
+
+    def getRebalanceDates(self, dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """Function to get the rebalance dates of the backtest, using the
+        rebalancing trigger in the configuration. The first date within the
+        backtest window is always included (initial portfolio allocation).
+
+        Arguments:
+            dates {pd.DatetimeIndex} -- Trading dates (e.g. returns panel
+                                        index).
+
+        Returns:
+            pd.DatetimeIndex -- Rebalance dates.
+        """
+
+        # Isolating dates within the backtest window
+        dates = dates[(dates >= config.backtest_start) &
+            (dates <= config.backtest_end)]
+
+        if len(dates) == 0:
+            return dates
+
+        # Evaluating trigger calendar; first date sets the initial flags
+        # (see `Backtest.zipline_handle_data`)
+        flags = Utilities().getRebalanceFlags(dates)
+        flags[0] = True
+
+        return dates[flags]
+
+    def rollingCovariances(self, log_rets: pd.DataFrame,
+        rebalance_dates: pd.DatetimeIndex) -> np.ndarray:
+        """Function to compute the rolling covariance matrices of the returns
+        panel for each of the rebalance dates.
+
+        Sums of the returns, and of their outer products are accumulated once
+        between consecutive window boundaries, and the window sums are
+        recovered as differences of the cumulative sums at the boundaries. This
+        avoids both recomputing overlapping windows, and materializing the
+        cumulative outer products for every date.
+
+        Arguments:
+            log_rets {pd.DataFrame} -- Log returns panel (dates x sectors).
+            rebalance_dates {pd.DatetimeIndex} -- Rebalance dates.
+
+        Returns:
+            np.ndarray -- Stacked covariance matrices (dates x sectors x
+                          sectors).
+        """
+
+        rets = np.asarray(log_rets.values, dtype=np.float64)
+        window = config.setf_lookback_window - 1
+
+        # Window boundaries (as row positions, end-exclusive)
+        ends = log_rets.index.get_indexer(rebalance_dates) + 1
+        if np.any(ends == 0):
+            logging.error('Rebalance dates missing from the returns panel')
+            raise KeyError
+        starts = np.maximum(ends - window, 0)
+        if np.any(ends - starts < window):
+            logging.warning('Returns panel shorter than the lookback window '
+                'for {0} rebalance date(s)'.format(
+                    np.count_nonzero(ends - starts < window)))
+
+        # Cumulative sums evaluated at the (sorted, unique) boundaries only
+        bounds = np.unique(np.concatenate(([0], starts, ends)))
+        n_assets = rets.shape[1]
+        cum_sum = np.zeros((len(bounds), n_assets))
+        cum_prod = np.zeros((len(bounds), n_assets, n_assets))
+        for idx in range(1, len(bounds)):
+            block = rets[bounds[idx - 1]:bounds[idx]]
+            cum_sum[idx] = cum_sum[idx - 1] + block.sum(axis=0)
+            cum_prod[idx] = cum_prod[idx - 1] + np.dot(block.T, block)
+
+        # Window sums
+        start_pos = np.searchsorted(bounds, starts)
+        end_pos = np.searchsorted(bounds, ends)
+        n_obs = (ends - starts).astype(np.float64)
+        win_sum = cum_sum[end_pos] - cum_sum[start_pos]
+        win_prod = cum_prod[end_pos] - cum_prod[start_pos]
+
+        # Sample covariance (unbiased; same as `np.cov`), annualized
+        cov_mats = (win_prod - np.einsum('di,dj->dij', win_sum, win_sum) /
+            n_obs[:, None, None]) / (n_obs - 1)[:, None, None]
+
+        return cov_mats * config.setf_lookback_window
+
+    def factorCovariances(self, log_rets: pd.DataFrame,
+        rebalance_dates: pd.DatetimeIndex) -> list:
+        """Function to estimate the factor covariance models (see
+        `FactorCovariance`) of the returns panel for each of the rebalance
+        dates, over the same lookback windows as `rollingCovariances`. No
+        dense covariance matrices are built.
+
+        Arguments:
+            log_rets {pd.DataFrame} -- Log returns panel (dates x sectors).
+            rebalance_dates {pd.DatetimeIndex} -- Rebalance dates.
+
+        Returns:
+            list -- Factor covariance models (rebalance dates).
+        """
+
+        rets = np.asarray(log_rets.values, dtype=np.float64)
+        window = config.setf_lookback_window - 1
+
+        ends = log_rets.index.get_indexer(rebalance_dates) + 1
+        if np.any(ends == 0):
+            logging.error('Rebalance dates missing from the returns panel')
+            raise KeyError
+        starts = np.maximum(ends - window, 0)
+
+        return [FactorCovariance.fromReturns(log_rets=rets[i:j].T)
+                for i, j in zip(starts, ends)]
+
+    def computeCovariances(self, log_rets: pd.DataFrame,
+        rebalance_dates: pd.DatetimeIndex):
+        """Function to compute the covariances of the returns panel for each
+        of the rebalance dates, with the covariance model in the configuration
+        (`config.covariance_model`).
+
+        Arguments:
+            log_rets {pd.DataFrame} -- Log returns panel (dates x sectors).
+            rebalance_dates {pd.DatetimeIndex} -- Rebalance dates.
+
+        Raises:
+            ValueError -- Raised when the covariance model is not supported.
+
+        Returns:
+            np.ndarray -- Stacked covariance matrices (see
+                          `rollingCovariances`); list of factor covariance
+                          models with the factor model (see
+                          `factorCovariances`).
+        """
+
+        if config.covariance_model == 'factor':
+            return self.factorCovariances(log_rets=log_rets,
+                                          rebalance_dates=rebalance_dates)
+
+        if config.covariance_model != 'sample':
+            logging.error('Unsupported covariance model {0}'.format(
+                config.covariance_model))
+            raise ValueError
+
+        return self.rollingCovariances(log_rets=log_rets,
+                                       rebalance_dates=rebalance_dates)
+
+    def solveAll(self, cov_mats: np.ndarray) -> np.ndarray:
+        """Function to solve the minimum variance problems for a stack of
+        covariance matrices.
+
+        Arguments:
+            cov_mats {np.ndarray} -- Stacked covariance matrices (dates x
+                                     sectors x sectors), or list of factor
+                                     covariance models.
+
+        Returns:
+            np.ndarray -- Stacked portfolio weights (dates x sectors).
+        """
+
+        if not self.n_workers or self.n_workers <= 1:
+            weights = [_solveMinimumVariance(i) for i in cov_mats]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                weights = list(executor.map(_solveMinimumVariance, cov_mats,
+                    chunksize=max(1, len(cov_mats) // (4 * self.n_workers))))
+
+        return np.array(weights)
+
+    def computeWeightSchedule(self, log_rets: pd.DataFrame,
+        rebalance_dates: pd.DatetimeIndex=None) -> pd.DataFrame:
+        """Function to compute the portfolio weight schedule for all rebalance
+        dates.
+
+        Arguments:
+            log_rets {pd.DataFrame} -- Log returns panel (dates x sectors).
+
+        Keyword Arguments:
+            rebalance_dates {pd.DatetimeIndex} -- Rebalance dates; computed
+                                                  from the trigger calendar in
+                                                  the configuration if None
+                                                  (default: {None}).
+
+        Returns:
+            pd.DataFrame -- Portfolio weights (rebalance dates x sectors).
+        """
+
+        if rebalance_dates is None:
+            rebalance_dates = self.getRebalanceDates(log_rets.index)
+
+        logging.info('Batch solving {0} minimum variance portfolios'
+            .format(len(rebalance_dates)))
+
+        cov_mats = self.computeCovariances(
+            log_rets=log_rets,
+            rebalance_dates=rebalance_dates
+        )
+
+        return pd.DataFrame(self.solveAll(cov_mats=cov_mats),
+                            index=rebalance_dates,
+                            columns=log_rets.columns)
+
+    def computeSchemeWeightSchedules(self, log_rets: pd.DataFrame,
+        rebalance_dates: pd.DatetimeIndex=None) -> dict:
+        """Function to compute the portfolio weight schedules of a stacked
+        panel of synthetic ETF weighting schemes as one batch; the rolling
+        covariances of each scheme are accumulated from the shared panel (see
+        `rollingCovariances`), and all of the minimum variance problems are
+        solved together.
+
+        Arguments:
+            log_rets {pd.DataFrame} -- Log returns panel (dates x (scheme,
+                                       sector) column MultiIndex); see
+                                       `VectorizedBacktest.computeSchemeSeries`.
+
+        Keyword Arguments:
+            rebalance_dates {pd.DatetimeIndex} -- Rebalance dates; computed
+                                                  from the trigger calendar in
+                                                  the configuration if None
+                                                  (default: {None}).
+
+        Returns:
+            dict -- Dictionary of scheme name -> portfolio weights (rebalance
+                    dates x sectors).
+        """
+
+        if rebalance_dates is None:
+            rebalance_dates = self.getRebalanceDates(log_rets.index)
+
+        scheme_names = list(log_rets.columns.get_level_values(0).unique())
+
+        logging.info('Batch solving {0} minimum variance portfolios for {1} '
+            'weighting schemes'.format(len(rebalance_dates),
+                                       len(scheme_names)))
+
+        # Covariances of each scheme (i.e. the diagonal blocks only; the
+        # cross-scheme covariances are never solved)
+        scheme_mats = [self.computeCovariances(log_rets=log_rets[i],
+            rebalance_dates=rebalance_dates) for i in scheme_names]
+        if config.covariance_model == 'factor':
+            block_mats = sum(scheme_mats, [])
+        else:
+            block_mats = np.concatenate(scheme_mats)
+        weights = self.solveAll(cov_mats=block_mats)
+
+        return dict((j, pd.DataFrame(weights[i * len(rebalance_dates):(i + 1) *
+            len(rebalance_dates)], index=rebalance_dates,
+            columns=log_rets[j].columns)) for i, j in enumerate(scheme_names))
@@ -0,0 +1,123 @@
+from ..cfg import config
+
+import logging
+import numpy as np
+
+
+class FactorCovariance():
+    """Class to model a (low-rank) factor covariance matrix; i.e. k factors
+    plus a diagonal of specific variances, C = B B' + diag(d).
+
+    With fine-grained universes (hundreds to thousands of synthetic ETFs,
+    estimated from a single lookback window of returns), the dense sample
+    covariance is singular, and dense optimization scales with O(n^3). The
+    factor loadings are estimated from the leading principal components of the
+    returns (truncated SVD), and the remaining variance of each asset is kept
+    as its specific variance (floored, so that the model is always positive
+    definite). Matrix-vector products cost O(n k); see
+    `projectedGradientFactorMinVar`.
+
+    NOTE: Scaled by the lookback window in the configuration, as
+          `MinimumVariance.computeCovariance`.
+    """
+
+    def __init__(self, loadings: np.ndarray, specific_var: np.array):
+        """Initialization method for `FactorCovariance`.
+
+        Arguments:
+            loadings {np.ndarray} -- Factor loadings, B (assets x factors).
+            specific_var {np.array} -- Specific variances, d (assets).
+        """
+
+        self.loadings = np.ascontiguousarray(loadings, dtype=np.float64)
+        self.specific_var = np.asarray(specific_var, dtype=np.float64)
+        self.shape = (len(self.specific_var), len(self.specific_var))
+
+    @classmethod
+    def fromReturns(cls, log_rets: np.ndarray, n_factors: int=None,
+        min_specific_ratio: float=None):
+        """Function to estimate a factor covariance model from a matrix of
+        log returns.
+
+        Arguments:
+            log_rets {np.ndarray} -- Matrix of log returns of the assets
+                                     (assets x observations, as
+                                     `MinimumVariance.computeCovariance`).
+
+        Keyword Arguments:
+            n_factors {int} -- Number of factors; capped to the rank of the
+                               returns (default: {None}; uses
+                               `config.covariance_factors`).
+            min_specific_ratio {float} -- Floor of the specific variance of
+                                          each asset, as a fraction of its
+                                          sample variance (default: {None};
+                                          uses `config.covariance_min_specific`
+                                          ).
+
+        Returns:
+            FactorCovariance -- Factor covariance model.
+        """
+
+        n_factors = config.covariance_factors if n_factors is None\
+            else n_factors
+        min_specific_ratio = config.covariance_min_specific if\
+            min_specific_ratio is None else min_specific_ratio
+
+        rets = np.asarray(log_rets, dtype=np.float64)
+        n_obs = rets.shape[1]
+        demeaned = (rets - rets.mean(axis=1)[:, None]) *\
+            np.sqrt(config.setf_lookback_window / (n_obs - 1.))
+
+        # Leading principal components (truncated SVD of the returns)
+        n_factors = min(n_factors, n_obs - 1, rets.shape[0])
+        u, s, _ = np.linalg.svd(demeaned, full_matrices=False)
+        loadings = u[:, :n_factors] * s[:n_factors]
+
+        # Specific variances (sample variance not explained by the factors)
+        sample_var = np.einsum('ij,ij->i', demeaned, demeaned)
+        specific_var = np.maximum(sample_var - np.einsum('ij,ij->i', loadings,
+            loadings), min_specific_ratio * sample_var)
+        # Assets without any variance (e.g. constant prices)
+        specific_var = np.maximum(specific_var, np.finfo(np.float64).tiny)
+
+        logging.debug('Estimated {0}-factor covariance of {1} assets'.format(
+            n_factors, rets.shape[0]))
+
+        return cls(loadings=loadings, specific_var=specific_var)
+
+    def dot(self, x: np.array) -> np.array:
+        """Function to compute the product of the covariance matrix and a
+        vector, in O(n k).
+
+        Arguments:
+            x {np.array} -- Vector (assets).
+
+        Returns:
+            np.array -- C x.
+        """
+
+        return np.dot(self.loadings, np.dot(self.loadings.T, x)) +\
+            self.specific_var * x
+
+    def getVariance(self, x: np.array) -> float:
+        """Function to compute the variance of a portfolio, x' C x.
+
+        Arguments:
+            x {np.array} -- Portfolio weights.
+
+        Returns:
+            float -- Portfolio variance.
+        """
+
+        return np.sum(np.dot(self.loadings.T, x) ** 2) +\
+            np.dot(self.specific_var, x * x)
+
+    def toDense(self) -> np.ndarray:
+        """Function to get the dense covariance matrix; O(n^2) memory.
+
+        Returns:
+            np.ndarray -- Covariance matrix.
+        """
+
+        return np.dot(self.loadings, self.loadings.T) +\
+            np.diag(self.specific_var)
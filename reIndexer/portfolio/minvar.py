@@ -1,4 +1,6 @@
 from ..cfg import config
+from ..kernels import projectedGradientFactorMinVar, projectedGradientMinVar
+from .factor_covariance import FactorCovariance
 
 from scipy.optimize import minimize
 import logging
@@ -51,19 +53,88 @@ class MinimumVariance():
         """
 
         # Computing covariance matrix
-        cov_mat = np.cov(log_rets) * config.setf_lookback_window
+        cov_mat = self.computeCovariance(log_rets=log_rets)
+
+        return self.solveWeights(cov_mat=cov_mat, prev_weights=prev_weights)
+
+    def computeCovariance(self, log_rets: np.ndarray) -> np.ndarray:
+        """Function to compute the (annualized) sample covariance matrix of a
+        matrix of log-returns, scaled by the lookback window in the
+        configuration. Always accumulates in float64. A factor covariance
+        model is estimated instead if configured (`config.covariance_model`).
+        
+        Arguments:
+            log_rets {np.ndarray} -- Matrix of log returns of the assets.
+
+        Raises:
+            ValueError -- Raised when the covariance model is not supported.
+        
+        Returns:
+            np.ndarray -- Covariance matrix of the assets (FactorCovariance
+                          with the factor model).
+        """
+
+        if config.covariance_model == 'factor':
+            return FactorCovariance.fromReturns(log_rets=log_rets)
+
+        if config.covariance_model != 'sample':
+            logging.error('Unsupported covariance model {0}'.format(
+                config.covariance_model))
+            raise ValueError
+
+        return np.cov(np.asarray(log_rets, dtype=np.float64)) *\
+            config.setf_lookback_window
+
+    def solveWeights(self, cov_mat: np.ndarray, prev_weights: np.array=None)\
+        -> np.array:
+        """Function to compute the minimum variance portfolio weights for a
+        given covariance matrix, with no short sales allowed.
+        
+        Arguments:
+            cov_mat {np.ndarray} -- Covariance matrix of the assets; dense, or
+                                    a `FactorCovariance` (solved with the
+                                    projected-gradient factor kernel).
+        
+        Keyword Arguments:
+            prev_weights {np.array} -- Previous iteration weights of the minimum
+                                       variance portfolio (default: {None}).
+        
+        Returns:
+            np.array -- Vector of asset weights.
+        """
 
         # Defining objective function for optimization
         def objective(x: np.array) -> float:
             return np.dot(x.T, np.dot(cov_mat, x))
 
         # Initial guess; previous weights if available, if not random weights
-        if not prev_weights:
+        if prev_weights is None:
             prev_weights = np.random.dirichlet(np.ones(cov_mat.shape[0]), 1)[0]
 
         logging.debug('Optimizing with initial weights {0}'.
             format(prev_weights))
 
+        # Projected-gradient factor kernel (see `kernels`)
+        if isinstance(cov_mat, FactorCovariance):
+            weights = projectedGradientFactorMinVar(
+                loadings=cov_mat.loadings,
+                specific_var=cov_mat.specific_var,
+                x0=prev_weights,
+                tol=config.optim_tol
+            )
+            logging.debug('Computed minvar weights {0}'.format(weights))
+            return weights
+
+        # Projected-gradient kernel (see `kernels`)
+        if config.optim_method == 'projected_gradient':
+            weights = projectedGradientMinVar(
+                cov_mat=cov_mat,
+                x0=prev_weights,
+                tol=config.optim_tol
+            )
+            logging.debug('Computed minvar weights {0}'.format(weights))
+            return weights
+
         # Run optimization
         port_weights = minimize(
             fun=objective,
@@ -1 +1,3 @@
 from .universe import Universe
+from .validation import UniverseValidator
+from .catalog import UniverseCatalog
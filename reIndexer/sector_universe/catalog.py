@@ -0,0 +1,201 @@
+from .universe import Universe
+
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import struct
+
+
+class UniverseCatalog():
+    """Class to read (and write) binary catalogs of many sector universes.
+
+    Parsing thousands of candidate universe CSV files dominates the setup time
+    of large sweeps. A catalog packs any number of universes into a single
+    file, with a shared ticker dictionary, and the integer (ticker, sector)
+    assignments of each universe. Only the (JSON) header is parsed when the
+    catalog is opened; assignments are memory-mapped, so that universes are
+    loaded by name with random access, without reading (or copying) the rest
+    of the catalog.
+
+    File layout:
+        - Magic bytes (`magic`), and the header length (little-endian uint64).
+        - Header (UTF-8 JSON); the ticker dictionary, and the name, offset,
+          number of rows and sector labels of each universe.
+        - Padding to an 8-byte boundary.
+        - Assignments (little-endian int32); for each universe, the ticker IDs
+          of all rows followed by the sector IDs of all rows (in CSV order).
+    """
+
+    magic = b'RIXCAT01'
+
+    def __init__(self, catalog_file: str):
+        """Initialization method for `UniverseCatalog`. Reads the header, and
+        memory-maps the assignments.
+
+        Arguments:
+            catalog_file {str} -- Catalog file.
+        """
+
+        self.catalog_file = catalog_file
+
+        with open(self.catalog_file, 'rb') as f:
+            if f.read(len(self.magic)) != self.magic:
+                logging.error('Invalid universe catalog {0}'
+                    .format(self.catalog_file))
+                raise ValueError
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        self.ticker_dict = header['tickers']
+        self.universes = dict((i['name'], i) for i in header['universes'])
+        self.universe_names = [i['name'] for i in header['universes']]
+
+        data_offset = self.getDataOffset(header_length=header_length)
+        self.assignments = np.memmap(self.catalog_file, dtype='<i4',
+            mode='r', offset=data_offset) if data_offset <\
+            os.path.getsize(self.catalog_file) else np.zeros(0, dtype='<i4')
+
+        logging.info('Opened universe catalog {0} with {1} universes and {2} '
+            'tickers'.format(self.catalog_file, len(self.universe_names),
+                len(self.ticker_dict)))
+
+    @classmethod
+    def getDataOffset(cls, header_length: int) -> int:
+        """Function to get the offset of the assignments in a catalog file.
+
+        Arguments:
+            header_length {int} -- Header length (bytes).
+
+        Returns:
+            int -- Assignments offset (bytes).
+        """
+
+        return int(np.ceil((len(cls.magic) + 8 + header_length) / 8.) * 8)
+
+    def getUniverseNames(self) -> list:
+        """Function to get the names of the universes in the catalog.
+
+        Returns:
+            list -- Universe names (in catalog order).
+        """
+
+        return self.universe_names
+
+    def getAssignments(self, universe_name: str) -> tuple:
+        """Function to get the integer assignments of a universe (views of the
+        memory-mapped catalog).
+
+        Arguments:
+            universe_name {str} -- Name of the universe.
+
+        Raises:
+            KeyError -- Raised when the universe is not in the catalog.
+
+        Returns:
+            tuple -- Ticker IDs (np.array), sector IDs (np.array), and sector
+                     labels (list).
+        """
+
+        try:
+            entry = self.universes[universe_name]
+        except KeyError:
+            logging.error('Universe {0} not in catalog {1}'.format(
+                universe_name, self.catalog_file))
+            raise
+
+        offset, n_rows = entry['offset'], entry['n_rows']
+
+        return self.assignments[offset:offset + n_rows],\
+            self.assignments[offset + n_rows:offset + 2 * n_rows],\
+            entry['sectors']
+
+    def getUniverse(self, universe_name: str) -> Universe:
+        """Function to load a universe from the catalog.
+
+        Arguments:
+            universe_name {str} -- Name of the universe.
+
+        Returns:
+            Universe -- Sector universe.
+        """
+
+        ticker_ids, sector_ids, sector_labels = self.getAssignments(
+            universe_name=universe_name)
+
+        return Universe.fromAssignments(
+            universe_name=universe_name,
+            ticker_dict=self.ticker_dict,
+            ticker_ids=ticker_ids,
+            sector_labels=sector_labels,
+            sector_ids=sector_ids
+        )
+
+    @classmethod
+    def write(cls, catalog_file: str, universe_rows: dict):
+        """Function to write a catalog of universes.
+
+        Arguments:
+            catalog_file {str} -- Output catalog file.
+            universe_rows {dict} -- Dictionary of universe name -> rows (pd.
+                                    DataFrame with 'sector' and 'ticker'
+                                    columns, in CSV order).
+        """
+
+        # Shared ticker dictionary
+        ticker_dict = sorted(set().union(*[set(i['ticker'])
+            for i in universe_rows.values()]))
+        ticker_idx = pd.Index(ticker_dict)
+
+        entries = list()
+        blocks = list()
+        offset = 0
+        for name, rows in universe_rows.items():
+            # Sector labels in order of first appearance (as `Universe`)
+            sector_labels = list(rows['sector'].unique())
+            ticker_ids = ticker_idx.get_indexer(rows['ticker'])
+            sector_ids = pd.Index(sector_labels).get_indexer(rows['sector'])
+            blocks.extend([ticker_ids, sector_ids])
+            entries.append({'name': name, 'offset': offset,
+                            'n_rows': len(rows), 'sectors': sector_labels})
+            offset += 2 * len(rows)
+
+        header = json.dumps({'tickers': ticker_dict, 'universes': entries})\
+            .encode('utf-8')
+        data_offset = cls.getDataOffset(header_length=len(header))
+
+        # Writing atomically
+        tmp_file = catalog_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(cls.magic)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            f.write(b'\0' * (data_offset - f.tell()))
+            if blocks:
+                f.write(np.concatenate(blocks).astype('<i4').tobytes())
+        os.replace(tmp_file, catalog_file)
+
+        logging.info('Wrote {0} universes ({1} tickers) to catalog {2}'
+            .format(len(entries), len(ticker_dict), catalog_file))
+
+    @classmethod
+    def fromCSVFolder(cls, sector_folder: str, catalog_file: str):
+        """Function to convert a folder of sector universe CSV files (see
+        README) into a catalog; universes are named after the CSV files.
+
+        Arguments:
+            sector_folder {str} -- Folder of sector universe CSV files.
+            catalog_file {str} -- Output catalog file.
+
+        Returns:
+            UniverseCatalog -- Catalog.
+        """
+
+        universe_rows = dict((f.split('.')[0], pd.read_csv(
+            filepath_or_buffer=os.path.join(sector_folder, f), dtype='str'))
+            for f in sorted(os.listdir(sector_folder)) if f.endswith('.csv'))
+
+        cls.write(catalog_file=catalog_file, universe_rows=universe_rows)
+
+        return cls(catalog_file=catalog_file)
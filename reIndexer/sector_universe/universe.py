@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import logging
 
 
@@ -30,6 +31,9 @@ class Universe():
         # Set to store invalid ticker tuples
         self.invalid_tickers = set()
 
+        # Validation flag (see `UniverseValidator`)
+        self.is_validated = False
+
         # Isolating sectors
         self.sector_labels = list(self.universe_csv['sector'].unique())
 
@@ -50,6 +54,51 @@ class Universe():
         logging.info('Successfully loaded {0} sector universe'
             .format(self.universe_name))
 
+    @classmethod
+    def fromAssignments(cls, universe_name: str, ticker_dict: list,
+        ticker_ids: np.array, sector_labels: list, sector_ids: np.array):
+        """Function to build a sector universe from integer sector assignments
+        (see `UniverseCatalog`), without parsing a CSV file. Tickers are
+        strings from the shared ticker dictionary (not copied), and the order
+        of sectors and tickers matches that of loading the equivalent CSV file.
+        
+        Arguments:
+            universe_name {str} -- Name of the universe.
+            ticker_dict {list} -- Shared ticker dictionary.
+            ticker_ids {np.array} -- Ticker (dictionary index) of each row.
+            sector_labels {list} -- Sector labels, in order of first
+                                    appearance.
+            sector_ids {np.array} -- Sector (label index) of each row.
+        
+        Returns:
+            Universe -- Sector universe.
+        """
+
+        universe = cls.__new__(cls)
+        universe.universe_name = universe_name
+        universe.universe_csv = None
+        universe.invalid_tickers = set()
+        universe.is_validated = False
+        universe.sector_labels = list(sector_labels)
+
+        # Unique tickers, in order of first appearance
+        _, first_rows = np.unique(ticker_ids, return_index=True)
+        universe.tickers = [ticker_dict[i] for i in
+            ticker_ids[np.sort(first_rows)]]
+
+        # Grouping rows by sector (stable; preserves row order in sectors)
+        order = np.argsort(sector_ids, kind='mergesort')
+        bounds = np.searchsorted(sector_ids[order],
+                                 np.arange(len(universe.sector_labels) + 1))
+        universe.sectors = dict((sector_label, [ticker_dict[i] for i in
+            ticker_ids[order[bounds[j]:bounds[j + 1]]]])
+            for j, sector_label in enumerate(universe.sector_labels))
+
+        logging.debug('Built {0} sector universe from assignments'
+            .format(universe_name))
+
+        return universe
+
     def getUniqueTickers(self) -> list:
         """Function to get a list of unique tickers in the universe.
         
@@ -119,3 +168,80 @@ class Universe():
                         .format(invalid_ticker, sector_label))
                     # Adding to invalid tickers set
                     self.invalid_tickers.add((invalid_ticker, sector_label))
+
+    def removeInvalidTickers(self, invalid_tickers: set):
+        """Function to remove a set of invalid tickers from the sector universe
+        in a single pass (see `removeInvalidTicker`).
+        
+        Arguments:
+            invalid_tickers {set} -- Tickers to be removed.
+        """
+
+        invalid_tickers = set(invalid_tickers)
+        if not invalid_tickers:
+            return
+
+        for sector_label in self.sector_labels:
+            # Adding to invalid tickers set
+            self.invalid_tickers.update((i, sector_label) for i in
+                invalid_tickers.intersection(self.sectors[sector_label]))
+            self.sectors[sector_label] = [i for i in self.sectors[sector_label]
+                if i not in invalid_tickers]
+
+        logging.debug('Removed {0} invalid tickers'.format(
+            len(invalid_tickers)))
+
+    def moveTicker(self, ticker: str, from_sector: str, to_sector: str):
+        """Function to move a ticker from one sector to another (e.g. a local
+        search step; see `UniverseEvaluator`). The target sector is created if
+        it does not exist, and the source sector is removed if it is emptied.
+
+        Note that the loaded CSV (`universe_csv`) is not updated.
+
+        Arguments:
+            ticker {str} -- Ticker to be moved.
+            from_sector {str} -- Source sector label.
+            to_sector {str} -- Target sector label.
+
+        Raises:
+            KeyError -- Raised when the ticker is not in the source sector.
+        """
+
+        if ticker not in self.getTickersInSector(sector_label=from_sector):
+            logging.error('Ticker {0} not in sector {1}'.format(ticker,
+                                                                from_sector))
+            raise KeyError
+
+        self.sectors[from_sector] = [i for i in self.sectors[from_sector]
+                                     if i != ticker]
+
+        if to_sector not in self.sectors:
+            self.sectors[to_sector] = list()
+            self.sector_labels.append(to_sector)
+        self.sectors[to_sector] = self.sectors[to_sector] + [ticker]
+
+        if not self.sectors[from_sector]:
+            del self.sectors[from_sector]
+            self.sector_labels.remove(from_sector)
+
+        logging.debug('Moved ticker {0} from sector {1} to {2}'.format(ticker,
+            from_sector, to_sector))
+
+    def isValidated(self) -> bool:
+        """Function to check if the sector universe has been validated against
+        the data bundle before the simulation (see `UniverseValidator`).
+        
+        Returns:
+            bool -- True if validated.
+        """
+
+        return self.is_validated
+
+    def setValidated(self, is_validated: bool=True):
+        """Function to set the validation flag of the sector universe.
+        
+        Keyword Arguments:
+            is_validated {bool} -- Validation flag (default: {True}).
+        """
+
+        self.is_validated = is_validated
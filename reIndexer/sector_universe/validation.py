@@ -0,0 +1,104 @@
+from .universe import Universe
+
+import logging
+import pandas as pd
+
+
+class UniverseValidator():
+    """Class to validate sector universes against the asset database of a data
+    bundle, before any simulation starts.
+
+    The trading window (first and last trade dates) of every asset in the
+    asset database is precomputed once per bundle; whole universes are then
+    validated with set and array operations. Results are cached per ticker, so
+    that tickers shared by many universes are only checked once.
+
+    A ticker is valid if it exists in the asset database, and is trading on the
+    validation date (i.e. the first session of the backtest); this mirrors the
+    `symbol(...)` and `can_trade(...)` probes of
+    `Backtest.validateSectorUniverse`.
+    """
+
+    def __init__(self, asset_finder, as_of_date: pd.Timestamp):
+        """Initialization method for `UniverseValidator`. Precomputes the
+        trading windows of all assets in the asset database.
+
+        Arguments:
+            asset_finder {AssetFinder} -- Zipline asset finder of the bundle.
+            as_of_date {pd.Timestamp} -- Validation date (first session of the
+                                         backtest).
+        """
+
+        self.as_of_date = pd.Timestamp(as_of_date).normalize()
+        if self.as_of_date.tz is None:
+            self.as_of_date = self.as_of_date.tz_localize('UTC')
+
+        # Trading windows of all assets
+        assets = asset_finder.retrieve_all(asset_finder.sids)
+        trading_windows = pd.DataFrame({
+            'symbol': [i.symbol for i in assets],
+            'start_date': pd.to_datetime([i.start_date for i in assets],
+                                         utc=True),
+            'end_date': pd.to_datetime([i.end_date for i in assets], utc=True)
+        })
+
+        # Symbol is valid if any asset with the symbol is trading on the date
+        # NOTE: Symbols may be reused over time by different assets
+        trading_windows['is_trading'] = \
+            (trading_windows['start_date'] <= self.as_of_date) &\
+            (trading_windows['end_date'] >= self.as_of_date)
+        self.trading_symbols = set(trading_windows.loc[
+            trading_windows['is_trading'], 'symbol'])
+        self.known_symbols = set(trading_windows['symbol'])
+
+        # Cache of ticker -> validity
+        self.cache = dict()
+
+        logging.info('Precomputed trading windows for {0} assets ({1} trading '
+            'on {2})'.format(len(assets), len(self.trading_symbols),
+                self.as_of_date.date()))
+
+    def getInvalidTickers(self, tickers: list) -> set:
+        """Function to get the invalid tickers of a list of tickers.
+
+        Arguments:
+            tickers {list} -- List of tickers.
+
+        Returns:
+            set -- Set of invalid tickers.
+        """
+
+        # Checking uncached tickers only
+        unchecked = set(tickers).difference(self.cache)
+        self.cache.update((i, True) for i in
+            unchecked.intersection(self.trading_symbols))
+        self.cache.update((i, False) for i in
+            unchecked.difference(self.trading_symbols))
+
+        return set(i for i in tickers if not self.cache[i])
+
+    def validate(self, sector_universe: Universe) -> Universe:
+        """Function to validate a sector universe; removes invalid tickers from
+        the universe, and marks it as validated.
+
+        Arguments:
+            sector_universe {Universe} -- Candidate sector universe.
+
+        Returns:
+            Universe -- 'Clean' sector universe.
+        """
+
+        invalid_tickers = self.getInvalidTickers(
+            tickers=sector_universe.getUniqueTickers()
+        )
+
+        for ticker in invalid_tickers:
+            logging.info('Ticker {0} in universe {1} {2}; removing'.format(
+                ticker, sector_universe.getUniverseName(),
+                'not trading' if ticker in self.known_symbols
+                    else 'not in asset database'))
+
+        sector_universe.removeInvalidTickers(invalid_tickers=invalid_tickers)
+        sector_universe.setValidated()
+
+        return sector_universe
@@ -0,0 +1,3 @@
+from .queue import FileSystemWorkQueue, SQLiteWorkQueue, WorkQueue
+from .worker import SweepWorker
+from .telemetry import TelemetryEmitter, TelemetryReader
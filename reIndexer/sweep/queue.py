@@ -0,0 +1,583 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+
+class WorkQueue():
+    """Base class of the sweep work queues.
+
+    A sweep job is a sector universe (CSV file) and a set of configuration
+    overrides, identified by a job ID. Jobs are enqueued once, and claimed
+    atomically by workers on any node (see `SweepWorker`). Claimed jobs are
+    kept alive with heartbeats; claims without a recent heartbeat (i.e. of
+    crashed or killed workers) are requeued.
+
+    Two backends are provided, neither of which requires a broker:
+    `SQLiteWorkQueue` (a single SQLite file; local or on a shared filesystem
+    with working file locks), and `FileSystemWorkQueue` (a directory of job
+    files, claimed with atomic renames).
+    """
+
+    def __init__(self, max_attempts: int=3):
+        """Initialization method for `WorkQueue`.
+
+        Keyword Arguments:
+            max_attempts {int} -- Number of attempts of a failing job before it
+                                  is marked as failed (default: {3}).
+        """
+
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def open(path: str, **kwargs):
+        """Function to open the work queue at a path; a SQLite queue if the
+        path ends with '.db' or '.sqlite', a filesystem queue otherwise.
+
+        Arguments:
+            path {str} -- Work queue path.
+            **kwargs -- Additional work queue initialization arguments.
+
+        Returns:
+            WorkQueue -- Work queue.
+        """
+
+        if path.endswith(('.db', '.sqlite')):
+            return SQLiteWorkQueue(db_file=path, **kwargs)
+
+        return FileSystemWorkQueue(queue_folder=path, **kwargs)
+
+    @staticmethod
+    def makeWorkerId() -> str:
+        """Function to make a unique worker ID (host, process and a random
+        suffix).
+
+        Returns:
+            str -- Worker ID.
+        """
+
+        return '-'.join([socket.gethostname(), str(os.getpid()),
+                         uuid.uuid4().hex[:8]])
+
+    @staticmethod
+    def makeJob(universe_name: str, csv_file: str,
+        config_overrides: dict=None, config_label: str=None) -> dict:
+        """Function to make a sweep job.
+
+        Arguments:
+            universe_name {str} -- Name of the universe.
+            csv_file {str} -- Path to the sector universe CSV file.
+
+        Keyword Arguments:
+            config_overrides {dict} -- JSON-serializable configuration
+                                       overrides (default: {None}).
+            config_label {str} -- Label of the configuration overrides;
+                                  appended to the job ID (default: {None}).
+
+        Returns:
+            dict -- Sweep job.
+        """
+
+        job_id = universe_name if config_label is None else\
+            '__'.join([universe_name, config_label])
+
+        # NOTE: Job IDs name the results files (see `ResultsReader`)
+        if '.' in job_id or os.sep in job_id:
+            logging.error('Invalid job ID {0}'.format(job_id))
+            raise ValueError
+
+        return {
+            'job_id': job_id,
+            'universe_name': universe_name,
+            'csv_file': csv_file,
+            'config_overrides': config_overrides or dict()
+        }
+
+    def enqueueFolder(self, sector_folder: str, config_overrides: dict=None,
+        config_label: str=None) -> int:
+        """Function to enqueue a job for every sector universe CSV file in a
+        folder (e.g. `sector_universes/learned_sector_candidates`).
+
+        Arguments:
+            sector_folder {str} -- Folder of sector universe CSV files.
+
+        Keyword Arguments:
+            config_overrides {dict} -- JSON-serializable configuration
+                                       overrides (default: {None}).
+            config_label {str} -- Label of the configuration overrides
+                                  (default: {None}).
+
+        Returns:
+            int -- Number of newly enqueued jobs.
+        """
+
+        jobs = [self.makeJob(
+            universe_name=f.split('.')[0],
+            csv_file=os.path.abspath(os.path.join(sector_folder, f)),
+            config_overrides=config_overrides,
+            config_label=config_label
+        ) for f in sorted(os.listdir(sector_folder)) if f.endswith('.csv')]
+
+        n_enqueued = sum(self.enqueue(job=i) for i in jobs)
+
+        logging.info('Enqueued {0} of {1} jobs from {2}'.format(n_enqueued,
+            len(jobs), sector_folder))
+
+        return n_enqueued
+
+    def enqueue(self, job: dict) -> bool:
+        """Function to enqueue a job; jobs already in the queue are ignored.
+
+        Arguments:
+            job {dict} -- Sweep job (see `makeJob`).
+
+        Returns:
+            bool -- True if the job was enqueued.
+        """
+
+        raise NotImplementedError
+
+    def claim(self, worker_id: str) -> dict:
+        """Function to atomically claim a pending job.
+
+        Arguments:
+            worker_id {str} -- Worker ID.
+
+        Returns:
+            dict -- Claimed job, or None if there are no pending jobs.
+        """
+
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Function to record a heartbeat for a claimed job.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            worker_id {str} -- Worker ID.
+
+        Returns:
+            bool -- True if the job is still claimed by the worker.
+        """
+
+        raise NotImplementedError
+
+    def complete(self, job_id: str, worker_id: str, result_path: str) -> bool:
+        """Function to mark a claimed job as done.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            worker_id {str} -- Worker ID.
+            result_path {str} -- Path of the stored results.
+
+        Returns:
+            bool -- True if the job was still claimed by the worker.
+        """
+
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Function to release a claimed job after an error; the job is
+        requeued, or marked as failed after `max_attempts` attempts.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            worker_id {str} -- Worker ID.
+            error {str} -- Error message.
+
+        Returns:
+            bool -- True if the job was still claimed by the worker.
+        """
+
+        raise NotImplementedError
+
+    def requeueStale(self, stale_timeout: float) -> int:
+        """Function to requeue claimed jobs without a recent heartbeat; as in
+        `fail`, jobs are marked as failed (with a 'stale claim' error) after
+        `max_attempts` attempts, such that jobs that kill their workers are not
+        retried indefinitely.
+
+        Arguments:
+            stale_timeout {float} -- Heartbeat timeout (seconds).
+
+        Returns:
+            int -- Number of requeued jobs.
+        """
+
+        raise NotImplementedError
+
+    def getStatus(self) -> dict:
+        """Function to get the number of jobs in each state.
+
+        Returns:
+            dict -- Dictionary of state -> number of jobs.
+        """
+
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue backed by a single SQLite file (see `WorkQueue`). Claims are
+    made within `BEGIN IMMEDIATE` transactions, so that exactly one worker
+    claims each job.
+    """
+
+    def __init__(self, db_file: str, max_attempts: int=3):
+        """Initialization method for `SQLiteWorkQueue`. Creates the jobs table
+        if it does not exist.
+
+        Arguments:
+            db_file {str} -- SQLite database file.
+
+        Keyword Arguments:
+            max_attempts {int} -- Number of attempts of a failing job before it
+                                  is marked as failed (default: {3}).
+        """
+
+        super().__init__(max_attempts=max_attempts)
+        self.db_file = db_file
+
+        with self.connect() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker_id TEXT,
+                heartbeat REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                result_path TEXT
+            )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status '
+                         'ON jobs (status)')
+
+    @contextmanager
+    def connect(self) -> sqlite3.Connection:
+        """Context manager to open a connection to the database (in autocommit
+        mode), closed on exit. Connections are opened per operation, and are
+        not shared across threads or processes.
+
+        Returns:
+            sqlite3.Connection -- Database connection.
+        """
+
+        conn = sqlite3.connect(self.db_file, timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, job: dict) -> bool:
+        with self.connect() as conn:
+            cursor = conn.execute('INSERT OR IGNORE INTO jobs '
+                '(job_id, payload) VALUES (?, ?)',
+                (job['job_id'], json.dumps(job)))
+            return cursor.rowcount > 0
+
+    def claim(self, worker_id: str) -> dict:
+        with self.connect() as conn:
+            # NOTE: The write lock is taken before the select, so that exactly
+            #       one worker claims each job
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT job_id, payload FROM jobs '
+                    'WHERE status = ? ORDER BY job_id LIMIT 1',
+                    ('pending',)).fetchone()
+                if row is not None:
+                    conn.execute('UPDATE jobs SET status = ?, worker_id = ?, '
+                        'heartbeat = ?, attempts = attempts + 1 '
+                        'WHERE job_id = ?',
+                        ('claimed', worker_id, time.time(), row[0]))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        return None if row is None else json.loads(row[1])
+
+    def updateClaimed(self, job_id: str, worker_id: str, **fields) -> bool:
+        """Function to update the fields of a job, only if it is claimed by
+        the worker.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            worker_id {str} -- Worker ID.
+            **fields -- Field -> value updates.
+
+        Returns:
+            bool -- True if the job was claimed by the worker.
+        """
+
+        assignments = ', '.join('{0} = ?'.format(i) for i in fields)
+        with self.connect() as conn:
+            cursor = conn.execute('UPDATE jobs SET ' + assignments +
+                ' WHERE job_id = ? AND status = ? AND worker_id = ?',
+                list(fields.values()) + [job_id, 'claimed', worker_id])
+            return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        return self.updateClaimed(job_id=job_id, worker_id=worker_id,
+                                  heartbeat=time.time())
+
+    def complete(self, job_id: str, worker_id: str, result_path: str) -> bool:
+        return self.updateClaimed(job_id=job_id, worker_id=worker_id,
+                                  status='done', result_path=result_path)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        with self.connect() as conn:
+            cursor = conn.execute('UPDATE jobs SET error = ?, status = '
+                'CASE WHEN attempts >= ? THEN ? ELSE ? END '
+                'WHERE job_id = ? AND status = ? AND worker_id = ?',
+                (error, self.max_attempts, 'failed', 'pending', job_id,
+                 'claimed', worker_id))
+            return cursor.rowcount > 0
+
+    def requeueStale(self, stale_timeout: float) -> int:
+        stale_time = time.time() - stale_timeout
+        with self.connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                n_failed = conn.execute('UPDATE jobs SET status = ?, '
+                    'error = ? WHERE status = ? AND heartbeat < ? '
+                    'AND attempts >= ?', ('failed', 'stale claim', 'claimed',
+                    stale_time, self.max_attempts)).rowcount
+                n_requeued = conn.execute('UPDATE jobs SET status = ? '
+                    'WHERE status = ? AND heartbeat < ?',
+                    ('pending', 'claimed', stale_time)).rowcount
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        if n_failed > 0:
+            logging.warning('Failed {0} stale jobs after {1} attempts'.format(
+                n_failed, self.max_attempts))
+        if n_requeued > 0:
+            logging.info('Requeued {0} stale jobs'.format(n_requeued))
+
+        return n_requeued
+
+    def getStatus(self) -> dict:
+        with self.connect() as conn:
+            return dict(conn.execute('SELECT status, COUNT(*) FROM jobs '
+                                     'GROUP BY status').fetchall())
+
+
+class FileSystemWorkQueue(WorkQueue):
+    """Work queue backed by a directory of job files on a (shared) filesystem
+    (see `WorkQueue`). Each job is a JSON file in one of the 'pending',
+    'claimed', 'done' and 'failed' state folders; jobs are claimed with an
+    atomic rename from 'pending' to 'claimed' (exactly one worker succeeds),
+    and heartbeats update the modification time of the claimed job file.
+    """
+
+    states = ('pending', 'claimed', 'done', 'failed')
+
+    def __init__(self, queue_folder: str, max_attempts: int=3):
+        """Initialization method for `FileSystemWorkQueue`. Creates the state
+        folders if they do not exist.
+
+        Arguments:
+            queue_folder {str} -- Work queue folder.
+
+        Keyword Arguments:
+            max_attempts {int} -- Number of attempts of a failing job before it
+                                  is marked as failed (default: {3}).
+        """
+
+        super().__init__(max_attempts=max_attempts)
+        self.queue_folder = queue_folder
+
+        for state in self.states:
+            os.makedirs(os.path.join(self.queue_folder, state), exist_ok=True)
+
+    def getJobPath(self, state: str, job_id: str) -> str:
+        """Function to get the path of a job file.
+
+        Arguments:
+            state {str} -- Job state.
+            job_id {str} -- Job ID.
+
+        Returns:
+            str -- Job file path.
+        """
+
+        return os.path.join(self.queue_folder, state, job_id + '.json')
+
+    def readJob(self, path: str) -> dict:
+        """Function to read a job file.
+
+        Arguments:
+            path {str} -- Job file path.
+
+        Returns:
+            dict -- Job, or None if the file does not exist.
+        """
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def writeJob(self, path: str, job: dict):
+        """Function to (atomically) write a job file.
+
+        Arguments:
+            path {str} -- Job file path.
+            job {dict} -- Job.
+        """
+
+        tmp_path = '{0}.{1}.tmp'.format(path, uuid.uuid4().hex)
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def moveJob(self, job_id: str, from_state: str, to_state: str) -> bool:
+        """Function to (atomically) move a job file between states.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            from_state {str} -- Current job state.
+            to_state {str} -- New job state.
+
+        Returns:
+            bool -- True if the job was moved (i.e. was in `from_state`).
+        """
+
+        try:
+            os.rename(self.getJobPath(from_state, job_id),
+                      self.getJobPath(to_state, job_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def isClaimedBy(self, job_id: str, worker_id: str) -> bool:
+        """Function to check if a job is claimed by a worker.
+
+        Arguments:
+            job_id {str} -- Job ID.
+            worker_id {str} -- Worker ID.
+
+        Returns:
+            bool -- True if the job is claimed by the worker.
+        """
+
+        job = self.readJob(self.getJobPath('claimed', job_id))
+        return job is not None and job.get('worker_id') == worker_id
+
+    def enqueue(self, job: dict) -> bool:
+        if any(os.path.exists(self.getJobPath(i, job['job_id']))
+            for i in self.states):
+            return False
+
+        job = dict(job, attempts=0)
+        self.writeJob(self.getJobPath('pending', job['job_id']), job)
+
+        return True
+
+    def claim(self, worker_id: str) -> dict:
+        for f in sorted(os.listdir(os.path.join(self.queue_folder,
+            'pending'))):
+            if not f.endswith('.json'):
+                continue
+            job_id = f[:-len('.json')]
+            # NOTE: The pending job file is touched before the rename (which
+            #       keeps the modification time), so that the claim is never
+            #       seen as stale (see `requeueStale`)
+            try:
+                os.utime(self.getJobPath('pending', job_id))
+            except FileNotFoundError:
+                continue
+            # NOTE: Only one worker can rename the pending job file
+            if not self.moveJob(job_id, 'pending', 'claimed'):
+                continue
+            path = self.getJobPath('claimed', job_id)
+            job = self.readJob(path)
+            if job is None:
+                continue
+            job['worker_id'] = worker_id
+            job['attempts'] = job.get('attempts', 0) + 1
+            self.writeJob(path, job)
+            return job
+
+        return None
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        if not self.isClaimedBy(job_id=job_id, worker_id=worker_id):
+            return False
+
+        try:
+            os.utime(self.getJobPath('claimed', job_id))
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def complete(self, job_id: str, worker_id: str, result_path: str) -> bool:
+        if not self.isClaimedBy(job_id=job_id, worker_id=worker_id):
+            return False
+
+        path = self.getJobPath('claimed', job_id)
+        job = self.readJob(path)
+        if job is None:
+            return False
+        self.writeJob(path, dict(job, result_path=result_path))
+
+        return self.moveJob(job_id, 'claimed', 'done')
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        if not self.isClaimedBy(job_id=job_id, worker_id=worker_id):
+            return False
+
+        path = self.getJobPath('claimed', job_id)
+        job = self.readJob(path)
+        if job is None:
+            return False
+        job = dict(job, error=error)
+        self.writeJob(path, job)
+
+        return self.moveJob(job_id, 'claimed', 'failed'
+            if job['attempts'] >= self.max_attempts else 'pending')
+
+    def requeueStale(self, stale_timeout: float) -> int:
+        claimed_folder = os.path.join(self.queue_folder, 'claimed')
+        n_requeued = 0
+        n_failed = 0
+        for f in os.listdir(claimed_folder):
+            if not f.endswith('.json'):
+                continue
+            try:
+                last_heartbeat = os.path.getmtime(os.path.join(claimed_folder,
+                                                               f))
+            except FileNotFoundError:
+                continue
+            if last_heartbeat >= time.time() - stale_timeout:
+                continue
+            job_id = f[:-len('.json')]
+            job = self.readJob(os.path.join(claimed_folder, f))
+            if job is None:
+                continue
+            if job.get('attempts', 0) < self.max_attempts:
+                n_requeued += self.moveJob(job_id, 'claimed', 'pending')
+            elif self.moveJob(job_id, 'claimed', 'failed'):
+                self.writeJob(self.getJobPath('failed', job_id),
+                              dict(job, error='stale claim'))
+                n_failed += 1
+
+        if n_failed > 0:
+            logging.warning('Failed {0} stale jobs after {1} attempts'.format(
+                n_failed, self.max_attempts))
+        if n_requeued > 0:
+            logging.info('Requeued {0} stale jobs'.format(n_requeued))
+
+        return n_requeued
+
+    def getStatus(self) -> dict:
+        return dict((i, len([f for f in os.listdir(os.path.join(
+            self.queue_folder, i)) if f.endswith('.json')]))
+            for i in self.states)
@@ -0,0 +1,349 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+# Optional resource usage module (Unix only)
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+    logging.debug('resource module not available; peak RSS not sampled')
+
+
+class TelemetryEmitter():
+    """Emitter of a structured sweep telemetry stream.
+
+    Events are appended to a JSON-lines file, one JSON object per line, with
+    the event type ('job_start', 'job_finish', 'resource' or any custom
+    event; a 'sweep_start' event, with the total number of jobs, starts a new
+    sweep in the stream), a UNIX timestamp, and the emitting host and process.
+    Each line is written with a single append, so any number of workers (on
+    any number of nodes, with a shared filesystem) may emit to the same file.
+    See `TelemetryReader` for live throughput and ETA of a running sweep.
+
+    Job events include the per-phase timings of the job (see `phase`), the
+    runtime, the number of simulated bars and the bars per second, the peak
+    RSS of the process, and the failure cause of failed jobs. Resource samples
+    are emitted periodically by a background thread (see `startSampler`).
+    """
+
+    def __init__(self, telemetry_file: str, sample_interval: float=30.):
+        """Initialization method for `TelemetryEmitter`.
+
+        Arguments:
+            telemetry_file {str} -- Telemetry (JSON-lines) file.
+
+        Keyword Arguments:
+            sample_interval {float} -- Seconds between resource samples
+                                       (default: {30.}).
+        """
+
+        self.telemetry_file = telemetry_file
+        self.sample_interval = sample_interval
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+
+        # Current job state (see `jobStarted`)
+        self.job_id = None
+        self.job_start = None
+        self.phases = dict()
+
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.stop_event = threading.Event()
+
+        telemetry_folder = os.path.dirname(self.telemetry_file)
+        if telemetry_folder:
+            os.makedirs(telemetry_folder, exist_ok=True)
+
+    def emit(self, event: str, **fields):
+        """Function to append an event to the telemetry file.
+
+        Arguments:
+            event {str} -- Event type.
+            **fields -- Additional (JSON-serializable) event fields.
+        """
+
+        record = {'event': event, 'ts': time.time(), 'host': self.host,
+                  'pid': self.pid}
+        record.update(fields)
+        line = (json.dumps(record, default=str) + '\n').encode('utf-8')
+
+        # Single append per event, so lines of concurrent emitters never mix
+        with self.lock:
+            fd = os.open(self.telemetry_file,
+                         os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def getResourceUsage() -> dict:
+        """Function to get the resource usage of the current process; the
+        current and peak RSS (MB; None where not available), and the user and
+        system CPU time (seconds).
+
+        Returns:
+            dict -- Resource usage.
+        """
+
+        rss_mb = None
+        try:
+            with open('/proc/self/statm') as f:
+                rss_mb = int(f.read().split()[1]) *\
+                    os.sysconf('SC_PAGE_SIZE') / 2. ** 20
+        except (OSError, ValueError):
+            pass
+
+        # NOTE: `ru_maxrss` is in kilobytes on Linux, and bytes on macOS
+        peak_rss_mb = None
+        if HAS_RESOURCE:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_rss_mb = max_rss / 2. ** (20 if os.uname().sysname ==
+                                           'Darwin' else 10)
+
+        cpu_times = os.times()
+
+        return {'rss_mb': rss_mb, 'peak_rss_mb': peak_rss_mb,
+                'cpu_user': cpu_times.user, 'cpu_system': cpu_times.system}
+
+    def jobStarted(self, job_id: str, **fields):
+        """Function to emit the start of a job, and reset its phase timings.
+
+        Arguments:
+            job_id {str} -- Job ID (e.g. universe name).
+            **fields -- Additional event fields.
+        """
+
+        self.job_id = job_id
+        self.job_start = time.time()
+        self.phases = dict()
+        self.emit('job_start', job_id=job_id, **fields)
+
+    def jobFinished(self, status: str='done', n_bars: int=None,
+        error: str=None, **fields):
+        """Function to emit the end of the current job, with its runtime,
+        phase timings, throughput and resource usage.
+
+        Keyword Arguments:
+            status {str} -- Job status; 'done' or 'failed' (default: {'done'}).
+            n_bars {int} -- Number of simulated bars (default: {None}).
+            error {str} -- Failure cause (default: {None}).
+            **fields -- Additional event fields.
+        """
+
+        runtime = time.time() - self.job_start
+        record = {'job_id': self.job_id, 'status': status,
+                  'runtime': runtime, 'phases': self.phases, 'n_bars': n_bars,
+                  'bars_per_sec': n_bars / runtime if n_bars and runtime > 0
+                      else None,
+                  'error': error}
+        record.update(self.getResourceUsage())
+        record.update(fields)
+        self.emit('job_finish', **record)
+
+        self.job_id = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager to time a phase of the current job; the durations
+        of repeated phases are summed.
+
+        Arguments:
+            name {str} -- Phase name (e.g. 'simulate').
+        """
+
+        phase_start = time.time()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.) + time.time() -\
+                phase_start
+
+    def sample(self):
+        """Function to emit a resource usage sample.
+        """
+
+        self.emit('resource', job_id=self.job_id, **self.getResourceUsage())
+
+    def startSampler(self):
+        """Function to start emitting resource samples periodically (on a
+        background thread).
+        """
+
+        if self.sampler is not None:
+            return
+
+        def sampleLoop():
+            while not self.stop_event.wait(self.sample_interval):
+                self.sample()
+
+        self.stop_event.clear()
+        self.sampler = threading.Thread(target=sampleLoop, daemon=True)
+        self.sampler.start()
+
+    def stopSampler(self):
+        """Function to stop the resource sampler.
+        """
+
+        if self.sampler is None:
+            return
+
+        self.stop_event.set()
+        self.sampler.join()
+        self.sampler = None
+
+
+class TelemetryReader():
+    """Reader of a sweep telemetry stream (see `TelemetryEmitter`); summarizes
+    the progress, throughput and ETA of a (running) sweep.
+    """
+
+    def __init__(self, telemetry_file: str):
+        """Initialization method for `TelemetryReader`.
+
+        Arguments:
+            telemetry_file {str} -- Telemetry (JSON-lines) file.
+        """
+
+        self.telemetry_file = telemetry_file
+
+    def readEvents(self) -> list:
+        """Function to read the events in the telemetry file; a partially
+        written last line is skipped.
+
+        Returns:
+            list -- List of events (dict).
+        """
+
+        if not os.path.isfile(self.telemetry_file):
+            return list()
+
+        events = list()
+        with open(self.telemetry_file) as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+
+        return events
+
+    def getSummary(self, n_total: int=None, n_remaining: int=None,
+        recent_jobs: int=50, stale_timeout: float=600.) -> dict:
+        """Function to summarize the progress of the sweep; i.e. of the events
+        after the last 'sweep_start' event (all events if there is none), as
+        telemetry files may be reused across sweeps.
+
+        Keyword Arguments:
+            n_total {int} -- Total number of jobs in the sweep, for the ETA
+                             (default: {None}; uses the last 'sweep_start'
+                             event, if any).
+            n_remaining {int} -- Number of remaining jobs, for the ETA (e.g.
+                                 from the work queue); overrides `n_total`
+                                 (default: {None}).
+            recent_jobs {int} -- Number of most recent completed jobs used to
+                                 estimate the current throughput
+                                 (default: {50}).
+            stale_timeout {float} -- Seconds without any event of a started
+                                     job after which it is no longer counted
+                                     as running (i.e. its worker was lost;
+                                     see `TelemetryEmitter.startSampler`)
+                                     (default: {600.}).
+
+        Returns:
+            dict -- Sweep summary; job (and failed attempt) counts, running
+                    and stale job counts, elapsed time, throughput (jobs/hour,
+                    overall and recent), ETA (seconds), mean runtime, bars per
+                    second and phase timings, peak RSS, and the slowest and
+                    failed jobs.
+        """
+
+        events = self.readEvents()
+
+        # Events of the last sweep
+        sweep_starts = [i for i, j in enumerate(events)
+                        if j['event'] == 'sweep_start']
+        if sweep_starts:
+            events = events[sweep_starts[-1]:]
+            if n_total is None:
+                n_total = events[0].get('n_total')
+
+        started = [i for i in events if i['event'] == 'job_start']
+        finished = [i for i in events if i['event'] == 'job_finish']
+        # Last attempt of each job (failed jobs may be retried)
+        last_attempts = dict((i['job_id'], i) for i in finished)
+        done = [i for i in last_attempts.values() if i['status'] == 'done']
+        failed = [i for i in last_attempts.values() if i['status'] != 'done']
+
+        # Jobs started after their last finish (if any), active within the
+        # timeout (job events, and resource samples during the job)
+        last_starts = dict((i['job_id'], i['ts']) for i in started)
+        last_finishes = dict((i['job_id'], i['ts']) for i in finished)
+        last_active = dict()
+        for event in events:
+            if event.get('job_id') is not None:
+                last_active[event['job_id']] = event['ts']
+        unfinished = [i for i, j in last_starts.items()
+                      if j > last_finishes.get(i, float('-inf'))]
+        n_running = len([i for i in unfinished
+                         if last_active[i] >= time.time() - stale_timeout])
+
+        summary = {'n_started': len(started), 'n_done': len(done),
+                   'n_failed': len(failed),
+                   'n_failed_attempts': len([i for i in finished
+                                             if i['status'] != 'done']),
+                   'n_running': n_running,
+                   'n_stale': len(unfinished) - n_running,
+                   'elapsed': None, 'jobs_per_hour': None,
+                   'recent_jobs_per_hour': None, 'eta': None}
+        if not events:
+            return summary
+
+        first_ts = min(i['ts'] for i in events)
+        last_ts = max(i['ts'] for i in events)
+        summary['elapsed'] = last_ts - first_ts
+
+        if done:
+            finish_ts = sorted(i['ts'] for i in done)
+            if last_ts > first_ts:
+                summary['jobs_per_hour'] = len(done) * 3600. /\
+                    (last_ts - first_ts)
+            recent = finish_ts[-(recent_jobs + 1):]
+            if len(recent) > 1 and recent[-1] > recent[0]:
+                summary['recent_jobs_per_hour'] = (len(recent) - 1) * 3600. /\
+                    (recent[-1] - recent[0])
+
+            rate = summary['recent_jobs_per_hour'] or\
+                summary['jobs_per_hour']
+            if n_remaining is None and n_total is not None:
+                n_remaining = max(n_total - len(done) - len(failed), 0)
+            if n_remaining is not None and rate:
+                summary['eta'] = n_remaining * 3600. / rate
+
+            bars_per_sec = [i['bars_per_sec'] for i in done
+                            if i.get('bars_per_sec') is not None]
+            phase_names = sorted(set().union(*[i['phases'] for i in done]))
+            summary.update({
+                'mean_runtime': sum(i['runtime'] for i in done) / len(done),
+                'mean_bars_per_sec': sum(bars_per_sec) / len(bars_per_sec)
+                    if bars_per_sec else None,
+                'mean_phases': dict((j, sum(i['phases'].get(j, 0.)
+                    for i in done) / len(done)) for j in phase_names),
+                'slowest_jobs': [(i['job_id'], i['runtime']) for i in sorted(
+                    done, key=lambda k: k['runtime'], reverse=True)[:5]]
+            })
+
+        peak_rss = [i['peak_rss_mb'] for i in events
+                    if i.get('peak_rss_mb') is not None]
+        summary['peak_rss_mb'] = max(peak_rss) if peak_rss else None
+        summary['failed_jobs'] = [(i['job_id'], (i.get('error') or '')
+            .strip().split('\n')[-1]) for i in failed]
+
+        return summary
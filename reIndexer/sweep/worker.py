@@ -0,0 +1,209 @@
+from .queue import WorkQueue
+from .telemetry import TelemetryEmitter
+
+from contextlib import ExitStack
+
+import logging
+import os
+import threading
+import traceback
+import uuid
+
+
+class SweepWorker():
+    """Worker to run sweep jobs claimed from a work queue (see `WorkQueue`).
+
+    Any number of workers, on any number of nodes, may process the same work
+    queue. Each worker claims one job at a time, keeps the claim alive with a
+    heartbeat thread while the backtest runs, and stores the results of the
+    job in the shared results folder (as `<job_id>.pickle`; see
+    `ResultsReader`). The data bundle is loaded once per worker (see
+    `BacktestSession`). Job events and resource samples are optionally
+    emitted to a telemetry stream (see `TelemetryEmitter`).
+    """
+
+    def __init__(self, work_queue: WorkQueue, results_folder: str,
+        worker_id: str=None, heartbeat_interval: float=60.,
+        stale_timeout: float=600., run_job=None,
+        telemetry: TelemetryEmitter=None):
+        """Initialization method for `SweepWorker`.
+
+        Arguments:
+            work_queue {WorkQueue} -- Work queue.
+            results_folder {str} -- Shared results folder.
+
+        Keyword Arguments:
+            worker_id {str} -- Worker ID (default: {None}; generated).
+            heartbeat_interval {float} -- Seconds between heartbeats
+                                          (default: {60.}).
+            stale_timeout {float} -- Seconds without a heartbeat after which
+                                     claims are requeued (default: {600.}).
+            run_job {callable} -- Function of a job returning the results
+                                  DataFrame (default: {None}; runs the job
+                                  with a `BacktestSession`).
+            telemetry {TelemetryEmitter} -- Telemetry emitter
+                                            (default: {None}).
+        """
+
+        self.work_queue = work_queue
+        self.results_folder = results_folder
+        self.worker_id = WorkQueue.makeWorkerId() if worker_id is None\
+            else worker_id
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.run_job = self.runBacktest if run_job is None else run_job
+        self.telemetry = telemetry
+
+        # Backtest session (loaded on the first job)
+        self.session = None
+
+        os.makedirs(self.results_folder, exist_ok=True)
+
+    def runBacktest(self, job: dict):
+        """Function to run the backtest of a sweep job.
+
+        Arguments:
+            job {dict} -- Sweep job (see `WorkQueue.makeJob`).
+
+        Returns:
+            pd.DataFrame -- Zipline simulation results.
+        """
+
+        # NOTE: Imported here, so that queues can be managed without zipline
+        from ..backtest import BacktestSession
+        from ..sector_universe import Universe
+
+        if self.session is None:
+            with self.phase('load_session'):
+                self.session = BacktestSession()
+
+        with self.phase('load_universe'):
+            sector_universe = Universe(
+                universe_name=job['universe_name'],
+                csv_file=job['csv_file']
+            )
+
+        with self.phase('simulate'):
+            return self.session.run(
+                sector_universe=sector_universe,
+                config_overrides=job['config_overrides']
+            )
+
+    def phase(self, name: str):
+        """Function to get a context manager timing a phase of the current
+        job (see `TelemetryEmitter.phase`); a no-op without telemetry.
+
+        Arguments:
+            name {str} -- Phase name.
+
+        Returns:
+            contextmanager -- Phase timing context manager.
+        """
+
+        if self.telemetry is None:
+            return ExitStack()
+
+        return self.telemetry.phase(name)
+
+    def keepAlive(self, job_id: str, stop_event: threading.Event):
+        """Function to send heartbeats for a claimed job until stopped (run on
+        a heartbeat thread).
+
+        Arguments:
+            job_id {str} -- Job ID.
+            stop_event {threading.Event} -- Stop event.
+        """
+
+        while not stop_event.wait(self.heartbeat_interval):
+            if not self.work_queue.heartbeat(job_id=job_id,
+                worker_id=self.worker_id):
+                logging.warning('Lost claim of job {0}'.format(job_id))
+                return
+
+    def processJob(self, job: dict) -> bool:
+        """Function to run a claimed job and store its results.
+
+        Arguments:
+            job {dict} -- Claimed sweep job.
+
+        Returns:
+            bool -- True if the job was completed.
+        """
+
+        job_id = job['job_id']
+        logging.info('Worker {0} running job {1}'.format(self.worker_id,
+                                                         job_id))
+
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(target=self.keepAlive,
+            args=(job_id, stop_event), daemon=True)
+        heartbeat.start()
+
+        if self.telemetry is not None:
+            self.telemetry.jobStarted(job_id=job_id,
+                                      worker_id=self.worker_id,
+                                      universe_name=job['universe_name'])
+
+        try:
+            results = self.run_job(job)
+
+            # Writing results atomically (partial files are never visible)
+            with self.phase('write_results'):
+                result_path = os.path.join(self.results_folder,
+                                           '.'.join([job_id, 'pickle']))
+                tmp_path = os.path.join(self.results_folder,
+                    '.tmp-{0}-{1}'.format(job_id, uuid.uuid4().hex))
+                results.to_pickle(tmp_path)
+                os.replace(tmp_path, result_path)
+        except Exception:
+            logging.error('Job {0} failed'.format(job_id))
+            error = traceback.format_exc()
+            if self.telemetry is not None:
+                self.telemetry.jobFinished(status='failed', error=error)
+            self.work_queue.fail(job_id=job_id, worker_id=self.worker_id,
+                                 error=error)
+            return False
+        finally:
+            stop_event.set()
+            heartbeat.join()
+
+        if self.telemetry is not None:
+            self.telemetry.jobFinished(status='done', n_bars=len(results))
+
+        return self.work_queue.complete(job_id=job_id,
+            worker_id=self.worker_id, result_path=result_path)
+
+    def run(self, max_jobs: int=None) -> int:
+        """Function to process jobs until the queue is empty (or `max_jobs`
+        jobs were processed).
+
+        Keyword Arguments:
+            max_jobs {int} -- Maximum number of jobs (default: {None}).
+
+        Returns:
+            int -- Number of completed jobs.
+        """
+
+        if self.telemetry is not None:
+            self.telemetry.startSampler()
+
+        n_processed = 0
+        n_completed = 0
+        try:
+            while max_jobs is None or n_processed < max_jobs:
+                self.work_queue.requeueStale(stale_timeout=self.stale_timeout)
+
+                job = self.work_queue.claim(worker_id=self.worker_id)
+                if job is None:
+                    break
+
+                n_completed += self.processJob(job=job)
+                n_processed += 1
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.stopSampler()
+
+        logging.info('Worker {0} completed {1} of {2} jobs'.format(
+            self.worker_id, n_completed, n_processed))
+
+        return n_completed
@@ -1 +1,4 @@
 from .price_weighted import PriceWeightedETF
+from .cache import SyntheticETFCache
+from .schemes import EqualWeighting, InverseVolatilityWeighting,\
+    PriceWeighting, WeightingScheme
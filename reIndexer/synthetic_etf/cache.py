@@ -0,0 +1,203 @@
+from ..cfg import config
+
+from collections import OrderedDict
+from zipline.data import bundles
+import hashlib
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import threading
+import uuid
+
+
+class SyntheticETFCache():
+    """Cache of synthetic ETF price series, shared across sector universes.
+
+    Many candidate sector universes contain identical sectors (i.e. the same
+    set of component tickers under a different label, or in a different
+    universe file). Synthetic ETF series are keyed by a canonical hash of the
+    sorted component tickers, the weighting scheme, the restructuring trigger,
+    the lookback window, the end of the window, the data bundle (name and
+    ingestion) and the storage precision, so that identical sectors are only
+    computed once.
+
+    The in-memory cache is shared by all instances (and threads; see
+    `config.sector_update_workers`) within a process, and holds at most
+    `config.setf_cache_max_entries` series (least recently used series are
+    evicted); the cache may optionally be persisted on disk
+    (`config.setf_cache_dir`) to be shared across processes.
+    """
+
+    # In-memory cache, shared within the process; key -> (prices, index), in
+    # order of use
+    _memory = OrderedDict()
+    _memory_lock = threading.Lock()
+
+    # Bundle identities, shared within the process; bundle name -> identity
+    _bundle_ids = dict()
+
+    def __init__(self, cache_dir: str=None):
+        """Initialization method for `SyntheticETFCache`.
+
+        Keyword Arguments:
+            cache_dir {str} -- On-disk cache directory; in-memory only if None
+                               (default: {None}; uses `config.setf_cache_dir`).
+        """
+
+        self.cache_dir = config.setf_cache_dir if cache_dir is None\
+            else cache_dir
+
+        if self.cache_dir is not None and not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    @classmethod
+    def getBundleId(cls) -> str:
+        """Function to get the identity of the data bundle in the configuration;
+        the name and the timestamp of the latest ingestion (i.e. the data read
+        by the backtests), such that series of re-ingested bundles (e.g. a
+        synthetic bundle with another seed) are not reused.
+
+        Returns:
+            str -- Bundle identity.
+        """
+
+        if config.bundle not in cls._bundle_ids:
+            try:
+                ingestions = bundles.ingestions_for_bundle(config.bundle)
+            except OSError:
+                ingestions = list()
+            cls._bundle_ids[config.bundle] = '{0}@{1}'.format(config.bundle,
+                max(ingestions).isoformat() if ingestions else None)
+
+        return cls._bundle_ids[config.bundle]
+
+    @classmethod
+    def makeKey(cls, tickers: list, end_dt: pd.Timestamp,
+        scheme: str='price_weighted') -> str:
+        """Function to build the canonical cache key of a synthetic ETF series.
+
+        Arguments:
+            tickers {list} -- Component tickers (in any order).
+            end_dt {pd.Timestamp} -- Last bar of the lookback window; only the
+                                     date is used for daily data.
+
+        Keyword Arguments:
+            scheme {str} -- Weighting scheme (default: {'price_weighted'}).
+
+        Returns:
+            str -- Cache key (hex digest).
+        """
+
+        if config.setf_data_frequency == '1d':
+            end_dt = end_dt.normalize()
+
+        key_data = {
+            'tickers': sorted(tickers),
+            'scheme': scheme,
+            'trigger': config.setf_restructure_trigger,
+            'lookback': config.setf_lookback_window,
+            'frequency': config.setf_data_frequency,
+            'end': pd.Timestamp(end_dt).tz_convert('UTC').isoformat(),
+            'bundle': cls.getBundleId(),
+            'dtype': config.storage_dtype
+        }
+
+        return hashlib.sha1(json.dumps(key_data, sort_keys=True)
+            .encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def isCacheable() -> bool:
+        """Function to check if synthetic ETF series may be cached with the
+        current configuration.
+
+        NOTE: With a wildcard ('*') restructuring day, the restructure dates
+              depend on the trigger state of each ETF (see `Utilities`), so
+              series are not cached.
+
+        Returns:
+            bool -- True if caching is enabled and possible.
+        """
+
+        return config.setf_cache_enabled and\
+            config.setf_restructure_trigger['day'] != '*'
+
+    def get(self, key: str) -> tuple:
+        """Function to get a cached synthetic ETF series.
+
+        Arguments:
+            key {str} -- Cache key.
+
+        Returns:
+            tuple -- Synthetic ETF prices (np.array) and index
+                     (pd.DatetimeIndex), or None if not cached.
+        """
+
+        with self._memory_lock:
+            try:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            except KeyError:
+                pass
+
+        if self.cache_dir is not None:
+            cache_file = os.path.join(self.cache_dir, key + '.npz')
+            if os.path.isfile(cache_file):
+                with np.load(cache_file) as cached:
+                    value = (cached['prices'], pd.DatetimeIndex(
+                        cached['index']).tz_localize('UTC'))
+                self.remember(key=key, value=value)
+                return value
+
+        return None
+
+    def put(self, key: str, prices: np.array, index: pd.DatetimeIndex):
+        """Function to cache a synthetic ETF series.
+
+        Arguments:
+            key {str} -- Cache key.
+            prices {np.array} -- Synthetic ETF prices.
+            index {pd.DatetimeIndex} -- Synthetic ETF price index.
+        """
+
+        self.remember(key=key, value=(prices, index))
+
+        if self.cache_dir is not None:
+            # Writing to a (unique) temporary file first; rename is atomic, so
+            # that concurrent readers never see partial files
+            cache_file = os.path.join(self.cache_dir, key + '.npz')
+            tmp_file = '{0}.{1}.tmp'.format(cache_file, uuid.uuid4().hex)
+            with open(tmp_file, 'wb') as f:
+                np.savez(f, prices=prices,
+                         index=index.tz_convert('UTC').tz_localize(None)
+                            .values)
+            os.replace(tmp_file, cache_file)
+
+            logging.debug('Persisted synthetic ETF series {0}'.format(key))
+
+    @classmethod
+    def remember(cls, key: str, value: tuple):
+        """Function to add a series to the in-memory cache, evicting the least
+        recently used series beyond `config.setf_cache_max_entries`.
+
+        Arguments:
+            key {str} -- Cache key.
+            value {tuple} -- Synthetic ETF prices and index.
+        """
+
+        with cls._memory_lock:
+            cls._memory[key] = value
+            cls._memory.move_to_end(key)
+            while len(cls._memory) > config.setf_cache_max_entries:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        """Function to clear the in-memory cache (and the bundle identities,
+        e.g. after a re-ingestion).
+        """
+
+        with cls._memory_lock:
+            cls._memory.clear()
+        cls._bundle_ids.clear()
@@ -1,7 +1,9 @@
-from ..cfg import config
+from ..cfg import config, getStorageDtype
 from ..backtest.util import Utilities
+from ..kernels import segmentedHoldingReturns, segmentedPrices
+from .cache import SyntheticETFCache
 
-from zipline.api import symbols
+from zipline.api import get_datetime, symbols
 from zipline.protocol import BarData
 import logging
 import numpy as np
@@ -37,28 +39,41 @@ class PriceWeightedETF():
         # Initializing utilities module (for historical restructure flag)
         self.backtest_util = Utilities()
 
+        # Shared synthetic ETF series cache
+        self.setf_cache = SyntheticETFCache()
+
         # Updating ETF parameters on init
         self.updateParameters(zipline_data=zipline_data)
 
         # Compute allocation weights on initialization
         self.updateWeights(zipline_data=zipline_data)
 
-    def updateWeights(self, zipline_data: BarData) -> np.array:
+    def updateWeights(self, zipline_data: BarData,
+        current_prices: np.array=None) -> np.array:
         """Update current weights of the component assets; this recomputes the
         price-weighted allocation as of the date of the current `zipline_data`.
         
         Arguments:
             zipline_data {BarData} -- Instance zipline data bundle.
+
+        Keyword Arguments:
+            current_prices {np.array} -- Prefetched current component asset
+                                         prices, in ticker order; fetched
+                                         from `zipline_data` if None
+                                         (default: {None}).
         
         Returns:
             np.array -- Array of asset weights.
         """
 
         # Getting current component asset prices
-        current_asset_prices = np.array(zipline_data.current(
-            symbols(*self.tickers),
-            'price'
-        ))
+        if current_prices is None:
+            current_asset_prices = np.array(zipline_data.current(
+                symbols(*self.tickers),
+                'price'
+            ))
+        else:
+            current_asset_prices = np.asarray(current_prices)
 
         # Computing current sum
         current_sum = np.sum(current_asset_prices)
@@ -177,55 +192,233 @@ class PriceWeightedETF():
         
         return self.alloc_weights_dict[ticker]
 
-    def updateParameters(self, zipline_data: BarData):
+    @staticmethod
+    def computeSyntheticPrices(prices: np.ndarray,
+        restructure_flags: np.array) -> np.array:
+        """Compute the synthetic ETF price series for a matrix of component
+        asset prices. The price-weighted allocation is recomputed on the first
+        row, and on every row where a restructure is triggered; each segment
+        between restructures is priced with its own allocation weights.
+        
+        Arguments:
+            prices {np.ndarray} -- Component asset prices (dates x assets).
+            restructure_flags {np.array} -- Boolean restructure flags (dates).
+        
+        Returns:
+            np.array -- Synthetic ETF prices.
+        """
+
+        return segmentedPrices(prices=prices, reset_flags=restructure_flags)
+
+    @staticmethod
+    def computeHoldingReturns(prices: np.ndarray,
+        restructure_flags: np.array) -> np.array:
+        """Compute the simple returns of holding the synthetic ETF; i.e. the
+        return of each row is computed with the allocation weights held over
+        the previous row. Unlike the returns of the synthetic ETF price series,
+        these exclude the level change of the price-weighted ETF on a
+        restructure. The first row has a return of zero.
+        
+        Arguments:
+            prices {np.ndarray} -- Component asset prices (dates x assets).
+            restructure_flags {np.array} -- Boolean restructure flags (dates).
+        
+        Returns:
+            np.array -- Synthetic ETF holding returns.
+        """
+
+        return segmentedHoldingReturns(prices=prices,
+                                       reset_flags=restructure_flags)
+
+    def updateParameters(self, zipline_data: BarData,
+        historical_data: pd.DataFrame=None):
         """Update ETF parameters; specifically, the asset allocations weights,
         the log return (over the configuration lookback window), the variance,
         and the synthetic ETF prices over the lookback window.
         
         Arguments:
             zipline_data {BarData} -- Instance zipline data bundle.
+
+        Keyword Arguments:
+            historical_data {pd.DataFrame} -- Prefetched historical component
+                                              asset prices (see
+                                              `fetchHistory`); fetched from
+                                              `zipline_data` if None
+                                              (default: {None}).
         """
 
+        # Reading window from the run's cleaned price panel, if available
+        if historical_data is None and config.price_panel is not None:
+            self.updateParametersFromPanel(end_dt=get_datetime())
+            return
+
+        # Reusing cached series of an identical sector, if available
+        if historical_data is None and self.loadFromCache(
+            end_dt=get_datetime()):
+            return
+
         # Get historical price data for lookback window from config
-        historical_data = zipline_data.history(
+        if historical_data is None:
+            historical_data = self.fetchHistory(zipline_data=zipline_data)
+
+        self.computeParameters(historical_data=historical_data)
+
+    def fetchHistory(self, zipline_data: BarData) -> pd.DataFrame:
+        """Fetch the historical component asset prices for the lookback window
+        in the configuration.
+
+        NOTE: Zipline data access is not thread-safe; this must be called from
+              the simulation thread.
+        
+        Arguments:
+            zipline_data {BarData} -- Instance zipline data bundle.
+        
+        Returns:
+            pd.DataFrame -- Historical component asset prices.
+        """
+
+        return zipline_data.history(
             symbols(*self.tickers),
             'price',
             bar_count=config.setf_lookback_window,
             frequency=config.setf_data_frequency
         )
 
+    def computeParameters(self, historical_data: pd.DataFrame):
+        """Compute ETF parameters from historical component asset prices (see
+        `updateParameters`). This does not access zipline data, and may be run
+        concurrently for different ETFs.
+        
+        Arguments:
+            historical_data {pd.DataFrame} -- Historical component asset prices.
+        """
+
+        # Reusing cached series of an identical sector, if available
+        if self.loadFromCache(end_dt=historical_data.index[-1]):
+            return
+
         # Filling na values
         historical_data = historical_data.fillna(method='bfill')
         historical_data = historical_data.fillna(method='ffill')
 
+        self.computeFilledParameters(
+            prices=historical_data.values,
+            index=historical_data.index
+        )
+
+    def updateParametersFromPanel(self, end_dt: pd.Timestamp):
+        """Update ETF parameters (see `updateParameters`), reading the
+        pre-filled lookback window from the run's cleaned price panel (see
+        `PricePanel`). This does not access zipline data, and may be run
+        concurrently for different ETFs.
+        
+        Arguments:
+            end_dt {pd.Timestamp} -- Last bar of the lookback window.
+        """
+
+        # Reusing cached series of an identical sector, if available
+        if self.loadFromCache(end_dt=end_dt):
+            return
+
+        prices, index = config.price_panel.getWindow(
+            tickers=self.tickers,
+            end_dt=end_dt,
+            bar_count=config.setf_lookback_window
+        )
+
+        self.computeFilledParameters(prices=prices, index=index)
+
+    def computeFilledParameters(self, prices: np.ndarray,
+        index: pd.DatetimeIndex):
+        """Compute ETF parameters from filled historical component asset
+        prices (see `computeParameters`).
+        
+        Arguments:
+            prices {np.ndarray} -- Filled component asset prices (dates x
+                                   assets).
+            index {pd.DatetimeIndex} -- Price index.
+        """
+
         # Computing prices, restructuring per the period in the configuration
-        setf_prices = np.array([])
-        first_run = True  # Flag for first run
-        for idx, row in historical_data.iterrows():
-            if (self.backtest_util.isRestructureTriggered(
-                current_date=idx, log_flag=False) or first_run):
-                # Recompute allocation weights
-                alloc_weights = np.array(row / row.sum())
-                # Update first run flag
-                first_run = False
-            # Computing synthetic ETF price
-            setf_price = np.dot(alloc_weights, row.values)
-            # Appending to prices array
-            setf_prices = np.append(setf_prices, setf_price)
+        restructure_flags = self.backtest_util.getRestructureFlags(
+            dates=index
+        )
+        setf_prices = self.computeSyntheticPrices(
+            prices=prices,
+            restructure_flags=restructure_flags
+        )
 
         if (np.count_nonzero(np.isnan(setf_prices)) > 0):
             logging.error('NA values detected in Synthetic ETF prices')
             raise Exception
 
-        # Computing ETF log returns
-        self.log_rets = np.diff(np.log(setf_prices))
+        # Caching series for identical sectors
+        if self.setf_cache.isCacheable():
+            self.setf_cache.put(
+                key=self.setf_cache.makeKey(
+                    tickers=self.tickers,
+                    end_dt=index[-1]
+                ),
+                prices=setf_prices,
+                index=index
+            )
+
+        self.bindPrices(setf_prices=setf_prices, index=index)
+
+    def loadFromCache(self, end_dt: pd.Timestamp) -> bool:
+        """Load the ETF parameters from a cached synthetic ETF series of an
+        identical sector (see `SyntheticETFCache`), if available.
+        
+        Arguments:
+            end_dt {pd.Timestamp} -- Last bar of the lookback window.
+        
+        Returns:
+            bool -- True if the parameters were loaded from the cache.
+        """
+
+        if not self.setf_cache.isCacheable():
+            return False
+
+        cached = self.setf_cache.get(key=self.setf_cache.makeKey(
+            tickers=self.tickers,
+            end_dt=end_dt
+        ))
+        if cached is None:
+            return False
+
+        self.bindPrices(setf_prices=cached[0], index=cached[1])
+
+        return True
+
+    def bindPrices(self, setf_prices: np.array, index: pd.DatetimeIndex):
+        """Compute the ETF log returns, single-period log return and variance
+        from a synthetic ETF price series, and bind them (and the prices) to
+        class variables.
+        
+        Arguments:
+            setf_prices {np.array} -- Synthetic ETF prices.
+            index {pd.DatetimeIndex} -- Synthetic ETF price index.
+        """
+
+        # Computing ETF log returns (in float64), storing compact
+        log_rets = np.diff(np.log(setf_prices.astype(np.float64)))
+        self.log_rets = log_rets.astype(getStorageDtype(), copy=False)
 
         # Computing single-period ETF log return (sum of log returns)
-        self.period_log_ret = np.sum(self.log_rets)
+        self.period_log_ret = np.sum(log_rets)
 
         # Computing ETF variance
-        self.variance = np.var(self.log_rets)
+        self.variance = np.var(log_rets)
+
+        # Binding synthetic ETF prices (compact array) and index
+        self.setf_prices = setf_prices.astype(getStorageDtype(), copy=False)
+        self.setf_index = index
+
+    def getPrices(self) -> pd.DataFrame:
+        """Get the synthetic ETF prices over the lookback window.
+        
+        Returns:
+            pd.DataFrame -- Synthetic ETF prices.
+        """
 
-        # Casting synthetic ETF prices to DataFrame with original index, binding
-        self.setf_prices = pd.DataFrame(setf_prices,
-                                        index=historical_data.index)
+        return pd.DataFrame(self.setf_prices, index=self.setf_index)
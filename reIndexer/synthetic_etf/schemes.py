@@ -0,0 +1,131 @@
+from ..kernels import allocatedHoldingReturns, allocatedPrices, segmentIds
+
+import logging
+import numpy as np
+
+
+class WeightingScheme():
+    """Base class of a synthetic ETF weighting scheme.
+
+    A weighting scheme computes the component allocation weights of a
+    synthetic ETF on each of its restructure rows (and its first row); the ETF
+    is priced with the allocation of its current segment between restructures,
+    as `PriceWeightedETF`. Schemes only differ in the allocation computed on a
+    restructure, so any number of schemes are priced together over the same
+    price window and restructure segments (see `computeSchemeSeries`).
+    """
+
+    # Scheme name (see `SyntheticETFCache.makeKey`)
+    name = None
+
+    def computeAllocations(self, prices: np.ndarray, reset_rows: np.array)\
+        -> np.ndarray:
+        """Function to compute the allocation weights of each segment.
+
+        Arguments:
+            prices {np.ndarray} -- Filled component asset prices (dates x
+                                   assets).
+            reset_rows {np.array} -- First row of each segment.
+
+        Raises:
+            NotImplementedError -- Raised when not implemented by the scheme.
+
+        Returns:
+            np.ndarray -- Allocation weights (segments x assets).
+        """
+
+        logging.error('Weighting scheme {0} does not implement allocations'
+            .format(type(self).__name__))
+        raise NotImplementedError
+
+    @staticmethod
+    def computeSchemeSeries(prices: np.ndarray, restructure_flags: np.array,
+        schemes: list) -> tuple:
+        """Function to compute the synthetic ETF prices and holding returns of
+        a list of weighting schemes over the same price window and restructure
+        segments.
+
+        Arguments:
+            prices {np.ndarray} -- Filled component asset prices (dates x
+                                   assets).
+            restructure_flags {np.array} -- Boolean restructure flags (dates).
+            schemes {list} -- List of weighting schemes.
+
+        Returns:
+            tuple -- ETF prices (np.ndarray), and ETF holding returns
+                     (np.ndarray); schemes x dates.
+        """
+
+        reset_rows, segment_ids = segmentIds(reset_flags=restructure_flags)
+        alloc_weights = np.stack([i.computeAllocations(prices=prices,
+            reset_rows=reset_rows) for i in schemes])
+
+        return allocatedPrices(prices=prices, alloc_weights=alloc_weights,
+                               segment_ids=segment_ids),\
+            allocatedHoldingReturns(prices=prices, alloc_weights=alloc_weights,
+                                    segment_ids=segment_ids)
+
+
+class PriceWeighting(WeightingScheme):
+    """Price weighting; allocation weights proportional to the component asset
+    prices on the restructure row (as `PriceWeightedETF`).
+    """
+
+    name = 'price_weighted'
+
+    def computeAllocations(self, prices: np.ndarray, reset_rows: np.array)\
+        -> np.ndarray:
+        reset_prices = prices[reset_rows].astype(np.float64)
+
+        return reset_prices / reset_prices.sum(axis=1)[:, None]
+
+
+class EqualWeighting(WeightingScheme):
+    """Equal weighting; equal allocation weights for all component assets.
+    """
+
+    name = 'equal_weighted'
+
+    def computeAllocations(self, prices: np.ndarray, reset_rows: np.array)\
+        -> np.ndarray:
+        n_assets = prices.shape[1]
+
+        return np.full((len(reset_rows), n_assets), 1. / n_assets)
+
+
+class InverseVolatilityWeighting(WeightingScheme):
+    """Inverse volatility weighting; allocation weights proportional to the
+    inverse of the standard deviation of the component asset log returns over
+    the window ending on the restructure row. Segments without enough history
+    (e.g. the first row), or without any volatile asset, are equal weighted.
+    """
+
+    def __init__(self, vol_window: int=60):
+        """Initialization method for `InverseVolatilityWeighting`.
+
+        Keyword Arguments:
+            vol_window {int} -- Number of log returns in the volatility window
+                                (default: {60}).
+        """
+
+        self.vol_window = vol_window
+        self.name = 'inverse_volatility_{0}'.format(vol_window)
+
+    def computeAllocations(self, prices: np.ndarray, reset_rows: np.array)\
+        -> np.ndarray:
+        log_rets = np.diff(np.log(prices.astype(np.float64)), axis=0)
+        n_assets = prices.shape[1]
+
+        alloc_weights = np.full((len(reset_rows), n_assets), 1. / n_assets)
+        for idx, row in enumerate(reset_rows):
+            # Log returns ending on (and including) the restructure row
+            window = log_rets[max(row - self.vol_window, 0):row]
+            if len(window) < 2:
+                continue
+            std_dev = np.std(window, axis=0, ddof=1)
+            inv_vol = np.where(std_dev > 0, 1. / np.where(std_dev > 0,
+                std_dev, 1.), 0.)
+            if inv_vol.sum() > 0:
+                alloc_weights[idx] = inv_vol / inv_vol.sum()
+
+        return alloc_weights
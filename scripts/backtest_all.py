@@ -6,6 +6,7 @@
 import logging
 import os
 import pandas as pd
+import traceback
 
 from context import reIndexer
 
@@ -15,14 +16,23 @@ logging.basicConfig(filename='tmp/out.log', level=logging.INFO)
 
 # Folder containing candidate sector universe files
 sector_folder = 'sector_universes/learned_sector_candidates/'
-# Output folder for pickled backtest results dataframes
+# Output folder for pickled backtest results dataframes (and streamed HDF5
+# results files)
 pickle_out_folder = 'sector_universes/learned_sectors/pickle/'
 # Output folder for excel backtest result files
 excel_out_folder = 'sector_universes/learned_sectors/excel/'
+# Stream results to disk in monthly chunks while each backtest runs (see
+# `StreamingResultsWriter`), so that memory use does not grow with the length
+# of the run; results are written as `<universe>.h5` (readable by
+# `ResultsReader`), and no excel files are written
+stream_results = True
+# Sweep telemetry stream (see `sweep_status.py`)
+telemetry_file = 'tmp/telemetry.jsonl'
 
 # Override list of completed universes (for resolution on crash)
 completed_universes = [f.split('.')[0] for f in os.listdir(excel_out_folder)
-    if f.endswith('.xlsx')]
+    if f.endswith('.xlsx')] + [f.split('.')[0] for f in
+    os.listdir(pickle_out_folder) if f.endswith('.h5')]
 
 def backtestAll():
     candidate_files = [f for f in os.listdir(sector_folder)
@@ -40,32 +50,65 @@ def backtestAll():
 
     counter = 0
 
+    telemetry = reIndexer.TelemetryEmitter(telemetry_file=telemetry_file)
+    telemetry.emit('sweep_start', n_total=len(candidate_files))
+    telemetry.startSampler()
+
+    # Loading data bundle once for all candidate universes
+    with telemetry.phase('load_session'):
+        session = reIndexer.BacktestSession()
+
     for f in candidate_files:
         print('Currently backtesting {0}'.format(f))
 
         # Isolating sector universe name
         universe_name, _ = f.split('.')
-
-        # Creating reIndexer sector from file
-        candidate_universe = reIndexer.Universe(
-            universe_name=universe_name,
-            csv_file=os.path.join(sector_folder, f)
-        )
-
-        # Running backtest
-        backtest_results = reIndexer.Backtest(
-            sector_universe=candidate_universe
-        ).run()
-
-        # Saving output data to excel and pickle
-        backtest_results.to_excel(os.path.join(
-            excel_out_folder,
-            '.'.join([universe_name, 'xlsx'])
-        ))
-        backtest_results.to_pickle(os.path.join(
-            pickle_out_folder,
-            '.'.join([universe_name, '.pickle'])
-        ))
+        telemetry.jobStarted(job_id=universe_name)
+
+        try:
+            # Creating reIndexer sector from file
+            with telemetry.phase('load_universe'):
+                candidate_universe = reIndexer.Universe(
+                    universe_name=universe_name,
+                    csv_file=os.path.join(sector_folder, f)
+                )
+
+            if stream_results:
+                # Running backtest, streaming results to a partial file
+                # (renamed once complete, so that crashed runs are rerun)
+                results_file = os.path.join(pickle_out_folder,
+                                            '.'.join([universe_name, 'h5']))
+                results_writer = reIndexer.StreamingResultsWriter(
+                    path=results_file + '.partial')
+                with telemetry.phase('simulate'):
+                    session.run(sector_universe=candidate_universe,
+                                results_writer=results_writer)
+                os.replace(results_file + '.partial', results_file)
+                n_bars = results_writer.n_bars
+            else:
+                # Running backtest
+                with telemetry.phase('simulate'):
+                    backtest_results = session.run(
+                        sector_universe=candidate_universe)
+
+                # Saving output data to excel and pickle
+                with telemetry.phase('write_results'):
+                    backtest_results.to_excel(os.path.join(
+                        excel_out_folder,
+                        '.'.join([universe_name, 'xlsx'])
+                    ))
+                    backtest_results.to_pickle(os.path.join(
+                        pickle_out_folder,
+                        '.'.join([universe_name, '.pickle'])
+                    ))
+                n_bars = len(backtest_results)
+        except Exception:
+            telemetry.jobFinished(status='failed',
+                                  error=traceback.format_exc())
+            telemetry.stopSampler()
+            raise
+
+        telemetry.jobFinished(status='done', n_bars=n_bars)
 
         print('Completed backtesting {0}'.format(f))
         counter += 1 # Increment counter (for percentage)
@@ -75,5 +118,7 @@ def backtestAll():
             format(counter, len(candidate_files) - counter,
                    len(candidate_files)))
 
+    telemetry.stopSampler()
+
 if __name__ == '__main__':
     backtestAll()
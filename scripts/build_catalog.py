@@ -0,0 +1,26 @@
+# Script to pack all candidate sector universes in
+# `sector_universes/learned_sector_candidates` into a single binary universe
+# catalog (see `UniverseCatalog`)
+
+import logging
+
+from context import reIndexer
+
+
+logging.getLogger().setLevel(logging.INFO)
+
+# Folder containing candidate sector universe files
+sector_folder = 'sector_universes/learned_sector_candidates/'
+# Output universe catalog
+catalog_file = 'sector_universes/learned_sector_candidates.catalog'
+
+def buildCatalog():
+    catalog = reIndexer.UniverseCatalog.fromCSVFolder(
+        sector_folder=sector_folder,
+        catalog_file=catalog_file
+    )
+    print('Packed {0} universes into {1}'.format(
+        len(catalog.getUniverseNames()), catalog_file))
+
+if __name__ == '__main__':
+    buildCatalog()
@@ -0,0 +1,29 @@
+# Script to rank all stored backtest results in
+# `sector_universes/learned_sectors/pickle` by Sharpe ratio
+# Scored universes are persisted, so that re-running this script only scores
+# newly finished (or modified) universes
+
+import logging
+
+from context import reIndexer
+
+
+logging.getLogger().setLevel(logging.INFO)
+
+# Folder containing pickled backtest results dataframes
+pickle_folder = 'sector_universes/learned_sectors/pickle/'
+# Persisted metrics of scored universes
+metrics_file = 'sector_universes/learned_sectors/leaderboard.pickle'
+# Output file for the ranked leaderboard
+leaderboard_out_file = 'sector_universes/learned_sectors/leaderboard.csv'
+
+def rankAll():
+    leaderboard = reIndexer.Leaderboard(metrics_file=metrics_file)
+    ranked = leaderboard.update(
+        result_files=reIndexer.ResultsReader(pickle_folder).getResultFiles()
+    )
+    ranked.to_csv(leaderboard_out_file)
+    print(ranked.head(20))
+
+if __name__ == '__main__':
+    rankAll()
@@ -0,0 +1,54 @@
+# Script to run the backtests of all candidate sector universes in
+# `sector_universes/learned_sector_candidates` on any number of nodes
+# Jobs are enqueued once into a shared work queue (a SQLite file, or a folder
+# on a shared filesystem), and processed by any number of workers:
+#   python sweep.py enqueue <queue>
+#   python sweep.py work <queue>    (on each node, any number of times)
+#   python sweep.py status <queue>
+# Workers emit job telemetry to a shared stream (see `sweep_status.py`)
+
+import argparse
+import logging
+
+from context import reIndexer
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Folder containing candidate sector universe files
+sector_folder = 'sector_universes/learned_sector_candidates/'
+# Shared output folder for pickled backtest results dataframes
+pickle_out_folder = 'sector_universes/learned_sectors/pickle/'
+# Shared sweep telemetry stream
+telemetry_file = 'tmp/telemetry.jsonl'
+
+def sweep():
+    parser = argparse.ArgumentParser(description='Distributed backtest sweep')
+    parser.add_argument('command', choices=['enqueue', 'work', 'status'])
+    parser.add_argument('queue', help='SQLite file (.db) or queue folder')
+    parser.add_argument('--max-jobs', type=int, default=None)
+    parser.add_argument('--telemetry', default=telemetry_file,
+                        help='Telemetry (JSON-lines) file')
+    args = parser.parse_args()
+
+    work_queue = reIndexer.WorkQueue.open(args.queue)
+
+    if args.command == 'enqueue':
+        work_queue.enqueueFolder(sector_folder=sector_folder)
+        # Starting the sweep in the telemetry stream (see `TelemetryReader`)
+        status = work_queue.getStatus()
+        reIndexer.TelemetryEmitter(telemetry_file=args.telemetry).emit(
+            'sweep_start', queue=args.queue,
+            n_total=status.get('pending', 0) + status.get('claimed', 0))
+    elif args.command == 'work':
+        reIndexer.SweepWorker(
+            work_queue=work_queue,
+            results_folder=pickle_out_folder,
+            telemetry=reIndexer.TelemetryEmitter(
+                telemetry_file=args.telemetry)
+        ).run(max_jobs=args.max_jobs)
+
+    print(work_queue.getStatus())
+
+if __name__ == '__main__':
+    sweep()
@@ -0,0 +1,69 @@
+# Script to show the live progress of a (running) sweep from its telemetry
+# stream; throughput, ETA, runtimes, peak memory and failures
+#   python sweep_status.py [telemetry_file] [--total N | --queue <queue>]
+#                          [--follow SECONDS]
+
+import argparse
+import datetime
+import time
+
+from context import reIndexer
+
+
+def formatDuration(seconds: float) -> str:
+    if seconds is None:
+        return '-'
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+def printSummary(summary: dict):
+    print('Jobs: {0} done, {1} failed ({2} failed attempts), {3} running, '
+        '{4} lost'.format(summary['n_done'], summary['n_failed'],
+                          summary['n_failed_attempts'], summary['n_running'],
+                          summary['n_stale']))
+    print('Elapsed: {0}; ETA: {1}'.format(formatDuration(summary['elapsed']),
+        formatDuration(summary['eta'])))
+    print('Throughput: {0} jobs/hour (recent: {1})'.format(
+        *['{0:.1f}'.format(i) if i is not None else '-' for i in
+          (summary['jobs_per_hour'], summary['recent_jobs_per_hour'])]))
+    if 'mean_runtime' in summary:
+        print('Mean runtime: {0:.1f}s; mean bars/sec: {1}'.format(
+            summary['mean_runtime'], '{0:.1f}'.format(
+                summary['mean_bars_per_sec'])
+            if summary['mean_bars_per_sec'] is not None else '-'))
+        print('Mean phases: ' + ', '.join('{0} {1:.1f}s'.format(i, j)
+            for i, j in summary['mean_phases'].items()))
+        print('Slowest: ' + ', '.join('{0} ({1:.0f}s)'.format(i, j)
+            for i, j in summary['slowest_jobs']))
+    if summary['peak_rss_mb'] is not None:
+        print('Peak RSS: {0:.0f} MB'.format(summary['peak_rss_mb']))
+    for job_id, error in summary['failed_jobs']:
+        print('FAILED {0}: {1}'.format(job_id, error))
+
+def sweepStatus():
+    parser = argparse.ArgumentParser(description='Sweep telemetry status')
+    parser.add_argument('telemetry', nargs='?', default='tmp/telemetry.jsonl',
+                        help='Telemetry (JSON-lines) file')
+    parser.add_argument('--total', type=int, default=None,
+                        help='Total number of jobs in the sweep')
+    parser.add_argument('--queue', default=None,
+                        help='Work queue of the sweep (for the remaining jobs)')
+    parser.add_argument('--follow', type=float, default=None,
+                        help='Refresh interval (seconds)')
+    args = parser.parse_args()
+
+    reader = reIndexer.TelemetryReader(telemetry_file=args.telemetry)
+    while True:
+        n_remaining = None
+        if args.queue is not None:
+            status = reIndexer.WorkQueue.open(args.queue).getStatus()
+            n_remaining = status.get('pending', 0) + status.get('claimed', 0)
+        printSummary(reader.getSummary(n_total=args.total,
+                                       n_remaining=n_remaining))
+
+        if args.follow is None:
+            break
+        time.sleep(args.follow)
+        print()
+
+if __name__ == '__main__':
+    sweepStatus()
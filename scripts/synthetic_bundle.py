@@ -0,0 +1,51 @@
+# Script to generate, register and ingest a deterministic synthetic data bundle
+# for offline (air-gapped) scaling tests, and to write a matching sector
+# universe file.
+# NOTE: To use the bundle in a backtest, register it again in the backtest
+#       process (or in `~/.zipline/extension.py`) with the same parameters, and
+#       set `config.bundle` to the bundle name.
+
+import logging
+import pandas as pd
+
+from context import reIndexer
+from zipline.data import bundles
+
+
+# Setting log level
+logging.getLogger().setLevel(logging.INFO)
+
+# Synthetic bundle configuration
+bundle_name = 'synthetic'
+n_tickers = 5000
+n_sectors = 50
+minutes_per_day = None  # Set to 390 for minute bars
+start_session = pd.Timestamp('2011-01-03', tz='UTC')
+end_session = pd.Timestamp('2017-12-29', tz='UTC')
+
+# Output sector universe file
+universe_file = 'sector_universes/synthetic_{0}.csv'.format(n_tickers)
+
+
+def ingestSynthetic():
+    synthetic = reIndexer.SyntheticBundle(
+        n_tickers=n_tickers,
+        minutes_per_day=minutes_per_day
+    )
+
+    # Registering and ingesting bundle
+    synthetic.register(
+        name=bundle_name,
+        start_session=start_session,
+        end_session=end_session
+    )
+    bundles.ingest(bundle_name, show_progress=True)
+    print('Ingested synthetic bundle {0} with {1} tickers'.format(
+        bundle_name, n_tickers))
+
+    # Writing matching sector universe
+    synthetic.writeUniverse(csv_file=universe_file, n_sectors=n_sectors)
+    print('Wrote synthetic sector universe to {0}'.format(universe_file))
+
+if __name__ == '__main__':
+    ingestSynthetic()
@@ -0,0 +1,51 @@
+from reIndexer.sector_universe import Universe
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_prices():
+    """Factory of daily random-walk price panels (tickers 't0', 't1', ...).
+    """
+
+    def makePrices(n_tickers: int=12, random_levels: bool=False,
+        seed: int=0) -> pd.DataFrame:
+        random_state = np.random.RandomState(seed)
+        index = pd.bdate_range('2010-01-01', '2014-12-31', tz='UTC')
+        levels = np.exp(random_state.uniform(1, 6, n_tickers))\
+            if random_levels else 100.
+
+        return pd.DataFrame(levels * np.exp(np.cumsum(random_state.normal(0,
+            0.01, (len(index), n_tickers)), axis=0)), index=index,
+            columns=['t{0}'.format(i) for i in range(n_tickers)])
+
+    return makePrices
+
+
+@pytest.fixture
+def prices(make_prices) -> pd.DataFrame:
+    """Daily random-walk price panel of 12 tickers."""
+
+    return make_prices()
+
+
+@pytest.fixture
+def make_universe():
+    """Factory of sector universes over a list of tickers; tickers are
+    assigned to the sectors round-robin, unless sector ids are given.
+    """
+
+    def makeUniverse(tickers: list, n_sectors: int,
+        universe_name: str='test', sector_ids: np.array=None) -> Universe:
+        return Universe.fromAssignments(
+            universe_name=universe_name,
+            ticker_dict=list(tickers),
+            ticker_ids=np.arange(len(tickers)),
+            sector_labels=['s{0}'.format(i) for i in range(n_sectors)],
+            sector_ids=np.arange(len(tickers)) % n_sectors
+                if sector_ids is None else np.asarray(sector_ids)
+        )
+
+    return makeUniverse
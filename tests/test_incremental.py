@@ -0,0 +1,40 @@
+from reIndexer.backtest import IncrementalBacktest
+
+import numpy as np
+import pandas as pd
+
+
+def test_extended_run_matches_full_run(prices, make_universe):
+    """A run to a midpoint, extended to the end of the panel, has the results
+    of a full run over the panel; also with gaps in the prices around the
+    midpoint.
+    """
+
+    split_date = pd.Timestamp('2013-06-28', tz='UTC')
+    split = prices.index.get_loc(split_date) + 1
+    prices = prices.copy()
+    # Gaps ending before the midpoint, and in the first bars after it
+    prices.iloc[split - 6:split - 3, 0] = np.nan
+    prices.iloc[split - 4:split - 2, 5] = np.nan
+    prices.iloc[split:split + 3, 1] = np.nan
+    prices.iloc[split + 1:split + 5, 7] = np.nan
+
+    full_results, full_state = IncrementalBacktest(
+        sector_universe=make_universe(tickers=prices.columns, n_sectors=4))\
+        .run(prices=prices)
+
+    incremental = IncrementalBacktest(
+        sector_universe=make_universe(tickers=prices.columns, n_sectors=4))
+    run_results, state = incremental.run(prices=prices.iloc[:split])
+    assert state.getDate() == split_date
+    extended_results, extended_state = incremental.extend(state=state,
+                                                          prices=prices)
+
+    results = pd.concat([run_results, extended_results])
+    assert results.index.equals(full_results.index)
+    assert list(results.columns) == list(full_results.columns)
+    np.testing.assert_allclose(results.values, full_results.values,
+                               rtol=1e-7, atol=1e-9)
+    assert extended_state.getDate() == full_state.getDate()
+    np.testing.assert_allclose(extended_state.sim_state['cum_wealth'],
+                               full_state.sim_state['cum_wealth'], rtol=1e-7)
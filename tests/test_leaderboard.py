@@ -0,0 +1,40 @@
+from reIndexer.analytics import Leaderboard, ResultsReader
+
+import numpy as np
+import pandas as pd
+
+
+def makeResult(orders: list, starting_cash: float) -> pd.DataFrame:
+    index = pd.bdate_range('2015-01-01', periods=len(orders), tz='UTC')
+
+    return pd.DataFrame({
+        'returns': np.linspace(-0.01, 0.01, len(orders)),
+        'starting_cash': [starting_cash] + [0.] * (len(orders) - 1),
+        'starting_value': 0.,
+        'total_etf_restr_turnover': 1e3,
+        'total_port_rebal_turnover': 1e3,
+        'orders': orders
+    }, index=index)
+
+
+def test_commission_drag_from_charged_commissions(tmp_path):
+    """Commission drag is the commission charged on the orders (cumulative
+    per order) as a fraction of the starting portfolio value, per year.
+    """
+
+    makeResult(orders=[
+        [{'id': 'o1', 'commission': 5.}],
+        [{'id': 'o1', 'commission': 8.}, {'id': 'o2', 'commission': None}],
+        [{'id': 'o2', 'commission': 2.}],
+        []
+    ], starting_cash=1e6).to_pickle(str(tmp_path / 'a.pickle'))
+    makeResult(orders=[[], [], [], []], starting_cash=1e6)\
+        .to_pickle(str(tmp_path / 'b.pickle'))
+
+    leaderboard = Leaderboard(periods_per_year=252).update(
+        result_files=ResultsReader(str(tmp_path)).getResultFiles())
+
+    assert leaderboard.loc['a', 'total_commissions'] == 10.
+    assert np.isclose(leaderboard.loc['a', 'commission_drag'],
+                      10. / 1e6 * 252 / 4)
+    assert leaderboard.loc['b', 'commission_drag'] == 0.
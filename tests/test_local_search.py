@@ -0,0 +1,48 @@
+from reIndexer.backtest import UniverseEvaluator
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def evaluator(prices, make_universe) -> UniverseEvaluator:
+    return UniverseEvaluator(sector_universe=make_universe(
+        tickers=prices.columns, n_sectors=4), prices=prices)
+
+
+def test_warm_start_matches_cold_evaluation(evaluator, prices, make_universe):
+    """A neighbour evaluated incrementally (warm started from the current
+    weights) has the weights and objective of the neighbour evaluated from
+    scratch.
+    """
+
+    moves = [('t0', 's0', 's1'), ('t6', 's2', 's3')]
+    evaluator.applyMoves(moves=moves)
+
+    moved_universe = make_universe(tickers=prices.columns, n_sectors=4,
+        universe_name='moved',
+        sector_ids=[1, 1, 2, 3, 0, 1, 3, 3, 0, 1, 2, 3])
+    # Same component order in the sectors as the moves
+    for sector_label in moved_universe.getSectorLabels():
+        moved_universe.sectors[sector_label] = evaluator.sector_universe\
+            .getTickersInSector(sector_label=sector_label)
+    cold = UniverseEvaluator(sector_universe=moved_universe, prices=prices)
+
+    assert list(evaluator.current['log_rets'].columns) ==\
+        list(cold.current['log_rets'].columns)
+    np.testing.assert_allclose(evaluator.current['weights'],
+                               cold.current['weights'], rtol=0, atol=1e-10)
+    assert abs(evaluator.getObjective() - cold.getObjective()) <=\
+        1e-10 * cold.getObjective()
+
+
+def test_invalid_moves_discard_candidate(evaluator):
+    """Invalid moves raise, and leave no candidate to accept."""
+
+    evaluator.evaluateMoves(moves=[('t0', 's0', 's1')])
+
+    with pytest.raises(KeyError):
+        evaluator.evaluateMoves(moves=[('t1', 's0', 's2')])
+    assert evaluator.candidate is None
+    with pytest.raises(ValueError):
+        evaluator.acceptMoves()
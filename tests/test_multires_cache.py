@@ -0,0 +1,93 @@
+from reIndexer.data import MultiResolutionPriceCache
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+Asset = namedtuple('Asset', ['sid'])
+
+
+class CalendarStub():
+    """Trading calendar stub over a fixed set of minutes."""
+
+    def __init__(self, minutes: pd.DatetimeIndex):
+        self.minutes = minutes
+
+    def minutes_in_range(self, start: pd.Timestamp, end: pd.Timestamp)\
+        -> pd.DatetimeIndex:
+        return self.minutes[(self.minutes >= start) & (self.minutes <= end)]
+
+
+class AdjustmentReaderStub():
+    """Adjustment reader stub; adjustments by sid (splits only)."""
+
+    def __init__(self, splits: dict):
+        self.splits = splits
+
+    def get_adjustments_for_sid(self, table: str, sid: int) -> list:
+        return [list(i) for i in self.splits.get(sid, [])] if\
+            table == 'splits' else []
+
+
+class DataStub():
+    """Stub of zipline's `data.history` ('price' field) over raw minute
+    prices; adjusted for the splits effective at the current bar, and
+    forward filled.
+    """
+
+    def __init__(self, raw: pd.DataFrame, splits: dict):
+        self.raw = raw
+        self.splits = splits
+        self.dt = None
+
+    def history(self, assets: list, field: str, bar_count: int,
+        frequency: str) -> pd.DataFrame:
+        history = self.raw.loc[self.raw.index <= self.dt, assets].copy()
+        for asset in assets:
+            for effective_date, ratio in self.splits.get(asset.sid, []):
+                if effective_date <= self.dt:
+                    history.loc[history.index < effective_date, asset] *= ratio
+        history = history.ffill()
+        if frequency == '1d':
+            history = history.groupby(history.index.floor('D')).last()
+
+        return history.iloc[-bar_count:]
+
+
+def test_history_matches_data_history_across_split():
+    """Minute windows served from the cache match zipline's (adjusted)
+    history also after a split of a cached asset.
+    """
+
+    random_state = np.random.RandomState(0)
+    sessions = pd.bdate_range('2015-01-05', periods=6, tz='UTC')
+    minutes = pd.DatetimeIndex(np.concatenate([(i + pd.Timedelta('14h30min') +
+        pd.to_timedelta(np.arange(120), unit='m')).values for i in sessions]),
+        tz='UTC')
+    assets = [Asset(sid=0), Asset(sid=1)]
+    raw = pd.DataFrame(100 * np.exp(np.cumsum(random_state.normal(0, 0.001,
+        (len(minutes), 2)), axis=0)), index=minutes, columns=assets)
+    raw.iloc[random_state.rand(len(minutes)) < 0.05, 1] = np.nan
+    # 2-for-1 split of the first asset, effective on the fourth session
+    raw.loc[raw.index >= sessions[3], assets[0]] /= 2.
+    splits = {0: [(sessions[3], 0.5)]}
+
+    data = DataStub(raw=raw, splits=splits)
+    cache = MultiResolutionPriceCache(
+        trading_calendar=CalendarStub(minutes=minutes),
+        minute_window=150,
+        hourly_window=4,
+        daily_window=2,
+        adjustment_reader=AdjustmentReaderStub(splits=splits)
+    )
+
+    for dt in minutes[150::7]:
+        data.dt = dt
+        cache.update(zipline_data=data, end_dt=dt, assets=assets)
+        np.testing.assert_allclose(
+            cache.getHistory(assets=assets, bar_count=150,
+                             frequency='1m').values,
+            data.history(assets, 'price', bar_count=150,
+                         frequency='1m').values,
+            rtol=1e-12
+        )
@@ -0,0 +1,108 @@
+from reIndexer.cfg import overrideConfig
+from reIndexer.data import PricePanel, SyntheticBundle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def historyWindow(raw: pd.DataFrame, adjustments: dict, end_dates: dict,
+    end: int, bar_count: int) -> pd.DataFrame:
+    """Reference lookback window; zipline's history ('price' field) as of the
+    end of the window (adjusted, forward filled from the last traded price up
+    to the end date of each asset), filled as in `PriceWeightedETF`.
+    """
+
+    history = raw.iloc[:end].copy()
+    window_end = history.index[-1]
+    for ticker, ticker_adjustments in adjustments.items():
+        for effective_date, ratio in ticker_adjustments:
+            if effective_date <= window_end:
+                history.loc[history.index < effective_date, ticker] *= ratio
+    history = history.fillna(method='ffill')
+    for ticker, end_date in end_dates.items():
+        history.loc[history.index.normalize() > end_date, ticker] = np.nan
+
+    return history.iloc[-bar_count:].fillna(method='bfill')\
+        .fillna(method='ffill')
+
+
+def test_windows_match_adjusted_history():
+    """Windows are adjusted as of their end (no look-ahead of later splits
+    and dividends), and filled as zipline's forward-filled history.
+    """
+
+    random_state = np.random.RandomState(0)
+    index = pd.bdate_range('2015-01-01', periods=60, tz='UTC')
+    raw = pd.DataFrame(100 * np.exp(np.cumsum(random_state.normal(0, 0.01,
+        (len(index), 4)), axis=0)), index=index, columns=['a', 'b', 'c', 'd'])
+    # Split of 'a', listing of 'b', delisting of 'c', gaps of 'd'
+    raw.loc[index[30]:, 'a'] /= 2.
+    raw.iloc[:15, 1] = np.nan
+    raw.iloc[41:, 2] = np.nan
+    raw.iloc[[5, 6, 7, 20, 21, 22, 23, 24, 25, 50], 3] = np.nan
+    adjustments = {'a': [(index[30], 0.5)], 'd': [(index[22], 0.98),
+                                                  (index[45], 0.97)]}
+    end_dates = {'c': index[40]}
+
+    panel = PricePanel(prices=raw, adjustments=adjustments,
+                       end_dates=end_dates)
+
+    assert not panel.getValidMask()['d'].iloc[5]
+    for end in range(1, len(index) + 1):
+        window = panel.getWindowFrame(tickers=['d', 'a', 'c', 'b'],
+                                      end_dt=index[end - 1], bar_count=10)
+        expected = historyWindow(raw=raw, adjustments=adjustments,
+            end_dates=end_dates, end=end, bar_count=10)[['d', 'a', 'c', 'b']]
+        np.testing.assert_allclose(window.values, expected.values,
+                                   rtol=1e-14)
+
+
+def test_windows_match_data_portal_history(tmp_path, monkeypatch,
+    make_universe):
+    """Windows of a session panel match the data portal history (as read by
+    `data.history`) of a bundle with splits.
+    """
+
+    pytest.importorskip('zipline.data.bcolz_daily_bars')
+    from reIndexer.backtest import BacktestSession
+    from zipline.data import bundles
+
+    monkeypatch.setenv('ZIPLINE_ROOT', str(tmp_path))
+    synthetic = SyntheticBundle(n_tickers=20, seed=1, nan_prob=0.05,
+                                split_prob=0.5)
+    synthetic.register(name='synthetic-splits',
+        start_session=pd.Timestamp('2014-01-02', tz='UTC'),
+        end_session=pd.Timestamp('2016-12-30', tz='UTC'))
+    bundles.ingest('synthetic-splits', environ={'ZIPLINE_ROOT':
+                                                str(tmp_path)})
+
+    session = BacktestSession(bundle='synthetic-splits')
+    tickers = synthetic.getTickers()
+    sector_universe = make_universe(tickers=tickers, n_sectors=2)
+    assets = session.getAssetFinder().lookup_symbols(tickers,
+                                                     as_of_date=None)
+
+    with overrideConfig({
+        'backtest_start': pd.Timestamp('2015-01-02', tz='UTC'),
+        'backtest_end': pd.Timestamp('2016-12-30', tz='UTC'),
+        'setf_lookback_window': 60
+    }):
+        panel = session.buildPricePanel(sector_universe=sector_universe)
+        assert panel.adjustments
+
+        sessions = session.trading_calendar.sessions_in_range(
+            pd.Timestamp('2015-01-02', tz='UTC'),
+            pd.Timestamp('2016-12-30', tz='UTC'))
+        for end_dt in sessions[::5]:
+            history = session.getDataPortal().get_history_window(
+                assets=assets,
+                end_dt=end_dt,
+                bar_count=60,
+                frequency='1d',
+                field='price',
+                data_frequency='daily'
+            ).fillna(method='bfill').fillna(method='ffill')
+            window, _ = panel.getWindow(tickers=tickers, end_dt=end_dt,
+                                        bar_count=60)
+            np.testing.assert_allclose(window, history.values, rtol=1e-6)
@@ -0,0 +1,57 @@
+from reIndexer.sweep import FileSystemWorkQueue, SQLiteWorkQueue, WorkQueue
+
+import os
+import pytest
+
+
+@pytest.fixture(params=['sqlite', 'filesystem'])
+def work_queue(request, tmp_path) -> WorkQueue:
+    path = str(tmp_path / ('queue.db' if request.param == 'sqlite'
+                           else 'queue'))
+    return WorkQueue.open(path, max_attempts=2)
+
+
+def makeJob(job_id: str) -> dict:
+    return WorkQueue.makeJob(universe_name=job_id, csv_file=job_id + '.csv')
+
+
+def test_stale_claims_fail_after_max_attempts(work_queue):
+    """Jobs whose workers die (i.e. never call `fail`) are requeued, and
+    marked as failed after `max_attempts` attempts.
+    """
+
+    work_queue.enqueue(job=makeJob('a'))
+
+    assert work_queue.claim(worker_id='w1')['job_id'] == 'a'
+    assert work_queue.requeueStale(stale_timeout=-1) == 1
+    assert work_queue.getStatus().get('pending') == 1
+
+    assert work_queue.claim(worker_id='w2')['job_id'] == 'a'
+    assert work_queue.requeueStale(stale_timeout=-1) == 0
+    assert work_queue.getStatus().get('failed') == 1
+    assert work_queue.claim(worker_id='w3') is None
+
+
+def test_claim_of_old_job_is_not_stale(tmp_path):
+    """A claimed job is not stale, however long it was pending.
+    """
+
+    work_queue = FileSystemWorkQueue(queue_folder=str(tmp_path))
+    work_queue.enqueue(job=makeJob('a'))
+    os.utime(work_queue.getJobPath('pending', 'a'), (0, 0))
+
+    assert work_queue.claim(worker_id='w1')['job_id'] == 'a'
+    assert work_queue.requeueStale(stale_timeout=60) == 0
+    assert work_queue.isClaimedBy(job_id='a', worker_id='w1')
+
+
+def test_failed_stale_claim_error(tmp_path):
+    work_queue = SQLiteWorkQueue(db_file=str(tmp_path / 'queue.db'),
+                                 max_attempts=1)
+    work_queue.enqueue(job=makeJob('a'))
+    work_queue.claim(worker_id='w1')
+    work_queue.requeueStale(stale_timeout=-1)
+
+    with work_queue.connect() as conn:
+        assert conn.execute('SELECT status, error FROM jobs').fetchone() ==\
+            ('failed', 'stale claim')
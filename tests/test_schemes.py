@@ -0,0 +1,25 @@
+from reIndexer.backtest import VectorizedBacktest
+from reIndexer.portfolio import BatchMinimumVariance
+from reIndexer.synthetic_etf import EqualWeighting, PriceWeighting
+
+import numpy as np
+
+
+def test_scheme_weight_schedules_match_single_schemes(prices, make_universe):
+    """The batch weight schedules of a stacked scheme panel are those of
+    each scheme's panel solved on its own.
+    """
+
+    sector_universe = make_universe(tickers=prices.columns, n_sectors=4)
+
+    log_rets, _ = VectorizedBacktest(sector_universe=sector_universe,
+        prices=prices).computeSchemeSeries(schemes=[PriceWeighting(),
+                                                    EqualWeighting()])
+    solver = BatchMinimumVariance()
+    schedules = solver.computeSchemeWeightSchedules(log_rets=log_rets)
+
+    for scheme_name, schedule in schedules.items():
+        expected = solver.computeWeightSchedule(log_rets=log_rets[scheme_name])
+        np.testing.assert_allclose(schedule.values, expected.values,
+                                   rtol=0, atol=1e-12)
+        assert list(schedule.columns) == list(expected.columns)
@@ -0,0 +1,61 @@
+from reIndexer.backtest import Screener
+from reIndexer.cfg import config
+from reIndexer.sector_universe import Universe
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class StubSession():
+    """Session stub returning the same returns series for every universe.
+    """
+
+    def run(self, sector_universe: Universe) -> dict:
+        return {'returns': pd.Series(np.linspace(-0.01, 0.02, 100))}
+
+
+@pytest.fixture
+def make_candidate(prices, make_universe):
+    """Factory of candidate universes, including a ticker missing from the
+    prices.
+    """
+
+    return lambda universe_name: make_universe(
+        tickers=list(prices.columns) + ['missing'], n_sectors=3,
+        universe_name=universe_name)
+
+
+@pytest.mark.parametrize('top_k', [0, 1])
+def test_run_report(prices, make_candidate, top_k):
+    """The report has full metric columns (NaN for universes not run in
+    full), also without finalists.
+    """
+
+    sector_universes = [make_candidate('a'), make_candidate('b')]
+    report = Screener(prices=prices, session=StubSession(), top_k=top_k)\
+        .run(sector_universes=sector_universes)
+
+    assert report['finalist'].sum() == top_k
+    assert report['sharpe'].notnull().sum() == top_k
+    assert report['screen_sharpe'].notnull().all()
+
+
+def test_run_does_not_modify_universes(prices, make_candidate):
+    sector_universe = make_candidate('a')
+    Screener(prices=prices, session=StubSession(), top_k=1)\
+        .run(sector_universes=[sector_universe])
+
+    assert 'missing' in sector_universe.getTickersInSector('s0')
+    assert not sector_universe.invalid_tickers
+
+
+def test_default_window_is_shortened(prices):
+    """The screening window defaults to the last years of the prices within
+    the backtest window.
+    """
+
+    screener = Screener(prices=prices, session=StubSession(), screen_years=2)
+
+    assert screener.screen_start == prices.index[-1] - pd.DateOffset(years=2)
+    assert screener.screen_start > config.backtest_start
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from reIndexer.cfg import config, overrideConfig
+from reIndexer.synthetic_etf import SyntheticETFCache
+
+import numpy as np
+import os
+import pandas as pd
+
+
+def test_key_depends_on_bundle_and_dtype():
+    end_dt = pd.Timestamp('2015-06-01', tz='UTC')
+    key = SyntheticETFCache.makeKey(tickers=['b', 'a'], end_dt=end_dt)
+
+    assert key == SyntheticETFCache.makeKey(tickers=['a', 'b'], end_dt=end_dt)
+    with overrideConfig({'storage_dtype': 'float32'}):
+        assert key != SyntheticETFCache.makeKey(tickers=['a', 'b'],
+                                                end_dt=end_dt)
+    with overrideConfig({'bundle': 'synthetic'}):
+        assert key != SyntheticETFCache.makeKey(tickers=['a', 'b'],
+                                                end_dt=end_dt)
+
+
+def test_memory_is_bounded():
+    SyntheticETFCache.clear()
+    cache = SyntheticETFCache()
+    index = pd.bdate_range('2015-01-01', periods=3, tz='UTC')
+
+    with overrideConfig({'setf_cache_max_entries': 2}):
+        for key in ['a', 'b', 'c']:
+            cache.put(key=key, prices=np.ones(3), index=index)
+            # Keeping 'a' recently used
+            cache.get(key='a')
+
+        assert cache.get(key='a') is not None
+        assert cache.get(key='b') is None
+        assert cache.get(key='c') is not None
+
+    SyntheticETFCache.clear()
+
+
+def test_concurrent_put_and_get(tmp_path):
+    """Threads sharing the cache (see `config.sector_update_workers`) may put
+    and get the same keys, with evictions in between.
+    """
+
+    SyntheticETFCache.clear()
+    cache = SyntheticETFCache(cache_dir=str(tmp_path))
+    index = pd.bdate_range('2015-01-01', periods=3, tz='UTC')
+
+    def work(seed: int):
+        for i in range(200):
+            key = str((seed + i) % 5)
+            cache.put(key=key, prices=np.ones(3), index=index)
+            assert cache.get(key=key) is not None
+
+    with overrideConfig({'setf_cache_max_entries': 2}):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+
+    assert sorted(os.listdir(str(tmp_path))) ==\
+        ['{0}.npz'.format(i) for i in range(5)]
+
+    SyntheticETFCache.clear()
@@ -0,0 +1,48 @@
+from reIndexer.backtest import VectorizedBacktest
+from reIndexer.cfg import overrideConfig
+from reIndexer.portfolio import BatchMinimumVariance
+from reIndexer.sector_universe import Universe
+
+import numpy as np
+import pandas as pd
+
+
+def computeSeries(sector_universe: Universe, prices: pd.DataFrame,
+    storage_dtype: str) -> tuple:
+    """Function to compute the ETF log returns and the rolling covariances of
+    a sector universe with a storage precision.
+    """
+
+    with overrideConfig({'storage_dtype': storage_dtype}):
+        log_rets, _ = VectorizedBacktest(sector_universe=sector_universe,
+                                         prices=prices).computeETFSeries()
+        solver = BatchMinimumVariance()
+        cov_mats = solver.rollingCovariances(log_rets=log_rets,
+            rebalance_dates=solver.getRebalanceDates(log_rets.index))
+
+    return log_rets.values.astype(np.float64), cov_mats
+
+
+def test_float32_storage_within_documented_bounds(make_prices,
+    make_universe):
+    """float32 storage stays within the error bounds documented with
+    `config.storage_dtype`; log returns within 2^-23 (~1.2e-7, absolute) per
+    bar, and covariances within 1e-5 (relative to the ETF volatilities).
+    """
+
+    prices = make_prices(n_tickers=50, random_levels=True)
+    sector_universe = make_universe(tickers=prices.columns, n_sectors=5)
+
+    log_rets_64, cov_mats_64 = computeSeries(sector_universe=sector_universe,
+        prices=prices, storage_dtype='float64')
+    log_rets_32, cov_mats_32 = computeSeries(sector_universe=sector_universe,
+        prices=prices, storage_dtype='float32')
+
+    valid = ~np.isnan(log_rets_64)
+    np.testing.assert_array_equal(valid, ~np.isnan(log_rets_32))
+    assert np.max(np.abs(log_rets_32[valid] - log_rets_64[valid])) <=\
+        2. ** -23 + 1e-12
+
+    vols = np.sqrt(np.einsum('dii->di', cov_mats_64))
+    assert np.max(np.abs(cov_mats_32 - cov_mats_64) /
+                  (vols[:, :, None] * vols[:, None, :])) <= 1e-5
@@ -0,0 +1,61 @@
+from reIndexer.sweep import TelemetryEmitter, TelemetryReader
+
+import json
+import time
+
+
+def writeEvents(telemetry_file: str, events: list):
+    with open(telemetry_file, 'a') as f:
+        for event in events:
+            f.write(json.dumps(event) + '\n')
+
+
+def test_summary_of_last_sweep(tmp_path):
+    """Only the events of the last sweep are summarized, and unfinished jobs
+    without recent events are not counted as running.
+    """
+
+    telemetry_file = str(tmp_path / 'telemetry.jsonl')
+    now = time.time()
+    writeEvents(telemetry_file, [
+        # Previous sweep
+        {'event': 'sweep_start', 'ts': now - 9000, 'n_total': 2},
+        {'event': 'job_start', 'ts': now - 8900, 'job_id': 'a'},
+        {'event': 'job_finish', 'ts': now - 8800, 'job_id': 'a',
+         'status': 'done', 'runtime': 100., 'phases': dict()},
+        {'event': 'job_start', 'ts': now - 8700, 'job_id': 'b'},
+        # Current sweep; 'c' was lost, 'd' is running
+        {'event': 'sweep_start', 'ts': now - 3600, 'n_total': 4},
+        {'event': 'job_start', 'ts': now - 3500, 'job_id': 'a'},
+        {'event': 'job_finish', 'ts': now - 1800, 'job_id': 'a',
+         'status': 'done', 'runtime': 1700., 'phases': dict()},
+        {'event': 'job_start', 'ts': now - 1700, 'job_id': 'c'},
+        {'event': 'job_start', 'ts': now - 1700, 'job_id': 'd'},
+        {'event': 'resource', 'ts': now - 10, 'job_id': 'd'},
+    ])
+
+    summary = TelemetryReader(telemetry_file=telemetry_file).getSummary(
+        stale_timeout=600.)
+
+    assert summary['n_done'] == 1
+    assert summary['n_running'] == 1
+    assert summary['n_stale'] == 1
+    assert abs(summary['elapsed'] - 3590.) < 1.
+    # 3 remaining jobs, at 1 job per elapsed time
+    assert abs(summary['eta'] - 3 * 3590.) < 10.
+
+
+def test_emitter_events(tmp_path):
+    telemetry_file = str(tmp_path / 'telemetry.jsonl')
+    telemetry = TelemetryEmitter(telemetry_file=telemetry_file)
+    telemetry.emit('sweep_start', n_total=1)
+    telemetry.jobStarted(job_id='a')
+    with telemetry.phase('simulate'):
+        pass
+    telemetry.jobFinished(status='done', n_bars=10)
+
+    summary = TelemetryReader(telemetry_file=telemetry_file).getSummary()
+
+    assert summary['n_done'] == 1
+    assert summary['n_running'] == 0
+    assert 'simulate' in summary['mean_phases']